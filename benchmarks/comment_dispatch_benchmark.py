@@ -0,0 +1,107 @@
+import random
+import re
+import timeit
+from typing import Final
+
+from reddit_bot.data import resources
+from reddit_bot.util.reddit_comment_util import resolve_command
+
+CORPUS_SIZE: Final[int] = 5000
+ROUNDS: Final[int] = 5
+
+CHATTER: Final[list[str]] = [
+    "What a performance from Barella tonight, he was everywhere on the pitch.",
+    "Honestly I think Inzaghi should rotate more before the Champions League game.",
+    "Lautaro needs to convert those chances, we can't keep wasting them against the big teams.",
+    "Anyone know where I can watch the game in the US? Paramount keeps buffering.",
+    "The referee was terrible in the second half, that was a clear penalty on Thuram.",
+    "Dimarco's crossing this season is just unreal, best left wingback in Serie A.",
+    "Source? This sounds like one of those made up rumours again.",
+    "Forza Inter, sempre! See you all in the match thread.",
+    "I'm not worried about the table yet, it's a long season and we have the depth.",
+    "Calhanoglu from the spot is automatic at this point.",
+]
+COMMANDS: Final[list[str]] = ["!inter next", "!inter seriea", "!inter cl", "!inter injuries", "!inter amala", "!inter about", "!inter cwc", "!inter marco", "!inter whatever", "🚬🗿"]
+
+
+# Previous dispatch, a chain of substring checks and uncompiled regex searches evaluated in order for every comment.
+def legacy_resolve_command(comment_body: str, comment_author: str, approved_users: list) -> str:
+    if "forza inter" in comment_body:
+        return "forza inter"
+    elif "🚬🗿" in comment_body:
+        return "🚬🗿"
+    elif re.search(resources.Regex.SWEAR_KEYWORDS, comment_body, re.IGNORECASE):
+        return "for swear keywords"
+    elif re.search(resources.Regex.OTHER_SUBREDDIT_KEYWORDS, comment_body, re.IGNORECASE):
+        return "for other subreddits"
+    elif "!inter amala" in comment_body:
+        return "!inter amala"
+    elif "!inter bells" in comment_body:
+        return "!inter bells"
+    elif "!inter comemai" in comment_body or "!inter juve" in comment_body or "!inter juventus" in comment_body:
+        return "!inter comemai"
+    elif "!inter marotta" in comment_body:
+        return "!inter marotta"
+    elif "!inter marco" in comment_body:
+        return "!inter marco"
+    elif "!inter tiamocampionato" in comment_body or "!inter campionato" in comment_body or "!inter tiamo" in comment_body:
+        return "!inter tiamocampionato"
+    elif "!inter about" in comment_body:
+        return "!inter about"
+    elif "!inter injuries" in comment_body or "!inter suspensions" in comment_body:
+        return "!inter injuries/suspensions"
+    elif "!inter next" in comment_body:
+        return "!inter next"
+    elif "!inter seriea" in comment_body:
+        return "!inter seriea"
+    elif "!inter coppaitalia" in comment_body or "!inter coppa" in comment_body:
+        return "!inter coppaitalia"
+    elif "!inter clubworldcup" in comment_body or "!inter cwc" in comment_body:
+        return "!inter clubworldcup"
+    elif "!inter championsleague" in comment_body or "!inter cl" in comment_body:
+        return "!inter championsleague"
+    elif "!inter toggletransferdetection" in comment_body and comment_author in approved_users:
+        return "!inter toggletransferdetection"
+    elif "!inter transferdetectionstatus" in comment_body and comment_author in approved_users:
+        return "!inter transferdetectionstatus"
+    elif "!inter pre" in comment_body:
+        return "!inter pre"
+    elif "!inter live" in comment_body:
+        return "!inter live"
+    elif "!inter post" in comment_body:
+        return "!inter post"
+    elif "!inter sidebar" in comment_body:
+        return "!inter sidebar"
+    elif "!inter" in comment_body:
+        return "invalid"
+    return None
+
+
+def current_resolve_command(comment_body: str) -> str:
+    command = resolve_command(comment_body)
+    return command.name if command else None
+
+
+# Match day comment stream: mostly chatter, roughly one in ten comments contains a command.
+def get_corpus() -> list:
+    generator = random.Random(1908)
+    corpus = []
+    for _ in range(CORPUS_SIZE):
+        comment_body = " ".join(generator.sample(CHATTER, generator.randint(1, 3)))
+        if generator.random() < 0.1:
+            comment_body += " " + generator.choice(COMMANDS)
+        corpus.append(comment_body.lower())
+    return corpus
+
+
+def run() -> None:
+    corpus = get_corpus()
+    assert [legacy_resolve_command(comment_body, "", []) for comment_body in corpus] == [current_resolve_command(comment_body) for comment_body in corpus]
+
+    for label, resolve in (("legacy", lambda comment_body: legacy_resolve_command(comment_body, "", [])), ("current", current_resolve_command)):
+        seconds = min(timeit.repeat(lambda: [resolve(comment_body) for comment_body in corpus], number=1, repeat=ROUNDS))
+        print(f"{label:>8}: {seconds / CORPUS_SIZE * 1e6:6.2f} µs per comment ({CORPUS_SIZE} comments)")
+
+
+if __name__ == "__main__":
+    run()
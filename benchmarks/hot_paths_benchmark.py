@@ -0,0 +1,186 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Final
+from unittest import mock
+
+from reddit_bot.benchmarks.comment_dispatch_benchmark import get_corpus
+from reddit_bot.benchmarks.submission_rules_benchmark import get_batches
+from reddit_bot.config import config
+from reddit_bot.data import variables
+from reddit_bot.replay.api_stub import RapidApiStub
+from reddit_bot.replay.fake_reddit import FakeComment, FakeReddit, FakeRedditor, FakeSubmission
+from reddit_bot.replay.match_day import isolated_bot_state
+from reddit_bot.replay.timeline import SECOND_HALF_START, MatchTimeline, ReplayClock, load_recording
+from reddit_bot.util import format_util, rapidapi_client_util, rapidapi_util, reddit_comment_util, reddit_match_thread_util, reddit_sidebar_util, reddit_submission_util, storage_util
+from reddit_bot.util.ledger_util import ProcessedItemLedger
+from reddit_bot.util.logging_util import logger
+from reddit_bot.util.rate_limit_util import KeyedTokenBucket
+from reddit_bot.util.submission_state_util import SubmissionStateIndex
+
+BASELINES_PATH: Final[str] = os.path.join(os.path.dirname(__file__), "baselines.json")
+ROUNDS: Final[int] = 20
+COMMENTS: Final[int] = 1000
+COMMENT_AUTHORS: Final[int] = 200
+LATE_GAME_TIME: Final[int] = SECOND_HALF_START + 43 * 60  # 88th minute, all goals scored and lineups and statistics available.
+
+# Allowed deviation from baselines. Timings vary between machines and runs, so throughput only fails when it drops a lot.
+# API and Reddit calls are deterministic and fail on any increase.
+OPS_TOLERANCE: Final[float] = 0.5
+MEMORY_TOLERANCE: Final[float] = 0.25
+
+
+# Benchmarked operation. Setup runs before each operation and isn't measured, its result is passed to the operation.
+class Case:
+    def __init__(self, name: str, operation, setup=lambda: None, rounds: int = ROUNDS):
+        self.name = name
+        self.operation = operation
+        self.setup = setup
+        self.rounds = rounds
+
+
+def clear_caches() -> None:
+    rapidapi_client_util.response_cache.clear()
+    rapidapi_util.rendered_replies.clear()
+
+
+# Network is stubbed with recordings and the live fixture at the 88th minute, storage is in memory. Caches are cleared before every operation,
+# so that each one issues the API calls it would after the cache expired (comments and submissions then share the cache within the batch).
+@contextlib.contextmanager
+def stubbed_bot(stub: RapidApiStub, clock: ReplayClock):
+    with isolated_bot_state(clock), mock.patch.object(rapidapi_client_util, "_get_with_retries", stub.get_http_response):
+        logger.disabled = True
+        try:
+            yield
+        finally:
+            logger.disabled = False
+
+
+def get_cases(stub: RapidApiStub, reddit_instance: FakeReddit) -> list[Case]:
+    corpus = get_corpus()[:COMMENTS]
+    batch = get_batches()[0]
+    live_match_thread = FakeSubmission(reddit_instance, "[Match Thread] Inter vs AC Milan", "", reddit_instance.user)
+
+    def setup_comments() -> list:
+        clear_caches()
+        storage_util.execute("DELETE FROM processed_items")
+        reddit_comment_util.processed_comments = ProcessedItemLedger()
+        reddit_comment_util.command_rate_limiter = KeyedTokenBucket(config.Reddit.COMMAND_USER_RATE_LIMIT, config.Reddit.COMMAND_USER_RATE_PERIOD)
+        return [FakeComment(reddit_instance, live_match_thread, FakeRedditor(f"user_{index % COMMENT_AUTHORS}"), comment_body) for index, comment_body in enumerate(corpus)]
+
+    def process_comments(comments: list) -> None:
+        for comment in comments:
+            reddit_comment_util.process_comment(reddit_instance, comment)
+
+    def setup_submissions() -> list:
+        storage_util.execute("DELETE FROM submission_state")
+        reddit_submission_util.submission_states = SubmissionStateIndex()
+        submissions = []
+        for title, selftext, url, link_flair_text, saved in batch:
+            submission = FakeSubmission(reddit_instance, title, selftext, FakeRedditor("user"), url, link_flair_text)
+            submission.saved = saved
+            submissions.append(submission)
+        return submissions
+
+    def process_submissions(submissions: list) -> None:
+        for submission in submissions:
+            reddit_submission_util._process_submissions(submission)
+
+    def setup_match_thread_update() -> None:
+        clear_caches()
+        reddit_match_thread_util.live_match_model.reset()
+        variables.MatchThreadVariables.live_match_football_api_id = stub.timeline.fixture_id
+        variables.MatchThreadVariables.live_match_reddit_submission_id = live_match_thread.id
+        variables.MatchThreadVariables.live_match_content_hash = ""
+        reddit_instance.submissions[live_match_thread.id] = live_match_thread
+
+    return [
+        Case(f"process_comments[{COMMENTS}]", process_comments, setup_comments, rounds=5),
+        Case(f"process_submissions[{len(batch)}]", process_submissions, setup_submissions),
+        Case("update_match_thread[late_game]", lambda _: reddit_match_thread_util.update_match_thread(reddit_instance), setup_match_thread_update),
+        Case("update_sidebar", lambda _: reddit_sidebar_util.update_sidebar(reddit_instance), clear_caches),
+        Case("add_league_table[serie_a]", lambda _: format_util.add_league_table("", config.FootballRapidApi.FOOTBALL_RAPID_API_SERIE_A_ID, "Serie A"), clear_caches),
+        Case("add_knockout_stages[coppa_italia]", lambda _: format_util.add_knockout_stages("", config.FootballRapidApi.FOOTBALL_RAPID_API_COPPA_ITALIA_ID, "Coppa Italia"), clear_caches),
+    ]
+
+
+# Returns throughput, peak memory allocated during an operation and API and Reddit calls it issued.
+def measure(case: Case, stub: RapidApiStub, reddit_instance: FakeReddit) -> dict:
+    timings = []
+    for _ in range(case.rounds):
+        arguments = case.setup()
+        start = time.perf_counter()
+        case.operation(arguments)
+        timings.append(time.perf_counter() - start)
+
+    # Calls and memory are measured on a separate operation, tracing allocations slows it down.
+    arguments = case.setup()
+    api_calls, reddit_calls = sum(stub.requests.values()), len(reddit_instance.calls)
+    tracemalloc.start()
+    case.operation(arguments)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "ops_per_sec": round(1 / min(timings), 1),
+        "peak_memory_kib": round(peak_memory / 1024, 1),
+        "api_calls": sum(stub.requests.values()) - api_calls,
+        "reddit_calls": len(reddit_instance.calls) - reddit_calls,
+    }
+
+
+def get_regressions(name: str, result: dict, baseline: dict) -> list[str]:
+    regressions = []
+    if result["ops_per_sec"] < baseline["ops_per_sec"] * (1 - OPS_TOLERANCE):
+        regressions.append(f"{name}: {result['ops_per_sec']} ops/sec, baseline {baseline['ops_per_sec']} ops/sec")
+    if result["peak_memory_kib"] > baseline["peak_memory_kib"] * (1 + MEMORY_TOLERANCE):
+        regressions.append(f"{name}: {result['peak_memory_kib']} KiB peak memory, baseline {baseline['peak_memory_kib']} KiB")
+    for calls, label in (("api_calls", "API calls"), ("reddit_calls", "Reddit calls")):
+        if result[calls] > baseline[calls]:
+            regressions.append(f"{name}: {result[calls]} {label} per operation, baseline {baseline[calls]}")
+    return regressions
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the bot's hot paths against recorded Football Rapid API payloads.")
+    parser.add_argument("--update-baselines", action="store_true", help="Store the results as new baselines instead of comparing with them.")
+    parser.add_argument("--case", help="Only run cases whose name contains this text.")
+    arguments = parser.parse_args()
+
+    clock = ReplayClock(LATE_GAME_TIME)
+    stub = RapidApiStub(MatchTimeline(load_recording("fixture_live"), clock))
+    reddit_instance = FakeReddit()
+    with stubbed_bot(stub, clock):
+        results = {case.name: measure(case, stub, reddit_instance) for case in get_cases(stub, reddit_instance) if not arguments.case or arguments.case in case.name}
+
+    for name, result in results.items():
+        print(f"{name:>36}: {result['ops_per_sec']:9.1f} ops/sec, {result['peak_memory_kib']:8.1f} KiB peak, {result['api_calls']:3} API calls, {result['reddit_calls']:4} Reddit calls per operation")
+
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH, encoding="utf-8") as file:
+            baselines = json.load(file)
+
+    if arguments.update_baselines:
+        baselines.update(results)
+        with open(BASELINES_PATH, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=2)
+            file.write("\n")
+        print(f"Stored baselines of {len(results)} cases in {BASELINES_PATH}.")
+        return
+
+    missing_baselines = [name for name in results if name not in baselines]
+    if missing_baselines:
+        print(f"\nNo baselines for: {', '.join(missing_baselines)}, store them with --update-baselines.")
+    regressions = [regression for name, result in results.items() if name in baselines for regression in get_regressions(name, result, baselines[name])]
+    if regressions:
+        print("\nRegressions against baselines:\n" + "\n".join(regressions))
+        sys.exit(1)
+    print("\nNo regressions against baselines.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,71 @@
+import json
+import os
+import re
+import timeit
+from typing import Final
+
+from reddit_bot.util.format_util import get_safe_name_str
+
+RECORDING_PATH: Final[str] = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "recordings", "fixture_live.json")
+TICKS: Final[int] = 2000
+
+
+# Previous implementation, which was nested inside update_match_thread and rebuilt its table and regex on every call.
+def legacy_get_safe_name_str(name, default="Unknown"):
+    MOJIBAKE_MAP: Final[dict[str, str]] = {
+        'Ã‡': 'Ç', 'Ã§': 'ç', 'Ã¼': 'ü', 'Ã¤': 'ä', 'Ã¶': 'ö', 'ÃŸ': 'ß',
+        'Ã©': 'é', 'Ã¨': 'è', 'Ãª': 'ê', 'Ã«': 'ë', 'Ã¡': 'á', 'Ã ': 'à',
+        'Ã¢': 'â', 'Ã£': 'ã', 'Ã±': 'ñ', 'Ã³': 'ó', 'Ã²': 'ò', 'Ã´': 'ô',
+        'Ãµ': 'õ', 'Ã¸': 'ø', 'Ã¥': 'å', 'Ã‰': 'É', 'Ãœ': 'Ü', 'Ã–': 'Ö',
+        'Ã„': 'Ä', 'â€™': "'", 'â€“': '-', 'Ã®': 'î', 'Ã¯': 'ï', 'Ã¬': 'ì',
+        'Ã­': 'í', 'Ã¿': 'ÿ', 'Ã½': 'ý', 'Å¡': 'š', 'Å¾': 'ž', 'Ä‡': 'ć',
+        'Å‚': 'ł', 'Ä™': 'ę', 'Å„': 'ń', 'Åº': 'ź', 'Ä…': 'ą', 'Ä': 'č',
+        'Å¥': 'ť', 'ÄŸ': 'ğ', 'Ä±': 'ı', 'ÅŸ': 'ş'
+    }
+    MOJIBAKE_REGEX: Final[re.Pattern] = re.compile('|'.join(map(re.escape, MOJIBAKE_MAP)))
+    MOJIBAKE_MARKERS: Final[tuple[str, ...]] = ('Ã', 'Â', 'Ä')
+
+    if name is None or name == "null":
+        return default
+    if isinstance(name, bytes):
+        name = name.decode('utf-8', errors='replace')
+    else:
+        name = str(name)
+    if any(marker in name for marker in MOJIBAKE_MARKERS):
+        name = MOJIBAKE_REGEX.sub(lambda m: MOJIBAKE_MAP[m.group(0)], name)
+        if any(marker in name for marker in MOJIBAKE_MARKERS):
+            try:
+                name = name.encode('latin1').decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+    return name
+
+
+# Names normalized during a single live match thread update, in the same order as update_match_thread looks them up.
+def get_tick_names(fixture: dict) -> list:
+    names = [fixture["teams"]["home"]["name"], fixture["teams"]["away"]["name"], fixture["fixture"]["venue"]["name"], fixture["fixture"]["referee"]]
+    for event in fixture["events"]:
+        if event["type"] == "Goal":
+            names.append(event["player"]["name"])
+    for line_up in fixture["lineups"]:
+        names.extend(player["player"]["name"] for player in line_up["startXI"] + line_up["substitutes"])
+        names.append(line_up["coach"]["name"])
+    for event in fixture["events"]:
+        names.extend([event["team"]["name"], event["player"]["name"], event["assist"]["name"]])
+    names.append(fixture["league"]["name"])
+    return names
+
+
+def run() -> None:
+    with open(RECORDING_PATH, encoding="utf-8") as recording:
+        fixture = json.load(recording)["response"][0]
+    names = get_tick_names(fixture)
+    assert [legacy_get_safe_name_str(name) for name in names] == [get_safe_name_str(name) for name in names]
+
+    for label, normalize in (("legacy", legacy_get_safe_name_str), ("current", get_safe_name_str)):
+        seconds = timeit.timeit(lambda: [normalize(name) for name in names], number=TICKS)
+        print(f"{label:>8}: {seconds / TICKS * 1e6:8.1f} µs per tick ({len(names)} names)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,234 @@
+import random
+import re
+import time
+from typing import Final
+
+from reddit_bot.config import config
+from reddit_bot.data import resources, variables
+from reddit_bot.util import reddit_submission_util
+
+BATCH_SIZE: Final[int] = 100
+BATCHES: Final[int] = 20
+ROUNDS: Final[int] = 20
+
+FLAIRS: Final[list] = [None] * 6 + ["News", "Discussion", "Transfer Market", "Removed - Rules", "Removed - Duplicate", "Removed - Low Effort"]
+TITLES: Final[list[str]] = [
+    "Barella extends his contract until 2029",
+    "Official: Inter sign new goalkeeper from Serie B",
+    "Romano: Inter in talks for a new centre back",
+    "Where can I buy tickets for the derby?",
+    "Join our discord for live match chat",
+    "Inzaghi press conference ahead of the Champions League game",
+    "Free crypto airdrop for all Inter fans",
+    "Lautaro named Serie A player of the month",
+    "Match day photos from San Siro",
+    "Tactical analysis: how Inter build up from the back",
+    "Post match discussion",
+]
+URLS: Final[list] = [
+    "https://www.reddit.com/r/{}/comments/{}/",
+    "https://www.reddit.com/r/{}/comments/{}/",
+    "https://i.redd.it/{}{}.jpeg",
+    "https://i.redd.it/{}{}.jpeg",
+    "https://www.inter.it/en/news/{}-{}",
+    "https://x.com/fabrizioromano/status/{}{}",
+    "https://www.gazzetta.it/calcio/serie-a/inter/{}-{}.shtml",
+    "https://discord.gg/{}{}",
+]
+# Keyword patterns in the form previously used in resources.
+LEGACY_TRANSFER_KEYWORDS: Final[str] = "(" + "|".join(resources.Keywords.TRANSFER) + ")"
+LEGACY_TICKET_KEYWORDS: Final[str] = "(" + "|".join(resources.Keywords.TICKET) + ")"
+LEGACY_SPAM_KEYWORDS: Final[str] = "(" + "|".join(resources.Keywords.SPAM) + ")"
+TEXTS: Final[list[str]] = ["", "", "Thoughts on this? I think it's a great move for the club.", "Link in the comments, let me know if you have any tickets left."]
+
+
+class RecordingModeration:
+    def __init__(self, calls: list):
+        self._calls = calls
+
+    def flair(self, flair_template_id):
+        self._calls.append(("flair", flair_template_id))
+
+    def remove(self, spam):
+        self._calls.append(("remove", spam))
+
+    def distinguish(self, sticky):
+        self._calls.append(("distinguish", sticky))
+
+
+class RecordingComment:
+    def __init__(self, calls: list):
+        self.id = "c1"
+        self.mod = RecordingModeration(calls)
+
+
+# Submission stand-in that records the moderation calls made by the processing, so that both implementations can be compared.
+class RecordingSubmission:
+    def __init__(self, title: str, selftext: str, url, link_flair_text, saved: bool):
+        self.author = None
+        self.title = title
+        self.selftext = selftext
+        self.url = url
+        self.link_flair_text = link_flair_text
+        self.saved = saved
+        self.calls = []
+        self.mod = RecordingModeration(self.calls)
+
+    def reply(self, body):
+        self.calls.append(("reply", body))
+        return RecordingComment(self.calls)
+
+    def save(self):
+        self.calls.append(("save",))
+
+
+def log(message: str) -> None:
+    pass
+
+
+# Previous implementation, a chain of independent flair comparisons and uncompiled case-insensitive searches on each field.
+def legacy_process_submissions(submission) -> None:
+    # Ignore submissions that are posted by the bot.
+    if submission.author and submission.author.name == config.Reddit.BOT_REDDIT_USER:
+        return
+
+    log("Processing submission: " + submission.title)
+
+    # Get submission title and URL.
+    title = submission.title.lower()
+    text = submission.selftext.lower()
+    url = submission.url.lower() if submission.url else None
+
+    # Remove submissions and add explanatory comment if the submission was tagged with "Removed" flairs by moderators.
+    if submission.link_flair_text == "Removed - Rules":
+        comment = submission.reply(resources.SubmissionReplies.REMOVED_RULES)
+        if comment and comment.id:
+            comment.mod.distinguish(sticky=True)
+        submission.mod.remove(spam=True)
+        log("Removed post due to rules: " + submission.title)
+
+    if submission.link_flair_text == "Removed - Duplicate":
+        comment = submission.reply(resources.SubmissionReplies.REMOVED_DUPLICATE)
+        if comment and comment.id:
+            comment.mod.distinguish(sticky=True)
+        submission.mod.remove(spam=True)
+        log("Removed post due to duplication: " + submission.title)
+
+    if submission.link_flair_text == "Removed - Weekly Free Talk Thread":
+        comment = submission.reply(resources.SubmissionReplies.REMOVED_WEEKLY_FREE_TALK_THREAD)
+        if comment and comment.id:
+            comment.mod.distinguish(sticky=True)
+        submission.mod.remove(spam=True)
+        log("Removed post due to weekly free talk thread content: " + submission.title)
+
+    if submission.link_flair_text == "Removed - Source":
+        comment = submission.reply(resources.SubmissionReplies.REMOVED_SOURCE)
+        if comment and comment.id:
+            comment.mod.distinguish(sticky=True)
+        submission.mod.remove(spam=True)
+        log("Removed post due to source issues: " + submission.title)
+
+    if submission.link_flair_text == "Removed - Match Thread":
+        comment = submission.reply(resources.SubmissionReplies.REMOVED_MATCH_THREAD)
+        if comment and comment.id:
+            comment.mod.distinguish(sticky=True)
+        submission.mod.remove(spam=True)
+        log("Removed post due to match thread content: " + submission.title)
+
+    if submission.link_flair_text == "Removed - Low Effort":
+        comment = submission.reply(resources.SubmissionReplies.REMOVED_LOW_EFFORT)
+        if comment and comment.id:
+            comment.mod.distinguish(sticky=True)
+        submission.mod.remove(spam=True)
+        log("Removed post due to low effort: " + submission.title)
+
+    # Post the transfer reliability tier list comment when a submission is tagged as 'Transfer Market' by moderators.
+
+    if submission.link_flair_text == "Transfer Market" and not submission.saved:
+        comment = submission.reply(resources.SubmissionReplies.MOD_FLAIR_TRANSFER_MARKET)
+        if comment and comment.id:
+            comment.mod.distinguish(sticky=True)
+        submission.save()  # This is necessary to prevent multiple actions being performed by the bot on a single submission. Saved submissions are then filtered out in the future.
+        log("Added transfer reliability tier list to transfer market post: " + submission.title)
+
+    # Flair or remove submissions if they match certain content.
+    if url and not submission.link_flair_text:
+
+        # Remove Discord promotions/questions.
+        if (url and "discord.gg" in url) or (text and "discord.gg" in text) or "discord" in title:
+            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
+            comment = submission.reply(resources.SubmissionReplies.DISCORD)
+            if comment and comment.id:
+                comment.mod.distinguish(sticky=True)
+            submission.mod.remove(spam=True)
+            log("Removed post due to Discord keywords: " + submission.title)
+
+        # Remove Twitter/X posts.
+        if url and "x.com" in url:
+            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
+            comment = submission.reply(resources.SubmissionReplies.TWITTER)
+            if comment and comment.id:
+                comment.mod.distinguish(sticky=True)
+            submission.mod.remove(spam=True)
+            log("Removed post due to X/Twitter link: " + submission.title)
+
+        # Tag transfer news with flair and add comment.
+        if variables.BotSettings.transfer_news_detection and not submission.saved and ((url and re.search(LEGACY_TRANSFER_KEYWORDS, url, re.IGNORECASE)) or re.search(LEGACY_TRANSFER_KEYWORDS, title, re.IGNORECASE)):
+            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.TRANSFER_MARKET)
+            comment = submission.reply(resources.SubmissionReplies.IDENTIFIED_TRANSFER_MARKET)
+            if comment and comment.id:
+                comment.mod.distinguish(sticky=True)
+            submission.save()  # This is necessary to prevent multiple actions being performed by the bot on a single submission. Saved submissions are then filtered out in the future.
+            log("Added flair to post due to transfer market content: " + submission.title)
+
+        # Remove ticket question threads.
+        if re.search(LEGACY_TICKET_KEYWORDS, title, re.IGNORECASE) or (text and re.search(LEGACY_TICKET_KEYWORDS, text, re.IGNORECASE)):
+            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
+            comment = submission.reply(resources.SubmissionReplies.TICKETS)
+            if comment and comment.id:
+                comment.mod.distinguish(sticky=True)
+            submission.mod.remove(spam=True)
+            log("Removed post due to tickets keywords: " + submission.title)
+
+        # Remove spam threads.
+        if (url and re.search(LEGACY_SPAM_KEYWORDS, url, re.IGNORECASE)) or (text and re.search(LEGACY_SPAM_KEYWORDS, text, re.IGNORECASE)) or re.search(LEGACY_SPAM_KEYWORDS, title, re.IGNORECASE):
+            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
+            comment = submission.reply(resources.SubmissionReplies.SPAM)
+            if comment and comment.id:
+                comment.mod.distinguish(sticky=True)
+            submission.mod.remove(spam=True)
+            log("Removed post due to spam keywords: " + submission.title)
+
+
+def get_batches() -> list:
+    generator = random.Random(1908)
+    return [[(generator.choice(TITLES), generator.choice(TEXTS), generator.choice(URLS).format(generator.randint(0, 999), generator.randint(0, 999)), generator.choice(FLAIRS),
+              generator.random() < 0.3) for _ in range(BATCH_SIZE)] for _ in range(BATCHES)]
+
+
+def get_submissions(batches: list) -> list:
+    return [RecordingSubmission(*submission_fields) for batch in batches for submission_fields in batch]
+
+
+def run() -> None:
+    reddit_submission_util.logger.disabled = True
+    batches = get_batches()
+    legacy_submissions, current_submissions = get_submissions(batches), get_submissions(batches)
+    for legacy_submission, current_submission in zip(legacy_submissions, current_submissions):
+        legacy_process_submissions(legacy_submission)
+        reddit_submission_util._moderate_submission(current_submission)
+    assert [submission.calls for submission in legacy_submissions] == [submission.calls for submission in current_submissions]
+
+    for label, process in (("legacy", legacy_process_submissions), ("current", reddit_submission_util._moderate_submission)):
+        timings = []
+        for _ in range(ROUNDS):
+            submissions = get_submissions(batches)
+            start = time.perf_counter()
+            for submission in submissions:
+                process(submission)
+            timings.append(time.perf_counter() - start)
+        print(f"{label:>8}: {min(timings) / BATCHES * 1e3:6.3f} ms per batch of {BATCH_SIZE} submissions")
+
+
+if __name__ == "__main__":
+    run()
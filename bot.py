@@ -1,4 +1,7 @@
+import functools
+import math
 import os
+import signal
 import sys
 import threading
 from typing import Final
@@ -6,11 +9,50 @@ from typing import Final
 import praw
 from dotenv import load_dotenv, find_dotenv
 
-from reddit_bot.util import reddit_comment_util, reddit_submission_util, reddit_match_thread_util, reddit_sidebar_util
+from reddit_bot.config import config
+from reddit_bot.util import match_thread_state_util, metrics_util, reddit_comment_util, reddit_submission_util, reddit_match_thread_util, reddit_sidebar_util, storage_util
+from reddit_bot.util.comment_worker_util import CommentWorkerPool
 from reddit_bot.util.logging_util import logger
+from reddit_bot.util.reddit_write_util import reddit_write_queue
+from reddit_bot.util.scheduler_util import Scheduler
 
 
 def run_inter_bot() -> None:
+    reddit_instance = _create_reddit_instance()
+    metrics_server = metrics_util.start_server()
+    reddit_write_queue.start(reddit_instance)
+
+    # Comments are handled by a pool of workers, so that a slow command doesn't hold up reading of the comment stream.
+    comment_worker_pool = CommentWorkerPool(functools.partial(reddit_comment_util.process_comment, reddit_instance), config.Reddit.COMMENT_WORKERS, config.Reddit.COMMENT_QUEUE_SIZE)
+    comment_worker_pool.start()
+    metrics_util.comment_queue_depth.set_function(comment_worker_pool.get_queue_depth)
+
+    # Create a thread with a comment stream. It will immediately pick up any new comment in the comment stream and hand it over to the workers.
+    comment_stream_thread = threading.Thread(target=reddit_comment_util.process_comments_organizer, args=(reddit_instance, comment_worker_pool.submit), daemon=True)
+    comment_stream_thread.start()
+    logger.info("Started thread for process_comments_organizer.")
+
+    # All periodic work is run by a single scheduler instead of a thread per task.
+    scheduler = Scheduler(config.Reddit.SCHEDULER_WORKERS)
+    _add_jobs(scheduler, reddit_instance)
+    scheduler.add_job("log_comment_worker_stats", comment_worker_pool.log_stats, (), config.Reddit.SCHEDULER_STATS_LOG_INTERVAL, initial_delay=config.Reddit.SCHEDULER_STATS_LOG_INTERVAL)
+    scheduler.start()
+
+    # Block until the process is asked to terminate, then let running jobs finish before exiting.
+    shutdown_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: shutdown_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: shutdown_event.set())
+    shutdown_event.wait()
+    logger.info("Stopping Inter bot.")
+    scheduler.stop()
+    comment_worker_pool.stop()
+    reddit_write_queue.stop()
+    if metrics_server is not None:
+        metrics_server.stop()
+    storage_util.close()
+
+
+def _create_reddit_instance() -> praw.Reddit:
     logger.info("Starting Inter bot!")
 
     if find_dotenv():
@@ -35,7 +77,7 @@ def run_inter_bot() -> None:
         sys.exit(1)  # Exit the program if any of the required environment variables are missing
 
     # Creates a Reddit instance.
-    reddit_instance = praw.Reddit(
+    return praw.Reddit(
         client_id=os.environ.get("REDDIT_CLIENT_ID"),
         client_secret=os.environ.get("REDDIT_CLIENT_SECRET"),
         user_agent=os.environ.get("REDDIT_USER_AGENT"),
@@ -43,30 +85,37 @@ def run_inter_bot() -> None:
         password=os.environ.get("REDDIT_PASSWORD")
     )
 
-    # Create a thread with a comment stream. It will immediately pick up any new comment in the comment stream.
-    t1 = threading.Thread(target=reddit_comment_util.process_comments_organizer, args=(reddit_instance,))
-    t1.start()
-    logger.info("Started thread 1 for process_comments_organizer.")
-
-    # Create a thread with submission processing. Unlike with comments, this is not implemented with native streaming capability due to inability to implement removal flair feature. It works by fetching batches of latest posts.
-    t2 = threading.Thread(target=reddit_submission_util.process_submissions_organizer, args=(reddit_instance,))
-    t2.start()
-    logger.info("Started thread 2 for process_submissions_organizer.")
-
-    # Create a thread with upcoming match thread analyzer that will check for any upcoming games and create pre-match and match threads.
-    t3 = threading.Thread(target=reddit_match_thread_util.match_threads_creator, args=(reddit_instance,))
-    t3.start()
-    logger.info("Started thread 3 for match_threads_creator.")
-
-    # Create a thread for updating match threads when a match is live.
-    t4 = threading.Thread(target=reddit_match_thread_util.match_threads_updater, args=(reddit_instance,))
-    t4.start()
-    logger.info("Started thread 4 for match_threads_updater.")
-
-    # Create a thread for updating subreddit's sidebar.
-    t5 = threading.Thread(target=reddit_sidebar_util.sidebar_updater, args=(reddit_instance,))
-    t5.start()
-    logger.info("Started thread 5 for sidebar_updater.")
+
+# Registers periodic jobs with the scheduler.
+def _add_jobs(scheduler: Scheduler, reddit_instance) -> None:
+    # Submission processing. Unlike with comments, this is not implemented with native streaming capability due to inability to implement removal flair feature. It works by fetching batches of latest posts.
+    scheduler.add_job("process_submissions", reddit_submission_util.process_submissions_batch, (reddit_instance,), config.Reddit.SUBMISSION_CHECK_INTERVAL, _get_jitter(config.Reddit.SUBMISSION_CHECK_INTERVAL))
+
+    # Upcoming match analyzer that will check for any upcoming games and create pre-match and match threads.
+    scheduler.add_job("check_match_threads", reddit_match_thread_util.check_match_threads, (reddit_instance,), config.Reddit.MATCH_THREAD_CHECK_INTERVAL, _get_jitter(config.Reddit.MATCH_THREAD_CHECK_INTERVAL))
+
+    # Updating match threads when a match is live. If the bot was restarted mid-match, updates resume right away, otherwise the job is parked
+    # until a live match thread is created.
+    live_match_restored = match_thread_state_util.restore()
+    update_initial_delay = 0 if live_match_restored else math.inf
+    scheduler.add_job("update_live_match_thread", reddit_match_thread_util.update_live_match_thread, (reddit_instance,), config.Reddit.MATCH_THREAD_UPDATE_INTERVAL, initial_delay=update_initial_delay)
+    reddit_match_thread_util.wake_live_update_job = functools.partial(scheduler.wake, "update_live_match_thread")
+
+    # Updating subreddit's sidebar.
+    scheduler.add_job("refresh_sidebar", reddit_sidebar_util.refresh_sidebar, (reddit_instance,), config.Reddit.SIDEBAR_UPDATE_INTERVAL, _get_jitter(config.Reddit.SIDEBAR_UPDATE_INTERVAL))
+
+    # Pruning of processed comments ledger.
+    scheduler.add_job("prune_processed_comments", reddit_comment_util.processed_comments.prune, (), config.Storage.PRUNE_INTERVAL, initial_delay=config.Storage.PRUNE_INTERVAL)
+
+    # Logging of scheduler's own job timings.
+    scheduler.add_job("log_scheduler_stats", scheduler.log_stats, (), config.Reddit.SCHEDULER_STATS_LOG_INTERVAL, initial_delay=config.Reddit.SCHEDULER_STATS_LOG_INTERVAL)
+
+    # Logging of Reddit write queue depth and waiting times per priority.
+    scheduler.add_job("log_reddit_write_stats", reddit_write_queue.log_stats, (), config.Reddit.SCHEDULER_STATS_LOG_INTERVAL, initial_delay=config.Reddit.SCHEDULER_STATS_LOG_INTERVAL)
+
+
+def _get_jitter(interval: int) -> float:
+    return interval * config.Reddit.SCHEDULER_JITTER_RATIO
 
 
 def main() -> None:
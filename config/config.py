@@ -23,7 +23,7 @@ class FootballRapidApi:
         "x-rapidapi-key": os.environ.get("RAPID_API_KEY")
     }
 
-    FOOTBALL_RAPID_API_BASE_ENDPOINT: Final[str] = "https://api-football-v1.p.rapidapi.com"
+    FOOTBALL_RAPID_API_BASE_ENDPOINT: Final[str] = os.environ.get("RAPID_API_BASE_URL", "https://api-football-v1.p.rapidapi.com")  # Can point to a local replay stub.
     FOOTBALL_RAPID_API_V3_FIXTURES_ENDPOINT: Final[str] = FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/fixtures?league={}&season={}&team={}"
     FOOTBALL_RAPID_API_V3_NEXT_TEAM_FIXTURES_ENDPOINT: Final[str] = FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/fixtures?team={}&next={}"
     FOOTBALL_RAPID_API_V3_LAST_TEAM_FIXTURES_ENDPOINT: Final[str] = FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/fixtures?team={}&last={}"
@@ -32,6 +32,31 @@ class FootballRapidApi:
     FOOTBALL_RAPID_API_V3_H2H_ENDPOINT: Final[str] = FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/fixtures/headtohead?h2h={}-{}"
     FOOTBALL_RAPID_API_V3_FIXTURE_BY_ID_ENDPOINT: Final[str] = FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/fixtures?id={}"
 
+    # HTTP client config. Timeouts and backoff values are in seconds.
+    HTTP_POOL_SIZE: Final[int] = 10  # Number of kept-alive connections to Football Rapid API.
+    HTTP_CONNECT_TIMEOUT: Final[float] = 5
+    HTTP_READ_TIMEOUT: Final[float] = 20
+    HTTP_MAX_RETRIES: Final[int] = 3  # Retries on connection errors, timeouts, 429 and 5xx responses.
+    HTTP_BACKOFF_BASE: Final[float] = 1  # Doubled with every retry.
+    HTTP_BACKOFF_MAX: Final[float] = 30  # Upper bound for backoff and for honored Retry-After values.
+    FAN_OUT_WORKERS: Final[int] = 10  # Number of independent requests (e.g. sidebar sections) fetched at the same time.
+    FAN_OUT_TIMEOUT: Final[float] = 60  # Sections not fetched by then are left out, instead of delaying the rest.
+
+    # Response cache config. Time-to-live values are in seconds and are resolved per endpoint.
+    CACHE_MAX_SIZE: Final[int] = 128  # Number of responses kept in memory before least recently used ones are evicted.
+    CACHE_TTL_FIXTURE_BY_ID: Final[int] = 15  # Live match data, must stay well below match thread update interval.
+    CACHE_TTL_NEXT_FIXTURES: Final[int] = 600  # 10 minutes.
+    CACHE_TTL_FIXTURES: Final[int] = 1800  # 30 minutes - last fixtures and competition fixtures.
+    CACHE_TTL_STANDINGS: Final[int] = 300  # 5 minutes.
+    CACHE_TTL_INJURIES: Final[int] = 3600  # 1 hour.
+    CACHE_TTL_H2H: Final[int] = 86400  # 1 day.
+    RENDERED_REPLY_CACHE_MAX_SIZE: Final[int] = 32  # Number of rendered comment replies kept in memory, each for a version of its API responses.
+    RENDERED_REPLY_CACHE_TTL: Final[int] = 86400  # 1 day. Replies are re-rendered anyway when API responses change.
+
+    # Daily number of requests (resets at midnight UTC), should match the subscribed Rapid API plan. Lower priority features are served
+    # cached data once the remaining budget runs low, see quota_util.RESERVES.
+    QUOTA_DAILY_BUDGET: Final[int] = int(os.environ.get("RAPID_API_DAILY_BUDGET", "7500"))
+
     @staticmethod
     def get_fixtures_by_league_id_url(league_id: int) -> str:
         if league_id == FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID:
@@ -66,6 +91,23 @@ class FootballRapidApi:
     def get_fixture_by_id_url(fixture_id: int) -> str:
         return FootballRapidApi.FOOTBALL_RAPID_API_V3_FIXTURE_BY_ID_ENDPOINT.format(fixture_id)
 
+    @staticmethod
+    def get_cache_ttl(url: str) -> int:
+        path = url.replace(FootballRapidApi.FOOTBALL_RAPID_API_BASE_ENDPOINT, "")
+        if path.startswith("/v3/fixtures/headtohead"):
+            return FootballRapidApi.CACHE_TTL_H2H
+        if path.startswith("/v3/fixtures?id="):
+            return FootballRapidApi.CACHE_TTL_FIXTURE_BY_ID
+        if path.startswith("/v3/fixtures?") and "&next=" in path:
+            return FootballRapidApi.CACHE_TTL_NEXT_FIXTURES
+        if path.startswith("/v3/fixtures?"):
+            return FootballRapidApi.CACHE_TTL_FIXTURES
+        if path.startswith("/v3/standings"):
+            return FootballRapidApi.CACHE_TTL_STANDINGS
+        if path.startswith("/v3/injuries"):
+            return FootballRapidApi.CACHE_TTL_INJURIES
+        return 0  # Unknown endpoints are not cached.
+
 
 class Reddit:
     # Reddit config.
@@ -76,9 +118,43 @@ class Reddit:
     # Processing timings.
     MATCH_THREAD_CHECK_INTERVAL: Final[int] = 1800  # In seconds - every 30 minutes.
     MATCH_THREAD_UPDATE_INTERVAL: Final[int] = 120  # In seconds - every 2 minutes.
+    MATCH_THREAD_CHECK_MIN_INTERVAL: Final[int] = 60  # In seconds. Adaptive match thread check cadence never polls more often than this.
+    MATCH_THREAD_CHECK_MAX_INTERVAL: Final[int] = 21600  # In seconds - 6 hours. Upper bound of sleeping until the next thread creation, so that rescheduled kickoffs are noticed.
+    MATCH_THREAD_PRE_KICKOFF_UPDATE_INTERVAL: Final[int] = 300  # In seconds - live match thread updates before kickoff (lineups).
+    MATCH_THREAD_PAUSED_UPDATE_INTERVAL: Final[int] = 300  # In seconds - live match thread updates during half time or interrupted matches.
+    MATCH_THREAD_LATE_GAME_UPDATE_INTERVAL: Final[int] = 60  # In seconds - live match thread updates during stoppage time and last minutes of each half.
     SIDEBAR_UPDATE_INTERVAL: Final[int] = 14400  # In seconds - every 4 hours.
     SUBMISSION_CHECK_INTERVAL: Final[int] = 30  # In seconds.
     SUBMISSION_CHECK_BATCH_SIZE: Final[int] = 100  # Number of submissions to check in each batch.
+    SUBMISSION_FULL_SCAN_INTERVAL: Final[int] = 150  # In seconds. Batches in between only fetch submissions newer than the last seen one.
+    SUBMISSION_STATE_RETENTION: Final[int] = 2592000  # In seconds - 30 days. Older submission states are pruned from storage.
+
+    # Scheduler config.
+    SCHEDULER_WORKERS: Final[int] = 3  # Number of scheduled jobs that can run at the same time.
+    SCHEDULER_JITTER_RATIO: Final[float] = 0.05  # Maximum random delay added to each scheduled run, as a ratio of job's interval.
+    SCHEDULER_STATS_LOG_INTERVAL: Final[int] = 3600  # In seconds - every hour.
+
+    # Comment handling config.
+    COMMENT_WORKERS: Final[int] = 4  # Number of workers handling comments read from the stream. Comments in the same submission are handled by the same worker.
+    COMMENT_QUEUE_SIZE: Final[int] = 100  # Comments read from the stream but not handled yet. Stream reading pauses when the queue is full.
+    COMMAND_USER_RATE_LIMIT: Final[int] = 3  # Number of commands a user (other than approved users) can trigger within the period below.
+    COMMAND_USER_RATE_PERIOD: Final[int] = 60  # In seconds.
+
+    # Write queue config.
+    WRITE_RATE_LIMIT_RESERVE: Final[int] = 100  # Requests of Reddit's rate limit window that writes leave for reads (comment stream, listings).
+
+
+class Storage:
+    # SQLite database with bot state that has to survive restarts.
+    DATABASE_PATH: Final[str] = os.environ.get("BOT_DATABASE_PATH", "reddit_bot.db")
+    PROCESSED_ITEM_RETENTION: Final[int] = 604800  # In seconds - 7 days. Comment stream only replays the latest comments on reconnect.
+    PRUNE_INTERVAL: Final[int] = 86400  # In seconds - every day.
+
+
+class Metrics:
+    # Local HTTP endpoint serving metrics in Prometheus text format at /metrics. Port 0 disables it.
+    HOST: Final[str] = os.environ.get("BOT_METRICS_HOST", "127.0.0.1")
+    PORT: Final[int] = int(os.environ.get("BOT_METRICS_PORT", "9464"))
 
 
 if __name__ == "__main__":
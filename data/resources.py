@@ -7,13 +7,15 @@ class SubmissionFlairs:
     REMOVED_RULES: Final[str] = "f257600c-fca0-11eb-9563-c6d64032f350"
 
 
+class Keywords:
+    TRANSFER: Final[tuple[str, ...]] = ("romano", "marzio", "pedulla", "james benge", "ben jacobs", "ornstein", "plettenberg", "barzaghi", "bendoni", "marchetti", "calico mercato", "matt law", "sky", "biasin", "moretto", "schira", "togna", "gazzetta", "gds", "repubblica", "sportitalia", "corriere", "cds", "giornale", "messaggero", "fcinternews", "stampa", "sport mediaset", "tuttomercato", "guarro", "aouna", "marca", "mari")
+    TICKET: Final[tuple[str, ...]] = ("tickets", "ticket")
+    SPAM: Final[tuple[str, ...]] = ("crypto", "airdrop", "air drop", "layerzero", "l0", "laroza")
+
+
 class Regex:
-    TRANSFER_KEYWORDS: Final[
-        str] = r"(romano|marzio|pedulla|james benge|ben jacobs|ornstein|plettenberg|barzaghi|bendoni|marchetti|calico mercato|matt law|sky|biasin|moretto|schira|togna|gazzetta|gds|repubblica|sportitalia|corriere|cds|giornale|messaggero|fcinternews|stampa|sport mediaset|tuttomercato|guarro|aouna|marca|mari)"
-    TICKET_KEYWORDS: Final[str] = r"(tickets|ticket)"
-    OTHER_SUBREDDIT_KEYWORDS: Final[str] = r"(r/acmilan|r/juve)"
-    SWEAR_KEYWORDS: Final[str] = r"(retard)"
-    SPAM_KEYWORDS: Final[str] = r"(crypto|airdrop|air drop|layerzero|l0|laroza)"
+    OTHER_SUBREDDIT_KEYWORDS: Final[str] = r"(?:r/acmilan|r/juve)"
+    SWEAR_KEYWORDS: Final[str] = r"(?:retard)"
 
 
 class CommentReplies:
@@ -48,6 +50,7 @@ class CommentReplies:
     CHAMPIONS_LEAGUE_NO_INFO_FOR_THIS_SEASON: Final[str] = "🤖 Beep Boop... No fixtures have been played in Champions League this season so far."
     CLUB_WORLD_CUP_NO_INFO_FOR_THIS_SEASON: Final[str] = "🤖 Beep Boop... No fixtures have been played in FIFA Club World Cup this season so far."
     COPPA_ITALIA_NO_INFO_FOR_THIS_SEASON: Final[str] = "🤖 Beep Boop... No fixtures have been played in Coppa Italia this season so far."
+    DATA_TEMPORARILY_UNAVAILABLE: Final[str] = "🤖 Beep Boop... Sorry. Football data is temporarily unavailable, please try again later."
 
 
 class SubmissionReplies:
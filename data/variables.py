@@ -1,4 +1,6 @@
 # Global variables that are changed during runtime to bot behavior. Don't touch.
+import threading
+
 
 class MatchThreadVariables:
     # Blocks multiple pre-match thread creation. When a pre-match thread is created, it is set to True, blocking further creation. When post-match thread is posted, it is again set to false for the next game.
@@ -8,6 +10,9 @@ class MatchThreadVariables:
     # When this flag is set to True, it will trigger match thread updates.
     live_match_thread_created: bool = False
 
+    # Set together with live_match_thread_created flag and cleared when post-match thread is posted. Scheduled match thread updates are skipped while this event is not set.
+    live_match_in_progress: threading.Event = threading.Event()
+
     # Football Rapid API's ID of live match that is in progress. This will be set once the game starts and unset when the game is done.
     live_match_football_api_id: int = None
 
@@ -19,6 +24,13 @@ class MatchThreadVariables:
     # This flag is needed because otherwise it would unnecessarily retry the calls even when no match events have occurred yet.
     live_match_events_already_existed: bool = False
 
+    # Fingerprint of the last content submitted to live match thread. Reddit edits are skipped when the rendered content didn't change.
+    live_match_content_hash: str = ""
+
+    # Counters of performed and skipped live match thread edits, logged with every update and reset after post-match discussion thread is created.
+    live_match_edits_performed: int = 0
+    live_match_edits_skipped: int = 0
+
     # Title of post-match discussion thread. This will be set during live match thread and unset after post-match discussion thread is created.
     post_match_thread_title: str = ""
 
@@ -26,6 +38,15 @@ class MatchThreadVariables:
     post_match_thread_content: str = ""
 
 
+class SubmissionVariables:
+    # Fullnames of the two newest submissions seen in batches. Batches between full scans only fetch submissions newer than the previous one.
+    newest_submission_fullname: str = None
+    previous_submission_fullname: str = None
+
+    # Time (monotonic) of the last full scan of the latest batch of submissions.
+    last_full_scan: float = 0.0
+
+
 class BotSettings:
     # If enabled, bot will automatically tag transfer market submissions with flair and add a news reliability tier comment.
     transfer_news_detection: bool = False
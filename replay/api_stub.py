@@ -0,0 +1,145 @@
+import argparse
+import collections
+import contextlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from reddit_bot.config import config
+from reddit_bot.replay.timeline import MatchTimeline, ReplayClock, load_recording
+
+
+def _get_envelope(endpoint: str, parameters: dict, response: list) -> dict:
+    return {"get": endpoint, "parameters": parameters, "errors": [], "results": len(response), "paging": {"current": 1, "total": 1}, "response": response}
+
+
+# Local HTTP server standing in for Football Rapid API. Live fixture endpoints are served from the match timeline, the rest from recordings
+# in data/recordings (the same standings and competition fixtures are served for every league). Requests are counted per endpoint.
+class RapidApiStub:
+    def __init__(self, timeline: MatchTimeline, port: int = 0):
+        self.timeline = timeline
+        self.requests = collections.Counter()
+        self._recordings = {name: load_recording(name) for name in ("fixtures_last", "fixtures_league", "standings", "injuries", "h2h")}
+        self._lock = threading.Lock()
+        self._port = port
+        self._server = None  # Only started for serving over HTTP, responses can also be requested in-process.
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer(("127.0.0.1", self._port), self._get_handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="rapid-api-stub", daemon=True).start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    # Returns (status code, JSON payload) for the request.
+    def get_response(self, path: str, query: dict) -> tuple:
+        parameters = {key: values[0] for key, values in query.items()}
+        if path == "/v3/fixtures/headtohead":
+            endpoint, payload = "h2h", self._recordings["h2h"]
+        elif path == "/v3/fixtures" and "id" in parameters:
+            fixtures = [self.timeline.get_fixture()] if int(parameters["id"]) == self.timeline.fixture_id else []
+            endpoint, payload = "fixture_by_id", _get_envelope("fixtures", parameters, fixtures)
+        elif path == "/v3/fixtures" and "next" in parameters:
+            fixtures = [] if self.timeline.is_finished() else [self.timeline.get_fixture()]
+            endpoint, payload = "next_fixtures", _get_envelope("fixtures", parameters, fixtures)
+        elif path == "/v3/fixtures" and "last" in parameters:
+            endpoint, payload = "last_fixtures", self._recordings["fixtures_last"]
+        elif path == "/v3/fixtures" and "league" in parameters:
+            endpoint, payload = "league_fixtures", self._recordings["fixtures_league"]
+        elif path == "/v3/standings":
+            endpoint, payload = "standings", self._recordings["standings"]
+        elif path == "/v3/injuries":
+            endpoint, payload = "injuries", self._recordings["injuries"]
+        else:
+            endpoint, payload = "unknown", None
+
+        with self._lock:
+            self.requests[endpoint] += 1
+        if payload is None:
+            return 404, {"message": f"Endpoint '{path}' does not exist"}
+        return 200, payload
+
+    # Response to the URL as requests would return it, for stubbing out the network without sending requests to the server.
+    def get_http_response(self, url: str) -> requests.Response:
+        split_url = urlsplit(url)
+        status_code, payload = self.get_response(split_url.path, parse_qs(split_url.query))
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = url
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps(payload).encode("utf-8")
+        return response
+
+    # Sends requests of the session to Football Rapid API to this stub instead, until the context is exited.
+    @contextlib.contextmanager
+    def install(self, session: requests.Session):
+        adapters = session.adapters.copy()
+        session.mount(config.FootballRapidApi.FOOTBALL_RAPID_API_BASE_ENDPOINT, _RedirectingAdapter(config.FootballRapidApi.FOOTBALL_RAPID_API_BASE_ENDPOINT, self.base_url))
+        try:
+            yield self
+        finally:
+            session.adapters.clear()
+            session.adapters.update(adapters)
+
+    def _get_handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                status_code, payload = stub.get_response(url.path, parse_qs(url.query))
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Requests are counted instead of logged.
+
+        return Handler
+
+
+class _RedirectingAdapter(HTTPAdapter):
+    def __init__(self, source_url: str, target_url: str):
+        super().__init__()
+        self._source_url = source_url
+        self._target_url = target_url
+
+    def send(self, request, **kwargs):
+        request.url = self._target_url + request.url[len(self._source_url):]
+        return super().send(request, **kwargs)
+
+
+# Serves a replayed match in real time sped up, e.g. for running the bot against it with RAPID_API_BASE_URL set to the printed URL.
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a recorded match as a local Football Rapid API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=10, help="How many times faster than real time the match is replayed.")
+    parser.add_argument("--start", type=float, default=-65, help="Minutes relative to kickoff when the replay starts.")
+    arguments = parser.parse_args()
+
+    stub = RapidApiStub(MatchTimeline(load_recording("fixture_live"), ReplayClock(arguments.start * 60, arguments.speed)), arguments.port)
+    stub.start()
+    print(f"Serving replayed match at {stub.base_url}, press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import collections
+import itertools
+import queue
+import threading
+import time
+
+from reddit_bot.config import config
+
+
+# Author of fake submissions and comments. Like praw's Redditor, compares equal to its name, case-insensitively.
+class FakeRedditor:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __eq__(self, other) -> bool:
+        return str(other).lower() == self.name.lower()
+
+    def __hash__(self) -> int:
+        return hash(self.name.lower())
+
+
+# Stand-in for praw's authorizer, with rate limits as reported in Reddit's response headers. Unknown until set, like before the first request.
+class FakeAuth:
+    def __init__(self):
+        self.limits = {"remaining": None, "reset_timestamp": None, "used": None}
+
+
+# Stand-in for praw's Reddit instance, covering the API surface used by the bot. Submissions and comments live in memory and every
+# write (submit, edit, reply, moderation) is recorded in calls. Each write sleeps for latency seconds, to simulate Reddit API round-trips.
+class FakeReddit:
+    def __init__(self, subreddit_name: str = config.Reddit.SUBREDDIT_NAME, latency: float = 0.0):
+        self.user = FakeRedditor(config.Reddit.BOT_REDDIT_USER)
+        self.latency = latency
+        self.auth = FakeAuth()
+        self.calls = []  # (call name, target fullname or subreddit, first argument).
+        self.submissions = {}  # ID -> FakeSubmission.
+        self.comments = {}  # ID -> FakeComment.
+        self._subreddit = FakeSubreddit(self, subreddit_name)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subreddit(self, name: str):
+        return self._subreddit
+
+    def submission(self, id: str):
+        return self.submissions[id]
+
+    def count_calls(self) -> collections.Counter:
+        with self._lock:
+            return collections.Counter(name for name, _, _ in self.calls)
+
+    def record(self, name: str, target: str, argument=None) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((name, target, argument))
+
+    def get_id(self) -> str:
+        with self._lock:
+            return _to_base36(next(self._ids) + 100000)
+
+    # Posts a comment made by a user, which is also delivered to the comment stream.
+    def post_comment(self, submission, author: str, body: str):
+        comment = FakeComment(self, submission, FakeRedditor(author), body)
+        self.comments[comment.id] = comment
+        self._subreddit.stream.deliver(comment)
+        return comment
+
+
+class FakeSubreddit:
+    def __init__(self, reddit: FakeReddit, display_name: str):
+        self.display_name = display_name
+        self.description = ""
+        self.stream = FakeStream()
+        self.mod = _FakeSubredditModeration(reddit, self)
+        self._reddit = reddit
+
+    def submit(self, title: str, selftext: str = "", send_replies: bool = True, url: str = None):
+        submission = FakeSubmission(self._reddit, title, selftext, author=self._reddit.user, url=url)
+        self._reddit.submissions[submission.id] = submission
+        self._reddit.record("submit", submission.fullname, title)
+        return submission
+
+    # Newest submissions first. Only "before" parameter is supported, the listing then contains submissions newer than the given one.
+    def new(self, limit: int = 100, params: dict = None):
+        submissions = sorted(self._reddit.submissions.values(), key=lambda submission: submission.created_utc, reverse=True)
+        if params and params.get("before"):
+            before = next((submission.created_utc for submission in submissions if submission.fullname == params["before"]), None)
+            submissions = [submission for submission in submissions if before is None or submission.created_utc > before]
+        return iter(submissions[:limit])
+
+
+class _FakeSubredditModeration:
+    def __init__(self, reddit: FakeReddit, subreddit: FakeSubreddit):
+        self._reddit = reddit
+        self._subreddit = subreddit
+
+    def update(self, description: str = None, **settings) -> None:
+        self._subreddit.description = description
+        self._reddit.record("subreddit.mod.update", self._subreddit.display_name, description)
+
+
+# Comment stream fed by FakeReddit.post_comment. Iteration blocks for new comments, like praw's stream, until the stream is closed.
+class FakeStream:
+    def __init__(self):
+        self._comments = queue.Queue()
+
+    def deliver(self, comment) -> None:
+        self._comments.put(comment)
+
+    def close(self) -> None:
+        self._comments.put(None)
+
+    def comments(self, skip_existing: bool = False):
+        while True:
+            comment = self._comments.get()
+            if comment is None:
+                return
+            yield comment
+
+
+class FakeSubmission:
+    def __init__(self, reddit: FakeReddit, title: str, selftext: str, author: FakeRedditor, url: str = None, link_flair_text: str = None):
+        self.id = reddit.get_id()
+        self.fullname = f"t3_{self.id}"
+        self.title = title
+        self.selftext = selftext
+        self.author = author
+        self.url = url or f"https://www.reddit.com/r/{reddit.subreddit(config.Reddit.SUBREDDIT_NAME).display_name}/comments/{self.id}/"
+        self.link_flair_text = link_flair_text
+        self.created_utc = time.time()
+        self.saved = False
+        self.flair = _FakeFlair(reddit, self)
+        self.mod = _FakeModeration(reddit, self)
+        self._reddit = reddit
+
+    def edit(self, body: str):
+        self.selftext = body
+        self._reddit.record("submission.edit", self.fullname, body)
+        return self
+
+    def reply(self, body: str):
+        comment = FakeComment(self._reddit, self, self._reddit.user, body)
+        self._reddit.comments[comment.id] = comment
+        self._reddit.record("submission.reply", self.fullname, body)
+        return comment
+
+    def save(self) -> None:
+        self.saved = True
+        self._reddit.record("submission.save", self.fullname)
+
+
+class FakeComment:
+    def __init__(self, reddit: FakeReddit, submission: FakeSubmission, author: FakeRedditor, body: str):
+        self.id = reddit.get_id()
+        self.fullname = f"t1_{self.id}"
+        self.link_id = submission.fullname
+        self.submission = submission
+        self.author = author
+        self.body = body
+        self.created_utc = time.time()
+        self.saved = False
+        self.replies = []
+        self.mod = _FakeModeration(reddit, self)
+        self._reddit = reddit
+
+    def reply(self, body: str):
+        comment = FakeComment(self._reddit, self.submission, self._reddit.user, body)
+        self._reddit.comments[comment.id] = comment
+        self.replies.append(comment)
+        self._reddit.record("comment.reply", self.fullname, body)
+        return comment
+
+    def save(self) -> None:
+        self.saved = True
+        self._reddit.record("comment.save", self.fullname)
+
+
+class _FakeFlair:
+    def __init__(self, reddit: FakeReddit, submission: FakeSubmission):
+        self._reddit = reddit
+        self._submission = submission
+
+    def select(self, flair_template_id: str, text: str = None) -> None:
+        self._reddit.record("flair.select", self._submission.fullname, flair_template_id)
+
+
+class _FakeModeration:
+    def __init__(self, reddit: FakeReddit, item):
+        self._reddit = reddit
+        self._item = item
+
+    def sticky(self, state: bool = True, bottom: bool = True) -> None:
+        self._reddit.record("mod.sticky", self._item.fullname, state)
+
+    def suggested_sort(self, sort: str = "blank") -> None:
+        self._reddit.record("mod.suggested_sort", self._item.fullname, sort)
+
+    def distinguish(self, how: str = "yes", sticky: bool = False) -> None:
+        self._reddit.record("mod.distinguish", self._item.fullname, sticky)
+
+    def flair(self, text: str = None, flair_template_id: str = None) -> None:
+        self._reddit.record("mod.flair", self._item.fullname, flair_template_id)
+
+    def remove(self, spam: bool = False) -> None:
+        self._reddit.record("mod.remove", self._item.fullname, spam)
+
+
+def _to_base36(number: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    result = ""
+    while number:
+        number, remainder = divmod(number, 36)
+        result = digits[remainder] + result
+    return result
+
+
+if __name__ == "__main__":
+    pass
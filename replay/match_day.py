@@ -0,0 +1,178 @@
+import argparse
+import contextlib
+import heapq
+import itertools
+import json
+import math
+import threading
+import time
+from typing import Final
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.data import variables
+from reddit_bot.replay.api_stub import RapidApiStub
+from reddit_bot.replay.fake_reddit import FakeReddit
+from reddit_bot.replay.timeline import SECOND_HALF_END, MatchTimeline, ReplayClock, load_recording
+from reddit_bot.util import rapidapi_client_util, rapidapi_util, reddit_comment_util, reddit_match_thread_util, reddit_sidebar_util, reddit_submission_util, reddit_write_util, storage_util
+from reddit_bot.util.cache_util import TTLCache
+from reddit_bot.util.ledger_util import ProcessedItemLedger
+from reddit_bot.util.live_match_util import LiveMatchModel
+from reddit_bot.util.match_thread_registry_util import MatchThreadRegistry
+from reddit_bot.util.quota_util import QuotaAccountant
+from reddit_bot.util.rate_limit_util import KeyedTokenBucket
+from reddit_bot.util.reddit_write_util import RedditWriteQueue
+from reddit_bot.util.single_flight_util import SingleFlight
+from reddit_bot.util.submission_state_util import SubmissionStateIndex
+
+REPLAY_START: Final[int] = -65 * 60  # In seconds relative to kickoff - shortly before the live match thread is due.
+REPLAY_END: Final[int] = SECOND_HALF_END + 30 * 60  # Replay gives up if post-match thread wasn't created by then.
+
+# Comments posted to the live match thread during the replay, as (seconds relative to kickoff, author, body).
+DEFAULT_COMMENTS: Final[tuple[tuple[float, str, str], ...]] = (
+    (-30 * 60, "replay_user_1", "!inter seriea"),
+    (10 * 60, "replay_user_2", "!inter injuries"),
+    (20 * 60, "replay_user_3", "!inter seriea"),
+    (50 * 60, "replay_user_1", "!inter next"),
+    (70 * 60, "replay_user_2", "!inter coppa"),
+    (85 * 60, "replay_user_3", "forza inter"),
+)
+
+# Initial state of match thread lifecycle variables, so that a replay doesn't start from or leave behind the state of a running bot.
+_INITIAL_MATCH_THREAD_VARIABLES: Final[dict] = {
+    "pre_match_thread_created": False,
+    "live_match_thread_created": False,
+    "live_match_football_api_id": None,
+    "live_match_reddit_submission_id": "",
+    "live_match_events_already_existed": False,
+    "live_match_content_hash": "",
+    "live_match_edits_performed": 0,
+    "live_match_edits_skipped": 0,
+    "post_match_thread_title": "",
+    "post_match_thread_content": "",
+}
+
+
+# Isolates bot state for the duration of a replay: caches run on the replay clock and storage, match thread registry, ledgers and lifecycle
+# variables are fresh. Everything is restored when the context is exited.
+@contextlib.contextmanager
+def isolated_bot_state(clock: ReplayClock):
+    match_thread_registry = MatchThreadRegistry()
+    with contextlib.ExitStack() as stack:
+        storage_util.close()
+        stack.callback(storage_util.close)
+        stack.enter_context(mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:"))
+        stack.enter_context(mock.patch.object(rapidapi_client_util, "response_cache", TTLCache(config.FootballRapidApi.CACHE_MAX_SIZE, clock=clock.now)))
+        stack.enter_context(mock.patch.object(rapidapi_client_util, "client_stats", rapidapi_client_util.ClientStats()))
+        stack.enter_context(mock.patch.object(rapidapi_client_util, "in_flight_requests", SingleFlight()))
+        stack.enter_context(mock.patch.object(rapidapi_client_util, "quota_accountant", QuotaAccountant(config.FootballRapidApi.QUOTA_DAILY_BUDGET)))
+        stack.enter_context(mock.patch.object(rapidapi_util, "rendered_replies", TTLCache(config.FootballRapidApi.RENDERED_REPLY_CACHE_MAX_SIZE, clock=clock.now)))
+        stack.enter_context(mock.patch.object(reddit_match_thread_util, "match_thread_registry", match_thread_registry))
+        stack.enter_context(mock.patch.object(reddit_submission_util, "match_thread_registry", match_thread_registry))
+        stack.enter_context(mock.patch.object(reddit_match_thread_util, "live_match_model", LiveMatchModel()))
+        stack.enter_context(mock.patch.object(reddit_match_thread_util, "_pending_live_match_thread_edits", []))
+        stack.enter_context(mock.patch.object(reddit_submission_util, "submission_states", SubmissionStateIndex()))
+        stack.enter_context(mock.patch.object(reddit_comment_util, "processed_comments", ProcessedItemLedger()))
+        stack.enter_context(mock.patch.object(reddit_comment_util, "command_rate_limiter", KeyedTokenBucket(config.Reddit.COMMAND_USER_RATE_LIMIT, config.Reddit.COMMAND_USER_RATE_PERIOD, clock=clock.now)))
+        stack.enter_context(mock.patch.multiple(variables.MatchThreadVariables, live_match_in_progress=threading.Event(), **_INITIAL_MATCH_THREAD_VARIABLES))
+        yield
+
+
+# Reddit writes are performed by a started write queue for the duration of the context, like in the running bot. Queued writes are
+# performed before the context is exited.
+@contextlib.contextmanager
+def queued_writes(reddit_instance: FakeReddit):
+    write_queue = RedditWriteQueue()
+    with mock.patch.object(reddit_write_util, "reddit_write_queue", write_queue):
+        write_queue.start(reddit_instance)
+        try:
+            yield write_queue
+        finally:
+            write_queue.stop()
+
+
+def _find_submission(reddit_instance: FakeReddit, title_prefix: str):
+    return next((submission for submission in reddit_instance.submissions.values() if submission.title.startswith(title_prefix)), None)
+
+
+# Replays a match day: sidebar refresh, pre-match and live match thread creation, live match thread updates until the post-match thread is
+# created, and comments with commands posted to the live match thread. Jobs run in virtual time, one after another, rescheduled by the delays
+# they return like in the scheduler, so a full match replays in seconds. Latency (in seconds) is added to every Reddit write. Writes are
+# performed inline, unless queued is set, in which case they go through a started write queue while jobs keep running.
+# Returns statistics of the replay: requests per Football Rapid API endpoint and per feature, Reddit calls per kind and wall time.
+def run_match_day(comments=DEFAULT_COMMENTS, latency: float = 0.0, start: float = REPLAY_START, end: float = REPLAY_END, queued: bool = False) -> dict:
+    clock = ReplayClock(start)
+    stub = RapidApiStub(MatchTimeline(load_recording("fixture_live"), clock))
+    reddit_instance = FakeReddit(latency=latency)
+    stub.start()
+
+    # Pending runs as (virtual time, sequence number, name, function returning delay until the next run or None).
+    sequence = itertools.count()
+    pending = []
+
+    def post_comment(author: str, body: str):
+        def run():
+            submission = _find_submission(reddit_instance, "[Match Thread]") or _find_submission(reddit_instance, "[Pre-Match Discussion Thread]")
+            if submission is not None:
+                reddit_comment_util.process_comment(reddit_instance, reddit_instance.post_comment(submission, author, body))
+        return run
+
+    jobs = {
+        "check_match_threads": lambda: reddit_match_thread_util.check_match_threads(reddit_instance),
+        "update_live_match_thread": lambda: reddit_match_thread_util.update_live_match_thread(reddit_instance),
+    }
+    for name, func in jobs.items():
+        heapq.heappush(pending, (start, next(sequence), name, func))
+
+    # Replaces the planned run of the live update job, like Scheduler.wake.
+    def wake_live_update_job(delay: float):
+        pending[:] = [entry for entry in pending if entry[2] != "update_live_match_thread"]
+        heapq.heapify(pending)
+        heapq.heappush(pending, (clock.now() + delay, next(sequence), "update_live_match_thread", jobs["update_live_match_thread"]))
+    for match_time, author, body in comments:
+        heapq.heappush(pending, (max(match_time, start), next(sequence), f"comment by {author}", post_comment(author, body)))
+
+    wall_start = time.perf_counter()
+    runs = 0
+    try:
+        with isolated_bot_state(clock), stub.install(rapidapi_client_util.get_session()), mock.patch.object(reddit_match_thread_util, "wake_live_update_job", wake_live_update_job):
+            with queued_writes(reddit_instance) if queued else contextlib.nullcontext():
+                reddit_sidebar_util.refresh_sidebar(reddit_instance)
+                while pending and _find_submission(reddit_instance, "[Post-Match Discussion Thread]") is None:
+                    run_time, _, name, func = heapq.heappop(pending)
+                    if run_time > end:
+                        break
+                    clock.advance(run_time - clock.now())
+                    delay = func()
+                    runs += 1
+                    if delay is not None and delay != math.inf:  # Parked jobs are pushed again when they are woken up.
+                        heapq.heappush(pending, (run_time + delay, next(sequence), name, func))
+            api_stats = rapidapi_client_util.client_stats.as_dict()
+            quota_stats = rapidapi_client_util.quota_accountant.stats()
+    finally:
+        stub.stop()
+
+    return {
+        "finished": _find_submission(reddit_instance, "[Post-Match Discussion Thread]") is not None,
+        "virtual_time": clock.now(),
+        "runs": runs,
+        "wall_time": round(time.perf_counter() - wall_start, 3),
+        "api_requests": dict(stub.requests),
+        "api_client": api_stats,
+        "api_requests_by_caller": quota_stats["by_caller"],
+        "reddit_calls": dict(reddit_instance.count_calls()),
+        "submissions": [submission.title for submission in reddit_instance.submissions.values()],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded match day against a local Football Rapid API and fake Reddit.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every Reddit write.")
+    parser.add_argument("--start", type=float, default=REPLAY_START / 60, help="Minutes relative to kickoff when the replay starts.")
+    parser.add_argument("--queued", action="store_true", help="Perform Reddit writes through a started write queue, like the running bot.")
+    arguments = parser.parse_args()
+    print(json.dumps(run_match_day(latency=arguments.latency, start=arguments.start * 60, queued=arguments.queued), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
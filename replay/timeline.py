@@ -0,0 +1,115 @@
+import copy
+import json
+import os
+import time
+from typing import Final, Optional
+
+RECORDINGS_PATH: Final[str] = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "recordings")
+
+# Match clock in seconds relative to kickoff. Stoppage time matches the last events of the recorded match (45+2 and 90+3).
+FIRST_HALF_END: Final[int] = 48 * 60
+SECOND_HALF_START: Final[int] = FIRST_HALF_END + 15 * 60
+SECOND_HALF_END: Final[int] = SECOND_HALF_START + 48 * 60
+LINEUPS_LEAD_TIME: Final[int] = 40 * 60  # Lineups are published 40 minutes before kickoff.
+
+
+def load_recording(name: str) -> dict:
+    with open(os.path.join(RECORDINGS_PATH, f"{name}.json"), encoding="utf-8") as file:
+        return json.load(file)
+
+
+# Virtual time of a replay in seconds relative to kickoff. Without speed, time only moves when advanced (runs as fast as possible),
+# otherwise it also runs on its own, speed times faster than real time.
+class ReplayClock:
+    def __init__(self, start: float, speed: float = 0):
+        self._offset = start
+        self._speed = speed
+        self._started = time.monotonic()
+
+    def now(self) -> float:
+        return self._offset + ((time.monotonic() - self._started) * self._speed if self._speed else 0)
+
+    def advance(self, seconds: float) -> None:
+        self._offset += seconds
+
+    # Epoch time that is as far from now as the virtual time, so that the bot's own comparisons with current time agree with the replay.
+    def to_wall_time(self, virtual_time: float) -> float:
+        return time.time() + virtual_time - self.now()
+
+
+# Returns (status, long status, elapsed minute, extra minute) at the time relative to kickoff.
+def get_match_status(match_time: float) -> tuple:
+    if match_time < 0:
+        return "NS", "Not Started", None, None
+    if match_time < 45 * 60:
+        return "1H", "First Half", int(match_time // 60) + 1, None
+    if match_time < FIRST_HALF_END:
+        return "1H", "First Half", 45, int((match_time - 45 * 60) // 60) + 1
+    if match_time < SECOND_HALF_START:
+        return "HT", "Halftime", 45, None
+    if match_time < SECOND_HALF_START + 45 * 60:
+        return "2H", "Second Half", int((match_time - SECOND_HALF_START) // 60) + 46, None
+    if match_time < SECOND_HALF_END:
+        return "2H", "Second Half", 90, int((match_time - SECOND_HALF_START - 45 * 60) // 60) + 1
+    return "FT", "Match Finished", 90, None
+
+
+# Time relative to kickoff when the recorded event happened.
+def get_event_time(event: dict) -> float:
+    elapsed = event["time"]["elapsed"]
+    extra = event["time"].get("extra") or 0
+    if elapsed <= 45:
+        return (elapsed - 1 + extra) * 60
+    return SECOND_HALF_START + (elapsed - 46 + extra) * 60
+
+
+# Replays a recorded full-time fixture: the fixture returned at any moment only contains events that already happened, with the score,
+# status and clock derived from them. Statistics and player ratings are the recorded full-time values once the match has started.
+class MatchTimeline:
+    def __init__(self, recording: dict, clock: ReplayClock):
+        self._fixture = recording["response"][0]
+        self._clock = clock
+
+    @property
+    def fixture_id(self) -> int:
+        return self._fixture["fixture"]["id"]
+
+    def is_finished(self) -> bool:
+        return self._clock.now() >= SECOND_HALF_END
+
+    def get_fixture(self, match_time: Optional[float] = None) -> dict:
+        match_time = self._clock.now() if match_time is None else match_time
+        status, status_long, elapsed, extra = get_match_status(match_time)
+        kickoff = self._clock.to_wall_time(0)
+        fixture = copy.deepcopy(self._fixture)
+
+        fixture["fixture"]["timestamp"] = int(kickoff)
+        fixture["fixture"]["date"] = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(kickoff))
+        fixture["fixture"]["periods"] = {"first": int(kickoff) if match_time >= 0 else None, "second": int(self._clock.to_wall_time(SECOND_HALF_START)) if match_time >= SECOND_HALF_START else None}
+        fixture["fixture"]["status"] = {"long": status_long, "short": status, "elapsed": elapsed, "extra": extra}
+        fixture["events"] = [event for event in fixture["events"] if get_event_time(event) <= match_time]
+
+        goals = self._get_goals(fixture["events"]) if status != "NS" else {"home": None, "away": None}
+        fixture["goals"] = goals
+        fixture["score"]["halftime"] = self._get_goals([event for event in fixture["events"] if event["time"]["elapsed"] <= 45]) if match_time >= FIRST_HALF_END else {"home": None, "away": None}
+        fixture["score"]["fulltime"] = goals if status == "FT" else {"home": None, "away": None}
+        for side in ("home", "away"):
+            fixture["teams"][side]["winner"] = self._fixture["teams"][side]["winner"] if status == "FT" else None
+
+        if match_time < -LINEUPS_LEAD_TIME:
+            fixture["lineups"] = []
+        if match_time < 0:
+            fixture["statistics"] = []
+            fixture["players"] = []
+        return fixture
+
+    def _get_goals(self, events: list) -> dict:
+        goals = {"home": 0, "away": 0}
+        for event in events:
+            if event["type"] == "Goal" and event["detail"] != "Missed Penalty":
+                goals["home" if event["team"]["id"] == self._fixture["teams"]["home"]["id"] else "away"] += 1
+        return goals
+
+
+if __name__ == "__main__":
+    pass
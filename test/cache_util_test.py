@@ -0,0 +1,57 @@
+import unittest
+
+from reddit_bot.util.cache_util import TTLCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCacheUtil(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(2, clock=self.clock)
+
+    def test_get_before_expiry(self):
+        self.cache.set("standings", {"rank": 1}, 60)
+        self.clock.now = 59
+        self.assertEqual(self.cache.get("standings"), {"rank": 1})
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_get_after_expiry(self):
+        self.cache.set("standings", {"rank": 1}, 60)
+        self.clock.now = 60
+        self.assertIsNone(self.cache.get("standings"))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_get_stale_after_expiry(self):
+        self.cache.set("standings", {"rank": 1}, 60)
+        self.clock.now = 600
+        self.assertEqual(self.cache.get_stale("standings"), {"rank": 1})
+        self.assertIsNone(self.cache.get_stale("injuries"))
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set("a", 1, 60)
+        self.cache.set("b", 2, 60)
+        self.cache.get("a")  # Mark "a" as recently used.
+        self.cache.set("c", 3, 60)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("c"), 3)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_invalidate(self):
+        self.cache.set("a", 1, 60)
+        self.cache.invalidate("a")
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from reddit_bot.config import config
+from reddit_bot.util.cadence_util import get_match_thread_check_delay, get_match_thread_update_delay
+
+KICKOFF = 1_700_000_000
+
+
+def get_fixture(status_short, elapsed=None):
+    return {"fixture": {"timestamp": KICKOFF, "status": {"short": status_short, "elapsed": elapsed}}}
+
+
+class TestCadenceUtil(unittest.TestCase):
+
+    def test_check_delay_without_next_match(self):
+        self.assertEqual(get_match_thread_check_delay(None, False, False, KICKOFF), config.Reddit.MATCH_THREAD_CHECK_INTERVAL)
+
+    def test_check_delay_is_capped_when_match_is_far_away(self):
+        nine_days_before = KICKOFF - 9 * 86400
+        self.assertEqual(get_match_thread_check_delay(get_fixture("NS"), False, False, nine_days_before), config.Reddit.MATCH_THREAD_CHECK_MAX_INTERVAL)
+
+    def test_check_delay_sleeps_until_pre_match_thread(self):
+        two_hours_before_pre_match_thread = KICKOFF - 86400 - 7200
+        self.assertEqual(get_match_thread_check_delay(get_fixture("NS"), False, False, two_hours_before_pre_match_thread), 7230)
+
+    def test_check_delay_sleeps_until_live_match_thread(self):
+        three_hours_before = KICKOFF - 3 * 3600
+        self.assertEqual(get_match_thread_check_delay(get_fixture("NS"), True, False, three_hours_before), 7230)
+
+    def test_check_delay_has_lower_bound(self):
+        ten_minutes_before = KICKOFF - 600
+        self.assertEqual(get_match_thread_check_delay(get_fixture("NS"), True, False, ten_minutes_before), config.Reddit.MATCH_THREAD_CHECK_MIN_INTERVAL)
+
+    def test_update_delay_before_kickoff(self):
+        self.assertEqual(get_match_thread_update_delay(get_fixture("NS"), KICKOFF - 3000), config.Reddit.MATCH_THREAD_PRE_KICKOFF_UPDATE_INTERVAL)
+        self.assertEqual(get_match_thread_update_delay(get_fixture("NS"), KICKOFF - 90), 90)
+
+    def test_update_delay_during_match(self):
+        self.assertEqual(get_match_thread_update_delay(get_fixture("1H", 20)), config.Reddit.MATCH_THREAD_UPDATE_INTERVAL)
+        self.assertEqual(get_match_thread_update_delay(get_fixture("HT", 45)), config.Reddit.MATCH_THREAD_PAUSED_UPDATE_INTERVAL)
+        self.assertEqual(get_match_thread_update_delay(get_fixture("2H", 88)), config.Reddit.MATCH_THREAD_LATE_GAME_UPDATE_INTERVAL)
+        self.assertEqual(get_match_thread_update_delay(get_fixture("P", 120)), config.Reddit.MATCH_THREAD_LATE_GAME_UPDATE_INTERVAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from reddit_bot.util.comment_worker_util import CommentWorkerPool
+
+
+def get_comment(fullname, link_id="t3_abc"):
+    return mock.Mock(fullname=fullname, link_id=link_id)
+
+
+class TestCommentWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.handled = []
+        self.pool = CommentWorkerPool(self.handle, workers=4, queue_size=8)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def handle(self, comment):
+        time.sleep(0.01)
+        with self.lock:
+            self.handled.append(comment.fullname)
+
+    def wait_for_handled(self, count):
+        deadline = time.monotonic() + 2
+        while len(self.handled) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_comments_in_same_submission_are_handled_in_order(self):
+        fullnames = [f"t1_{index}" for index in range(10)]
+        for fullname in fullnames:
+            self.pool.submit(get_comment(fullname))
+        self.wait_for_handled(10)
+        self.assertEqual(self.handled, fullnames)
+
+    def test_slow_comment_does_not_block_other_submissions(self):
+        release = threading.Event()
+        self.pool._handler = lambda comment: release.wait() if comment.fullname == "t1_slow" else self.handle(comment)
+        self.pool.submit(get_comment("t1_slow", "t3_slow"))
+        slow_queue = self.pool._get_queue(get_comment("t1_slow", "t3_slow"))
+        other_link_id = next(link_id for link_id in (f"t3_{index}" for index in range(100)) if self.pool._get_queue(get_comment("t1_fast", link_id)) is not slow_queue)
+        self.pool.submit(get_comment("t1_fast", other_link_id))
+        self.wait_for_handled(1)
+        release.set()
+        self.assertEqual(self.handled, ["t1_fast"])
+
+    def test_failing_comment_is_counted(self):
+        self.pool._handler = mock.Mock(side_effect=ValueError("API error"))
+        self.pool.submit(get_comment("t1_1"))
+        deadline = time.monotonic() + 2
+        while self.pool.stats()["handled"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = self.pool.stats()
+        self.assertEqual(stats["failures"], 1)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_stop_wakes_idle_workers(self):
+        start = time.monotonic()
+        self.pool.stop()
+        self.assertLess(time.monotonic() - start, 0.2)
+
+    def test_stop_does_not_block_on_full_queue(self):
+        release = threading.Event()
+        self.pool._handler = lambda comment: release.wait()
+        comments = [get_comment(f"t1_{index}") for index in range(3)]  # Worker is busy with the first one, the other two fill its queue.
+        for comment in comments:
+            self.pool.submit(comment)
+        stopper = threading.Thread(target=self.pool.stop)
+        stopper.start()
+        self.pool._stopped.wait(1)
+        release.set()
+        stopper.join(2)
+        self.assertFalse(stopper.is_alive())
+        self.assertEqual(self.pool.stats()["handled"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
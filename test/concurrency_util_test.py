@@ -0,0 +1,42 @@
+import contextvars
+import threading
+import time
+import unittest
+
+from reddit_bot.util import concurrency_util
+
+caller = contextvars.ContextVar("caller", default=None)
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_calls_run_concurrently_and_keep_order(self):
+        def get_section(name):
+            time.sleep(0.1)
+            return name
+
+        start = time.monotonic()
+        results = concurrency_util.fan_out({name: (lambda name=name: get_section(name)) for name in ("fixtures", "table", "knockout_stages")}, timeout=5)
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual(list(results.items()), [("fixtures", "fixtures"), ("table", "table"), ("knockout_stages", "knockout_stages")])
+
+    def test_failed_call_gets_default(self):
+        def failing_call():
+            raise KeyError("response")
+
+        results = concurrency_util.fan_out({"table": failing_call, "fixtures": lambda: "fixtures"}, timeout=5, default="")
+        self.assertEqual(results, {"table": "", "fixtures": "fixtures"})
+
+    def test_slow_call_gets_default(self):
+        release = threading.Event()
+        results = concurrency_util.fan_out({"table": lambda: release.wait(5), "fixtures": lambda: "fixtures"}, timeout=0.1, default="")
+        release.set()
+        self.assertEqual(results, {"table": "", "fixtures": "fixtures"})
+
+    def test_context_variables_are_propagated(self):
+        caller.set("sidebar")
+        self.assertEqual(concurrency_util.fan_out({"table": caller.get}, timeout=5), {"table": "sidebar"})
+
+
+if __name__ == "__main__":
+    unittest.main()
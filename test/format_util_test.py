@@ -0,0 +1,25 @@
+import unittest
+
+from reddit_bot.util.format_util import get_safe_name_str
+
+
+class TestFormatUtil(unittest.TestCase):
+
+    def test_get_safe_name_str_missing_name(self):
+        self.assertEqual(get_safe_name_str(None), "Unknown")
+        self.assertEqual(get_safe_name_str("null", "Unknown Player"), "Unknown Player")
+
+    def test_get_safe_name_str_plain_name(self):
+        self.assertEqual(get_safe_name_str("Lautaro Martínez"), "Lautaro Martínez")
+
+    def test_get_safe_name_str_repairs_mojibake(self):
+        self.assertEqual(get_safe_name_str("Lautaro MartÃ­nez"), "Lautaro Martínez")
+        self.assertEqual(get_safe_name_str("Hakan Ã‡alhanoÄŸlu"), "Hakan Çalhanoğlu")
+        self.assertEqual(get_safe_name_str("Theo HernÃ¡ndez"), "Theo Hernández")
+
+    def test_get_safe_name_str_bytes(self):
+        self.assertEqual(get_safe_name_str("Nicolò Barella".encode("utf-8")), "Nicolò Barella")
+
+
+if __name__ == "__main__":
+    unittest.main()
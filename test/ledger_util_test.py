@@ -0,0 +1,49 @@
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.util import storage_util
+from reddit_bot.util.ledger_util import ProcessedItemLedger
+
+
+class TestProcessedItemLedger(unittest.TestCase):
+
+    def setUp(self):
+        storage_util.close()
+        self.database_patch = mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:")
+        self.database_patch.start()
+        self.now = 1000000.0
+        self.ledger = ProcessedItemLedger(clock=lambda: self.now)
+
+    def tearDown(self):
+        storage_util.close()
+        self.database_patch.stop()
+
+    def test_add_and_contains(self):
+        self.assertFalse(self.ledger.contains("t1_abc"))
+        self.ledger.add("t1_abc")
+        self.ledger.add("t1_abc")
+        self.assertTrue(self.ledger.contains("t1_abc"))
+        self.assertEqual(len(self.ledger), 1)
+
+    def test_items_survive_restart(self):
+        self.ledger.add("t1_abc")
+        self.assertTrue(ProcessedItemLedger(clock=lambda: self.now).contains("t1_abc"))
+
+    def test_started_at_is_kept_after_restart(self):
+        self.assertEqual(self.ledger.started_at, self.now)
+        self.now += 3600
+        self.assertEqual(ProcessedItemLedger(clock=lambda: self.now).started_at, self.now - 3600)
+
+    def test_prune(self):
+        self.ledger.add("t1_old")
+        self.now += config.Storage.PROCESSED_ITEM_RETENTION + 1
+        self.ledger.add("t1_new")
+        self.ledger.prune()
+        self.assertFalse(self.ledger.contains("t1_old"))
+        self.assertTrue(self.ledger.contains("t1_new"))
+        self.assertEqual(storage_util.execute("SELECT fullname FROM processed_items"), [("t1_new",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
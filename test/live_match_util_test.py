@@ -0,0 +1,56 @@
+import unittest
+
+from reddit_bot.util.live_match_util import LiveMatchModel
+
+
+def get_event(minute, player, event_type="Goal", detail="Normal Goal", assist=None):
+    return {"time": {"elapsed": minute, "extra": None}, "team": {"id": 505}, "player": {"id": None, "name": player}, "assist": {"id": None, "name": assist}, "type": event_type, "detail": detail}
+
+
+class TestLiveMatchModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = LiveMatchModel()
+        self.formatted = []
+
+    def format_event(self, event):
+        self.formatted.append(event["player"]["name"])
+        if event["type"] == "subst":
+            return f"| {event['time']['elapsed']} | {event['assist']['name']} replaces {event['player']['name']} |\n" if event["assist"]["name"] else ""
+        assist_text = f", assist by {event['assist']['name']}" if event["assist"]["name"] else ""
+        return f"| {event['time']['elapsed']} | {event['player']['name']}{assist_text} |\n"
+
+    def test_only_new_events_are_formatted(self):
+        self.model.render_events([get_event(9, "Lautaro")], self.format_event)
+        rows, new_events = self.model.render_events([get_event(9, "Lautaro"), get_event(77, "Frattesi")], self.format_event)
+        self.assertEqual(rows, "| 9 | Lautaro |\n| 77 | Frattesi |\n")
+        self.assertEqual([event["player"]["name"] for event in new_events], ["Frattesi"])
+        self.assertEqual(self.formatted, ["Lautaro", "Frattesi"])
+
+    def test_removed_events_are_dropped(self):
+        self.model.render_events([get_event(9, "Lautaro"), get_event(77, "Frattesi")], self.format_event)
+        rows, new_events = self.model.render_events([get_event(77, "Frattesi")], self.format_event)
+        self.assertEqual(rows, "| 77 | Frattesi |\n")
+        self.assertEqual(new_events, [])
+
+    def test_assist_arriving_later_is_rendered(self):
+        self.model.render_events([get_event(9, "Lautaro"), get_event(60, "Thuram", "subst", "Substitution 1")], self.format_event)
+        rows, new_events = self.model.render_events([get_event(9, "Lautaro", assist="Barella"), get_event(60, "Thuram", "subst", "Substitution 1", "Taremi")], self.format_event)
+        self.assertEqual(rows, "| 9 | Lautaro, assist by Barella |\n| 60 | Taremi replaces Thuram |\n")
+        self.assertEqual(len(new_events), 2)
+
+    def test_section_is_rendered_only_when_inputs_change(self):
+        renders = []
+
+        def render(lineups, team_name):
+            renders.append(team_name)
+            return f"{team_name}: {', '.join(lineups)}"
+
+        self.assertEqual(self.model.render_section("lineups", (["Sommer"], "Inter"), render), "Inter: Sommer")
+        self.assertEqual(self.model.render_section("lineups", (["Sommer"], "Inter"), render), "Inter: Sommer")
+        self.assertEqual(self.model.render_section("lineups", (["Martinez"], "Inter"), render), "Inter: Martinez")
+        self.assertEqual(len(renders), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
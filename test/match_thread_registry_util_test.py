@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.util import storage_util
+from reddit_bot.util.match_thread_registry_util import MatchThreadRegistry, PRE_MATCH, LIVE_MATCH
+
+PRE_MATCH_TITLE = "[Pre-Match Discussion Thread] Inter vs AC Milan (Serie A, Matchday 5)"
+LIVE_MATCH_TITLE = "[Match Thread] Inter vs AC Milan (Serie A, Matchday 5)"
+
+
+def get_submission(submission_id, title):
+    return mock.Mock(id=submission_id, title=title, url=f"https://www.reddit.com/r/testsub/comments/{submission_id}/")
+
+
+class TestMatchThreadRegistry(unittest.TestCase):
+
+    def setUp(self):
+        storage_util.close()
+        self.database_patch = mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:")
+        self.database_patch.start()
+        self.reddit_instance = mock.Mock()
+        self.subreddit = self.reddit_instance.subreddit.return_value
+        self.subreddit.new.return_value = [get_submission("old1", "Lautaro scores again"), get_submission("old2", PRE_MATCH_TITLE)]
+        self.registry = MatchThreadRegistry()
+
+    def tearDown(self):
+        storage_util.close()
+        self.database_patch.stop()
+
+    def test_registered_thread_is_found_without_listing(self):
+        self.registry.register(get_submission("abc", LIVE_MATCH_TITLE), 1234, LIVE_MATCH)
+        self.assertEqual(self.registry.find(self.reddit_instance, 1234, LIVE_MATCH, LIVE_MATCH_TITLE).submission_id, "abc")
+        self.subreddit.new.assert_not_called()
+
+    def test_existing_threads_are_backfilled_once(self):
+        self.assertEqual(self.registry.find(self.reddit_instance, 1234, PRE_MATCH, PRE_MATCH_TITLE).submission_id, "old2")
+        self.assertIsNone(self.registry.find(self.reddit_instance, 1234, LIVE_MATCH, LIVE_MATCH_TITLE))
+        self.assertIsNone(self.registry.find(self.reddit_instance, 5678, PRE_MATCH, "[Pre-Match Discussion Thread] Inter vs Juventus"))
+        self.subreddit.new.assert_called_once()
+
+    def test_failed_backfill_is_retried(self):
+        self.subreddit.new.side_effect = [RuntimeError("Reddit is down"), [get_submission("old2", PRE_MATCH_TITLE)]]
+        with self.assertRaises(RuntimeError):
+            self.registry.find(self.reddit_instance, 1234, PRE_MATCH, PRE_MATCH_TITLE)
+        self.assertEqual(self.registry.find(self.reddit_instance, 1234, PRE_MATCH, PRE_MATCH_TITLE).submission_id, "old2")
+
+    def test_registry_survives_restart(self):
+        self.registry.register(get_submission("abc", LIVE_MATCH_TITLE), 1234, LIVE_MATCH)
+        restarted_registry = MatchThreadRegistry()
+        self.assertEqual(restarted_registry.find(self.reddit_instance, 1234, LIVE_MATCH, LIVE_MATCH_TITLE).url, "https://www.reddit.com/r/testsub/comments/abc/")
+
+
+if __name__ == "__main__":
+    unittest.main()
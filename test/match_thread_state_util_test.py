@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.data import variables
+from reddit_bot.util import match_thread_state_util, storage_util
+
+
+class TestMatchThreadState(unittest.TestCase):
+
+    def setUp(self):
+        storage_util.close()
+        self.patches = [mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:")]
+        self.patches += [mock.patch.object(variables.MatchThreadVariables, name, getattr(variables.MatchThreadVariables, name)) for name in match_thread_state_util.PERSISTED_VARIABLES]
+        for patch in self.patches:
+            patch.start()
+        variables.MatchThreadVariables.live_match_in_progress.clear()
+
+    def tearDown(self):
+        storage_util.close()
+        for patch in self.patches:
+            patch.stop()
+        variables.MatchThreadVariables.live_match_in_progress.clear()
+
+    def test_restore_without_checkpoint(self):
+        self.assertFalse(match_thread_state_util.restore())
+
+    def test_restore_live_match(self):
+        variables.MatchThreadVariables.pre_match_thread_created = True
+        variables.MatchThreadVariables.live_match_thread_created = True
+        variables.MatchThreadVariables.live_match_football_api_id = 1234
+        variables.MatchThreadVariables.live_match_reddit_submission_id = "abc123"
+        match_thread_state_util.checkpoint()
+
+        variables.MatchThreadVariables.live_match_thread_created = False
+        variables.MatchThreadVariables.live_match_football_api_id = None
+        variables.MatchThreadVariables.live_match_reddit_submission_id = ""
+        self.assertTrue(match_thread_state_util.restore())
+        self.assertEqual(variables.MatchThreadVariables.live_match_football_api_id, 1234)
+        self.assertEqual(variables.MatchThreadVariables.live_match_reddit_submission_id, "abc123")
+        self.assertTrue(variables.MatchThreadVariables.live_match_in_progress.is_set())
+
+    def test_restore_pre_match_only(self):
+        variables.MatchThreadVariables.pre_match_thread_created = True
+        match_thread_state_util.checkpoint()
+        variables.MatchThreadVariables.pre_match_thread_created = False
+        self.assertFalse(match_thread_state_util.restore())
+        self.assertTrue(variables.MatchThreadVariables.pre_match_thread_created)
+        self.assertFalse(variables.MatchThreadVariables.live_match_in_progress.is_set())
+
+    def test_failed_transition_is_checkpointed(self):
+        @match_thread_state_util.transition
+        def create_thread():
+            variables.MatchThreadVariables.pre_match_thread_created = True
+            raise RuntimeError("Reddit is down")
+
+        with self.assertRaises(RuntimeError):
+            create_thread()
+        variables.MatchThreadVariables.pre_match_thread_created = False
+        match_thread_state_util.restore()
+        self.assertTrue(variables.MatchThreadVariables.pre_match_thread_created)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+import requests
+
+from reddit_bot.util import metrics_util
+from reddit_bot.util.metrics_util import Counter, Gauge, Histogram, MetricsRegistry, MetricsServer
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_per_labels(self):
+        counter = self.registry.register(Counter("requests_total", "Requests.", ("endpoint", "status")))
+        counter.inc(endpoint="standings", status=200)
+        counter.inc(2, endpoint="standings", status=200)
+        counter.inc(endpoint="fixtures", status=429)
+        self.assertEqual(counter.get(endpoint="standings", status="200"), 3)
+        self.assertEqual(self.registry.render(), (
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            "requests_total{endpoint=\"fixtures\",status=\"429\"} 1\n"
+            "requests_total{endpoint=\"standings\",status=\"200\"} 3\n"
+        ))
+
+    def test_labels_must_match(self):
+        counter = Counter("requests_total", "Requests.", ("endpoint",))
+        with self.assertRaises(ValueError):
+            counter.inc(status=200)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        self.assertEqual(histogram.get()["count"], 4)
+        self.assertAlmostEqual(histogram.get()["sum"], 3.65)
+        self.assertIn("latency_seconds_bucket{le=\"0.1\"} 2\n", self.registry.render())
+        self.assertIn("latency_seconds_bucket{le=\"1\"} 3\n", self.registry.render())
+        self.assertIn("latency_seconds_bucket{le=\"+Inf\"} 4\n", self.registry.render())
+        self.assertIn("latency_seconds_count 4\n", self.registry.render())
+
+    def test_gauge_function(self):
+        depth = [3]
+        gauge = self.registry.register(Gauge("queue_depth", "Queue depth."))
+        gauge.set_function(lambda: depth[0])
+        depth[0] = 5
+        self.assertIn("queue_depth 5\n", self.registry.render())
+
+    def test_duplicate_metric(self):
+        self.registry.register(Gauge("queue_depth", "Queue depth."))
+        with self.assertRaises(ValueError):
+            self.registry.register(Gauge("queue_depth", "Queue depth."))
+
+    def test_instrumented_counts_errors(self):
+        histogram = Histogram("processing_seconds", "Processing.")
+        errors = Counter("processing_errors_total", "Errors.")
+
+        @metrics_util.instrumented(histogram, errors)
+        def process(fail):
+            if fail:
+                raise ValueError("failed")
+
+        process(False)
+        with self.assertRaises(ValueError):
+            process(True)
+        self.assertEqual(histogram.get()["count"], 2)
+        self.assertEqual(errors.get(), 1)
+
+    def test_timed_counts_errors_per_labels(self):
+        histogram = Histogram("call_seconds", "Calls.", ("call",))
+        errors = Counter("call_errors_total", "Errors.", ("call",))
+        with self.assertRaises(ValueError), metrics_util.timed(histogram, errors, call="listing"):
+            raise ValueError("failed")
+        self.assertEqual(histogram.get(call="listing")["count"], 1)
+        self.assertEqual(errors.get(call="listing"), 1)
+
+
+class TestMetricsServer(unittest.TestCase):
+
+    def setUp(self):
+        registry = MetricsRegistry()
+        registry.register(Counter("requests_total", "Requests.")).inc()
+        self.server = MetricsServer(0, registry=registry)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_serves_metrics(self):
+        response = requests.get(self.server.url, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], metrics_util.CONTENT_TYPE)
+        self.assertIn("requests_total 1\n", response.text)
+
+    def test_unknown_path(self):
+        self.assertEqual(requests.get(self.server.url.replace("/metrics", "/other"), timeout=5).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.util import concurrency_util, quota_util, rapidapi_client_util
+from reddit_bot.util.cache_util import TTLCache
+from reddit_bot.util.quota_util import QuotaAccountant
+
+STANDINGS_URL = config.FootballRapidApi.FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/standings?league=135&season=2025"
+FIXTURE_URL = config.FootballRapidApi.FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/fixtures?id=1"
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQuotaAccountant(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.accountant = QuotaAccountant(100, clock=self.clock)
+
+    def record(self, name, requests, url=FIXTURE_URL):
+        with quota_util.caller(name):
+            for _ in range(requests):
+                self.accountant.record(url)
+
+    def test_counts_per_caller_and_endpoint(self):
+        self.record(quota_util.LIVE_UPDATE, 2)
+        self.record(quota_util.COMMENT_COMMAND, 1, STANDINGS_URL)
+        self.accountant.record(STANDINGS_URL)
+        stats = self.accountant.stats()
+        self.assertEqual(stats["used"], 4)
+        self.assertEqual(stats["by_caller"], {quota_util.LIVE_UPDATE: 2, quota_util.COMMENT_COMMAND: 1, quota_util.OTHER: 1})
+        self.assertEqual(stats["by_endpoint"], {"fixtures?id": 2, "standings?league,season": 2})
+
+    def test_lower_priorities_are_degraded_first(self):
+        self.record(quota_util.LIVE_UPDATE, 70)
+        self.assertFalse(self.accountant.is_allowed(quota_util.COMMENT_COMMAND))
+        self.assertTrue(self.accountant.is_allowed(quota_util.SIDEBAR))
+
+        self.record(quota_util.LIVE_UPDATE, 29)
+        self.assertFalse(self.accountant.is_allowed(quota_util.MATCH_THREAD))
+        self.assertTrue(self.accountant.is_allowed(quota_util.LIVE_UPDATE))
+
+        self.record(quota_util.LIVE_UPDATE, 1)
+        self.assertFalse(self.accountant.is_allowed(quota_util.LIVE_UPDATE))
+
+    def test_budget_resets_at_midnight(self):
+        self.record(quota_util.LIVE_UPDATE, 100)
+        self.clock.now = 86400
+        self.assertEqual(self.accountant.remaining, 100)
+        self.assertTrue(self.accountant.is_allowed(quota_util.COMMENT_COMMAND))
+
+    def test_usage_is_synced_with_remaining_quota(self):
+        self.accountant.record(FIXTURE_URL, "10")
+        self.assertEqual(self.accountant.remaining, 10)
+        self.accountant.record(FIXTURE_URL, "50")  # Reported by a larger plan, local count is kept.
+        self.assertEqual(self.accountant.remaining, 9)
+
+    def test_caller_is_kept_in_fan_out(self):
+        with quota_util.caller(quota_util.SIDEBAR):
+            results = concurrency_util.fan_out({"table": quota_util.get_caller}, timeout=5)
+        self.assertEqual(results, {"table": quota_util.SIDEBAR})
+        self.assertEqual(quota_util.get_caller(), quota_util.OTHER)
+
+
+class TestFetchWithinBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.accountant = QuotaAccountant(10)
+        self.cache = TTLCache(8)
+        self.patches = [
+            mock.patch.object(rapidapi_client_util, "quota_accountant", self.accountant),
+            mock.patch.object(rapidapi_client_util, "response_cache", self.cache),
+            mock.patch.object(rapidapi_client_util, "_fetch_from_api", return_value=rapidapi_client_util.ApiResponse(200, {"response": []})),
+        ]
+        for patch in self.patches:
+            patch.start()
+        with quota_util.caller(quota_util.LIVE_UPDATE):
+            for _ in range(8):
+                self.accountant.record(FIXTURE_URL)
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_degraded_caller_gets_expired_response(self):
+        stale_response = rapidapi_client_util.ApiResponse(200, {"response": ["stale"]})
+        self.cache.set(STANDINGS_URL, stale_response, 0)
+        with quota_util.caller(quota_util.COMMENT_COMMAND):
+            self.assertIs(rapidapi_client_util.fetch(STANDINGS_URL), stale_response)
+        rapidapi_client_util._fetch_from_api.assert_not_called()
+        self.assertEqual(self.accountant.stats()["degraded"], {quota_util.COMMENT_COMMAND: 1})
+
+    def test_degraded_caller_without_cached_response(self):
+        with quota_util.caller(quota_util.COMMENT_COMMAND):
+            self.assertEqual(rapidapi_client_util.fetch(STANDINGS_URL).status_code, 429)
+
+    def test_live_update_is_allowed(self):
+        with quota_util.caller(quota_util.LIVE_UPDATE):
+            self.assertEqual(rapidapi_client_util.fetch(FIXTURE_URL).status_code, 200)
+        rapidapi_client_util._fetch_from_api.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
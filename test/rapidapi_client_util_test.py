@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from reddit_bot.config import config
+from reddit_bot.util import rapidapi_client_util
+from reddit_bot.util.quota_util import QuotaAccountant
+
+URL = config.FootballRapidApi.FOOTBALL_RAPID_API_BASE_ENDPOINT + "/v3/standings?league=135&season=2025"
+
+
+def get_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    return response
+
+
+class TestGetWithRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.session = mock.Mock()
+        self.patches = [
+            mock.patch.object(rapidapi_client_util, "get_session", return_value=self.session),
+            mock.patch.object(rapidapi_client_util.time, "sleep"),
+            mock.patch.object(rapidapi_client_util, "quota_accountant", QuotaAccountant(100)),
+            mock.patch.object(rapidapi_client_util, "client_stats", rapidapi_client_util.ClientStats()),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def get_backoffs(self):
+        return [call.args[0] for call in rapidapi_client_util.time.sleep.call_args_list]
+
+    def test_retries_until_success(self):
+        self.session.get.side_effect = [get_response(429), get_response(503), get_response(200)]
+        self.assertEqual(rapidapi_client_util._get_with_retries(URL).status_code, 200)
+        self.assertEqual(self.get_backoffs(), [config.FootballRapidApi.HTTP_BACKOFF_BASE, config.FootballRapidApi.HTTP_BACKOFF_BASE * 2])
+        self.assertEqual(rapidapi_client_util.client_stats.as_dict()["retries"], 2)
+
+    def test_retry_after_is_honored_and_capped(self):
+        self.session.get.side_effect = [get_response(429, {"Retry-After": "7"}), get_response(429, {"Retry-After": "600"}), get_response(200)]
+        rapidapi_client_util._get_with_retries(URL)
+        self.assertEqual(self.get_backoffs(), [7, config.FootballRapidApi.HTTP_BACKOFF_MAX])
+
+    def test_http_date_retry_after_falls_back_to_exponential_backoff(self):
+        self.session.get.side_effect = [get_response(503, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}), get_response(200)]
+        rapidapi_client_util._get_with_retries(URL)
+        self.assertEqual(self.get_backoffs(), [config.FootballRapidApi.HTTP_BACKOFF_BASE])
+
+    def test_last_response_is_returned_after_retries(self):
+        self.session.get.side_effect = [get_response(500) for _ in range(config.FootballRapidApi.HTTP_MAX_RETRIES + 1)]
+        self.assertEqual(rapidapi_client_util._get_with_retries(URL).status_code, 500)
+        self.assertEqual(self.session.get.call_count, config.FootballRapidApi.HTTP_MAX_RETRIES + 1)
+        self.assertEqual(rapidapi_client_util.client_stats.as_dict()["failures"], 1)
+
+    def test_connection_error_is_raised_after_retries(self):
+        self.session.get.side_effect = [requests.ConnectionError("refused"), requests.Timeout("timed out")] * config.FootballRapidApi.HTTP_MAX_RETRIES
+        with self.assertRaises(requests.RequestException):
+            rapidapi_client_util._get_with_retries(URL)
+        self.assertEqual(self.session.get.call_count, config.FootballRapidApi.HTTP_MAX_RETRIES + 1)
+
+    def test_exhausted_daily_quota_is_not_retried(self):
+        self.session.get.side_effect = [get_response(429, {"X-RateLimit-Requests-Remaining": "0"})]
+        self.assertEqual(rapidapi_client_util._get_with_retries(URL).status_code, 429)
+        rapidapi_client_util.time.sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
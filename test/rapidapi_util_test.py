@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from reddit_bot.data import resources
+from reddit_bot.util import rapidapi_util
+from reddit_bot.util.rapidapi_client_util import ApiResponse
+
+
+class TestGetRenderedReply(unittest.TestCase):
+
+    def setUp(self):
+        rapidapi_util.rendered_replies.clear()
+        self.render = mock.Mock(side_effect=lambda api_response: f"{len(api_response.json()['response'])} teams")
+
+    def tearDown(self):
+        rapidapi_util.rendered_replies.clear()
+
+    def test_reply_is_rendered_once_per_version(self):
+        api_response = ApiResponse(200, {"response": [1, 2]}, version="v1")
+        self.assertEqual(rapidapi_util.get_rendered_reply("standings", self.render, api_response), "2 teams")
+        self.assertEqual(rapidapi_util.get_rendered_reply("standings", self.render, ApiResponse(200, {"response": [1, 2]}, version="v1")), "2 teams")
+        self.render.assert_called_once()
+
+    def test_changed_payload_is_rendered_again(self):
+        rapidapi_util.get_rendered_reply("standings", self.render, ApiResponse(200, {"response": [1, 2]}, version="v1"))
+        self.assertEqual(rapidapi_util.get_rendered_reply("standings", self.render, ApiResponse(200, {"response": [1, 2, 3]}, version="v2")), "3 teams")
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_unversioned_response_is_not_memoized(self):
+        api_response = ApiResponse(200, {"response": []})
+        rapidapi_util.get_rendered_reply("standings", self.render, api_response)
+        rapidapi_util.get_rendered_reply("standings", self.render, api_response)
+        self.assertEqual(self.render.call_count, 2)
+        self.assertEqual(len(rapidapi_util.rendered_replies), 0)
+
+    def test_failed_response_is_not_rendered(self):
+        api_response = ApiResponse(429, {"message": "Daily budget for this feature exceeded."})
+        self.assertEqual(rapidapi_util.get_rendered_reply("standings", self.render, ApiResponse(200, {"response": [1]}, version="v1"), api_response), resources.CommentReplies.DATA_TEMPORARILY_UNAVAILABLE)
+        self.render.assert_not_called()
+        self.assertEqual(len(rapidapi_util.rendered_replies), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
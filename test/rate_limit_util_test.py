@@ -0,0 +1,29 @@
+import unittest
+
+from reddit_bot.util.rate_limit_util import KeyedTokenBucket
+
+
+class TestKeyedTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.bucket = KeyedTokenBucket(2, 60, clock=lambda: self.now)
+
+    def test_burst_up_to_capacity(self):
+        self.assertTrue(self.bucket.try_acquire("user"))
+        self.assertTrue(self.bucket.try_acquire("user"))
+        self.assertFalse(self.bucket.try_acquire("user"))
+        self.assertTrue(self.bucket.try_acquire("other_user"))
+
+    def test_tokens_are_refilled(self):
+        self.bucket.try_acquire("user")
+        self.bucket.try_acquire("user")
+        self.now = 29.0
+        self.assertFalse(self.bucket.try_acquire("user"))
+        self.now = 31.0
+        self.assertTrue(self.bucket.try_acquire("user"))
+        self.assertFalse(self.bucket.try_acquire("user"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.data import resources
+from reddit_bot.util import rapidapi_client_util, rapidapi_util, reddit_comment_util, storage_util
+from reddit_bot.util.cache_util import TTLCache
+from reddit_bot.util.ledger_util import ProcessedItemLedger
+from reddit_bot.util.quota_util import QuotaAccountant
+from reddit_bot.util.rate_limit_util import KeyedTokenBucket
+from reddit_bot.util.reddit_comment_util import resolve_command
+
+
+class TestResolveCommand(unittest.TestCase):
+
+    def assertCommand(self, comment_body, command_name):
+        command = resolve_command(comment_body)
+        self.assertIsNotNone(command, comment_body)
+        self.assertEqual(command.name, command_name)
+
+    def test_no_command(self):
+        self.assertIsNone(resolve_command("what a game last night"))
+
+    def test_keywords(self):
+        self.assertCommand("forza inter!", "forza inter")
+        self.assertCommand("!inter juventus", "!inter comemai")
+        self.assertCommand("can someone post !inter next please", "!inter next")
+
+    def test_regex(self):
+        self.assertCommand("check r/acmilan", "for other subreddits")
+
+    def test_longer_keyword_wins_over_its_prefix(self):
+        self.assertCommand("!inter clubworldcup", "!inter clubworldcup")
+        self.assertCommand("!inter cl", "!inter championsleague")
+
+    def test_command_listed_first_wins(self):
+        self.assertCommand("!inter next and forza inter", "forza inter")
+        self.assertCommand("!inter sidebar !inter seriea", "!inter seriea")
+
+    def test_invalid_command(self):
+        self.assertCommand("!inter unknowncommand", "invalid")
+
+
+class TestProcessComments(unittest.TestCase):
+
+    def setUp(self):
+        storage_util.close()
+        self.now = 1000000.0
+        self.patches = [
+            mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:"),
+            mock.patch.object(reddit_comment_util, "processed_comments", ProcessedItemLedger(clock=lambda: self.now)),
+            mock.patch.object(reddit_comment_util, "command_rate_limiter", KeyedTokenBucket(2, 60, clock=lambda: self.now)),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        storage_util.close()
+        for patch in self.patches:
+            patch.stop()
+
+    def get_comment(self, body="forza inter", fullname="t1_abc", created_utc=None, saved=False):
+        return mock.Mock(body=body, fullname=fullname, author="someone", created_utc=self.now + 60 if created_utc is None else created_utc, saved=saved)
+
+    def test_comment_is_processed_once_without_saving(self):
+        comment = self.get_comment()
+        reddit_comment_util._process_comments(None, comment)
+        reddit_comment_util._process_comments(None, comment)
+        comment.reply.assert_called_once_with(resources.CommentReplies.FORZA_INTER)
+        comment.save.assert_not_called()
+
+    def test_comment_saved_before_ledger_is_skipped(self):
+        comment = self.get_comment(created_utc=self.now - 60, saved=True)
+        reddit_comment_util._process_comments(None, comment)
+        comment.reply.assert_not_called()
+
+    def test_saved_state_ignored_for_new_comments(self):
+        comment = self.get_comment(saved=True)
+        reddit_comment_util._process_comments(None, comment)
+        comment.reply.assert_called_once_with(resources.CommentReplies.FORZA_INTER)
+
+    def test_commands_over_user_rate_limit_are_ignored(self):
+        comments = [self.get_comment(fullname=f"t1_{index}") for index in range(3)]
+        for comment in comments:
+            reddit_comment_util._process_comments(None, comment)
+        comments[0].reply.assert_called_once()
+        comments[1].reply.assert_called_once()
+        comments[2].reply.assert_not_called()
+        self.assertTrue(reddit_comment_util.processed_comments.contains("t1_2"))
+
+    def test_command_refused_by_daily_budget_is_replied(self):
+        next_match = {"fixture": {"id": 1}}
+        with mock.patch.object(rapidapi_client_util, "quota_accountant", QuotaAccountant(0)), mock.patch.object(rapidapi_client_util, "response_cache", TTLCache(10)), \
+                mock.patch.object(rapidapi_util, "fetch_next_game", return_value=next_match), mock.patch.object(rapidapi_client_util, "_fetch_from_api") as fetch_from_api:
+            for fullname, body in (("t1_seriea", "!inter seriea"), ("t1_injuries", "!inter injuries")):
+                comment = self.get_comment(body=body, fullname=fullname)
+                reddit_comment_util.process_comment(None, comment)
+                comment.reply.assert_called_once_with(resources.CommentReplies.DATA_TEMPORARILY_UNAVAILABLE)
+                self.assertTrue(reddit_comment_util.processed_comments.contains(fullname))
+            fetch_from_api.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
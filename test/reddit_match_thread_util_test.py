@@ -0,0 +1,136 @@
+import math
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.data import variables
+from reddit_bot.util import match_thread_state_util, reddit_match_thread_util, storage_util
+from reddit_bot.util.rapidapi_client_util import ApiResponse
+
+
+def get_fixture(home_goals):
+    return {
+        "fixture": {"id": 1, "status": {"short": "1H", "elapsed": 10}, "venue": {"name": "San Siro"}, "referee": None},
+        "league": {"name": "Serie A", "round": "Regular Season - 1"},
+        "teams": {"home": {"id": 505, "name": "Inter"}, "away": {"id": 489, "name": "AC Milan"}},
+        "goals": {"home": home_goals, "away": 0},
+    }
+
+
+class TestUpdateLiveMatchThread(unittest.TestCase):
+
+    def setUp(self):
+        variables.MatchThreadVariables.live_match_in_progress.clear()
+        self.update_patch = mock.patch.object(reddit_match_thread_util, "update_match_thread", return_value=None)
+        self.update_match_thread = self.update_patch.start()
+
+    def tearDown(self):
+        variables.MatchThreadVariables.live_match_in_progress.clear()
+        self.update_patch.stop()
+
+    def test_parked_when_no_match_is_live(self):
+        delay = reddit_match_thread_util.update_live_match_thread(None)
+        self.update_match_thread.assert_not_called()
+        self.assertEqual(delay, math.inf)
+
+    def test_runs_when_match_is_live(self):
+        variables.MatchThreadVariables.live_match_in_progress.set()
+        reddit_match_thread_util.update_live_match_thread(None)
+        self.update_match_thread.assert_called_once_with(None)
+
+
+class TestUpdateMatchThread(unittest.TestCase):
+
+    def setUp(self):
+        variables.MatchThreadVariables.live_match_football_api_id = 1
+        variables.MatchThreadVariables.live_match_reddit_submission_id = "abc123"
+        variables.MatchThreadVariables.live_match_content_hash = ""
+        variables.MatchThreadVariables.live_match_edits_performed = 0
+        variables.MatchThreadVariables.live_match_edits_skipped = 0
+        self.reddit_instance = mock.Mock()
+        self.fetch_patch = mock.patch.object(reddit_match_thread_util.rapidapi_client_util, "fetch")
+        self.fetch = self.fetch_patch.start()
+        storage_util.close()
+        self.database_patch = mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:")
+        self.database_patch.start()
+
+    def tearDown(self):
+        self.fetch_patch.stop()
+        storage_util.close()
+        self.database_patch.stop()
+
+    def test_unchanged_content_is_not_edited(self):
+        self.fetch.return_value = ApiResponse(200, {"response": [get_fixture(0)]})
+        reddit_match_thread_util.update_match_thread(self.reddit_instance)
+        reddit_match_thread_util.update_match_thread(self.reddit_instance)
+        self.assertEqual(self.reddit_instance.submission.return_value.edit.call_count, 1)
+        self.assertEqual(variables.MatchThreadVariables.live_match_edits_skipped, 1)
+
+    def test_changed_content_is_edited(self):
+        self.fetch.return_value = ApiResponse(200, {"response": [get_fixture(0)]})
+        reddit_match_thread_util.update_match_thread(self.reddit_instance)
+        self.fetch.return_value = ApiResponse(200, {"response": [get_fixture(1)]})
+        reddit_match_thread_util.update_match_thread(self.reddit_instance)
+        self.assertEqual(self.reddit_instance.submission.return_value.edit.call_count, 2)
+        self.assertEqual(variables.MatchThreadVariables.live_match_edits_performed, 2)
+
+    def test_match_not_played_ends_live_match(self):
+        for status_short, status_long in (("PST", "Match Postponed"), ("ABD", "Match Abandoned")):
+            with self.subTest(status_short):
+                variables.MatchThreadVariables.live_match_football_api_id = 1
+                variables.MatchThreadVariables.live_match_reddit_submission_id = "abc123"
+                variables.MatchThreadVariables.live_match_thread_created = True
+                variables.MatchThreadVariables.live_match_in_progress.set()
+                match_thread_state_util.checkpoint()
+                fixture = get_fixture(0)
+                fixture["fixture"]["status"] = {"short": status_short, "long": status_long, "elapsed": None}
+                self.fetch.return_value = ApiResponse(200, {"response": [fixture]})
+                with mock.patch.object(reddit_match_thread_util, "create_post_match_thread") as create_post_match_thread:
+                    reddit_match_thread_util.update_match_thread(self.reddit_instance)
+                create_post_match_thread.assert_not_called()
+                self.assertIn(f"# {status_long}: Inter 0-0 AC Milan", self.reddit_instance.submission.return_value.edit.call_args[0][0])
+                self.assertFalse(variables.MatchThreadVariables.live_match_in_progress.is_set())
+                self.assertFalse(variables.MatchThreadVariables.live_match_thread_created)
+                self.assertIsNone(variables.MatchThreadVariables.live_match_football_api_id)
+                self.assertFalse(match_thread_state_util.restore())  # Ended live match was checkpointed.
+
+
+class TestCreatePreMatchThread(unittest.TestCase):
+
+    def setUp(self):
+        self.next_match = get_fixture(0)
+        self.next_match["fixture"]["date"] = "2025-03-01T20:45:00+00:00"
+        self.next_match["league"]["id"] = 135
+        storage_util.close()
+        self.patches = [
+            mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:"),
+            mock.patch.object(reddit_match_thread_util, "create_submission"),
+            mock.patch.object(reddit_match_thread_util.match_thread_registry, "find", return_value=None),
+            mock.patch.object(reddit_match_thread_util.rapidapi_client_util, "fetch", side_effect=self.fetch),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        storage_util.close()
+        for patch in self.patches:
+            patch.stop()
+        variables.MatchThreadVariables.pre_match_thread_created = False
+
+    def fetch(self, url):
+        if "injuries" in url:
+            raise ValueError("API error")
+        if "headtohead" in url:
+            return ApiResponse(200, {"response": [get_fixture(2) | {"fixture": {"status": {"short": "FT"}, "date": "2024-03-01T20:45:00+00:00", "timestamp": 1}}]})
+        return ApiResponse(200, {"response": []})
+
+    def test_thread_is_created_without_failed_section(self):
+        reddit_match_thread_util.create_pre_match_thread(None, None, self.next_match)
+        submission_content = reddit_match_thread_util.create_submission.call_args[0][2]
+        self.assertIn("## 📋 Match Info 📋", submission_content)
+        self.assertIn("## ⚔️ Head-to-Head ⚔️", submission_content)
+        self.assertNotIn("Injured/Suspended Players", submission_content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import time
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.data import resources, variables
+from reddit_bot.util import reddit_submission_util, storage_util
+from reddit_bot.util.reddit_submission_util import get_submission_actions, FLAIR, REPLY, REMOVE, SAVE, LOG
+from reddit_bot.util.submission_state_util import SubmissionStateIndex
+
+
+def get_submission(title="Inter win again", selftext="", url="https://www.reddit.com/r/testsub/comments/abc/", link_flair_text=None, saved=False, submission_id="abc", created_utc=None):
+    created_utc = time.time() if created_utc is None else created_utc
+    return mock.Mock(id=submission_id, fullname="t3_" + submission_id, title=title, selftext=selftext, url=url, link_flair_text=link_flair_text, saved=saved, author=None, created_utc=created_utc)
+
+
+class TestGetSubmissionActions(unittest.TestCase):
+
+    def setUp(self):
+        self.transfer_news_detection = variables.BotSettings.transfer_news_detection
+        variables.BotSettings.transfer_news_detection = True
+
+    def tearDown(self):
+        variables.BotSettings.transfer_news_detection = self.transfer_news_detection
+
+    def get_action_types(self, submission):
+        return [action for action, _ in get_submission_actions(submission)]
+
+    def test_no_actions(self):
+        self.assertEqual(get_submission_actions(get_submission()), [])
+        self.assertEqual(get_submission_actions(get_submission(link_flair_text="News")), [])
+
+    def test_removed_flair(self):
+        actions = get_submission_actions(get_submission(link_flair_text="Removed - Duplicate"))
+        self.assertEqual(actions, [(REPLY, resources.SubmissionReplies.REMOVED_DUPLICATE), (REMOVE, None), (LOG, "Removed post due to duplication")])
+
+    def test_transfer_market_flair_only_once(self):
+        self.assertEqual(self.get_action_types(get_submission(link_flair_text="Transfer Market")), [REPLY, SAVE, LOG])
+        self.assertEqual(get_submission_actions(get_submission(link_flair_text="Transfer Market", saved=True)), [])
+
+    def test_content_rules_skipped_for_flaired_submissions(self):
+        self.assertEqual(get_submission_actions(get_submission(title="Free crypto", link_flair_text="Discussion")), [])
+
+    def test_content_rule(self):
+        actions = get_submission_actions(get_submission(url="https://x.com/inter/status/1"))
+        self.assertEqual(actions[0], (FLAIR, resources.SubmissionFlairs.REMOVED_RULES))
+        self.assertEqual(actions[1], (REPLY, resources.SubmissionReplies.TWITTER))
+
+    def test_fields_are_matched_case_insensitively(self):
+        self.assertEqual(get_submission_actions(get_submission(title="Join our DISCORD"))[1], (REPLY, resources.SubmissionReplies.DISCORD))
+
+    def test_keyword_only_matched_in_its_fields(self):
+        self.assertEqual(get_submission_actions(get_submission(selftext="check x.com")), [])
+
+    def test_all_triggered_rules_in_order(self):
+        actions = get_submission_actions(get_submission(title="Romano: tickets and crypto airdrop"))
+        replies = [argument for action, argument in actions if action == REPLY]
+        self.assertEqual(replies, [resources.SubmissionReplies.IDENTIFIED_TRANSFER_MARKET, resources.SubmissionReplies.TICKETS, resources.SubmissionReplies.SPAM])
+
+    def test_overlapping_keywords_of_different_rules(self):
+        # Spam keyword "airdrop" starts at the last letter of transfer keyword "gazzetta".
+        actions = get_submission_actions(get_submission(title="gazzettairdrop"))
+        replies = [argument for action, argument in actions if action == REPLY]
+        self.assertEqual(replies, [resources.SubmissionReplies.IDENTIFIED_TRANSFER_MARKET, resources.SubmissionReplies.SPAM])
+
+    def test_transfer_detection_disabled(self):
+        variables.BotSettings.transfer_news_detection = False
+        self.assertEqual(get_submission_actions(get_submission(title="Romano: here we go")), [])
+
+
+class TestProcessSubmissionsBatch(unittest.TestCase):
+
+    def setUp(self):
+        storage_util.close()
+        self.patches = [
+            mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:"),
+            mock.patch.object(reddit_submission_util, "submission_states", SubmissionStateIndex()),
+            mock.patch.object(variables.SubmissionVariables, "newest_submission_fullname", None),
+            mock.patch.object(variables.SubmissionVariables, "previous_submission_fullname", None),
+            mock.patch.object(variables.SubmissionVariables, "last_full_scan", 0.0),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.reddit_instance = mock.Mock()
+        self.subreddit = self.reddit_instance.subreddit.return_value
+
+    def tearDown(self):
+        storage_util.close()
+        for patch in self.patches:
+            patch.stop()
+
+    def test_batches_between_full_scans_only_fetch_newer_submissions(self):
+        self.subreddit.new.return_value = [get_submission(submission_id="new"), get_submission(submission_id="old", created_utc=time.time() - 60)]
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        self.assertEqual(self.subreddit.new.call_args.kwargs["params"], {})
+
+        self.subreddit.new.return_value = [get_submission(submission_id="newest"), get_submission(submission_id="new", created_utc=time.time() - 30)]
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        self.assertEqual(self.subreddit.new.call_args.kwargs["params"], {"before": "t3_old"})
+
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        self.assertEqual(self.subreddit.new.call_args.kwargs["params"], {"before": "t3_new"})
+
+    def test_deleted_newest_submission_does_not_stall_batches(self):
+        self.subreddit.new.return_value = [get_submission(submission_id="new"), get_submission(submission_id="old", created_utc=time.time() - 60)]
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+
+        # Newest submission was deleted and nothing was posted since, cursors fall back and the next batch is a full scan.
+        self.subreddit.new.return_value = []
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        self.assertEqual(self.subreddit.new.call_args.kwargs["params"], {"before": "t3_old"})
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        self.assertEqual(self.subreddit.new.call_args.kwargs["params"], {})
+
+        # Submission posted after the deleted one is listed by the next incremental batch.
+        self.subreddit.new.return_value = [get_submission(submission_id="posted"), get_submission(submission_id="old", created_utc=time.time() - 60)]
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        self.subreddit.new.return_value = [get_submission(submission_id="latest"), get_submission(submission_id="posted", created_utc=time.time() - 30)]
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        self.assertEqual(self.subreddit.new.call_args.kwargs["params"], {"before": "t3_old"})
+        self.assertEqual(variables.SubmissionVariables.newest_submission_fullname, "t3_latest")
+
+    def test_unchanged_submissions_are_processed_once(self):
+        submission = get_submission(link_flair_text="Removed - Rules")
+        self.subreddit.new.return_value = [submission]
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        variables.SubmissionVariables.last_full_scan = 0.0  # Force another full scan.
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        submission.mod.remove.assert_called_once_with(spam=True)
+
+    def test_flair_change_is_processed(self):
+        self.subreddit.new.return_value = [get_submission()]
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        flaired_submission = get_submission(link_flair_text="Removed - Rules")
+        self.subreddit.new.return_value = [flaired_submission]
+        variables.SubmissionVariables.last_full_scan = 0.0
+        reddit_submission_util.process_submissions_batch(self.reddit_instance)
+        flaired_submission.mod.remove.assert_called_once_with(spam=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
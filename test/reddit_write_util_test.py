@@ -0,0 +1,88 @@
+import threading
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.replay.fake_reddit import FakeReddit
+from reddit_bot.util import reddit_write_util
+from reddit_bot.util.reddit_write_util import RedditWriteQueue, get_pacing_delay
+
+
+class TestPacingDelay(unittest.TestCase):
+
+    def test_unknown_limits(self):
+        self.assertEqual(get_pacing_delay({"remaining": None, "reset_timestamp": None}, 1000), 0.0)
+
+    def test_writes_are_spread_over_window(self):
+        limits = {"remaining": config.Reddit.WRITE_RATE_LIMIT_RESERVE + 100, "reset_timestamp": 1300}
+        self.assertEqual(get_pacing_delay(limits, 1000), 3.0)
+
+    def test_reserve_waits_for_reset(self):
+        limits = {"remaining": config.Reddit.WRITE_RATE_LIMIT_RESERVE, "reset_timestamp": 1300}
+        self.assertEqual(get_pacing_delay(limits, 1000), 300)
+        self.assertEqual(get_pacing_delay(limits, 1400), 0.0)
+
+
+class TestRedditWriteQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = RedditWriteQueue()
+        self.performed = []
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.stop()
+
+    def write(self, name):
+        self.performed.append(name)
+        return name
+
+    # Starts the queue and holds the writer on a first write, so that writes queued meanwhile are picked by priority.
+    def start_blocked(self):
+        self.queue.start(FakeReddit())
+        self.queue.submit(reddit_write_util.MATCH_THREAD, self.release.wait)
+        while self.queue.get_queue_depth():
+            pass
+
+    def test_inline_until_started(self):
+        self.assertEqual(self.queue.perform(reddit_write_util.SIDEBAR, self.write, "sidebar"), "sidebar")
+        future = self.queue.submit(reddit_write_util.COMMAND_REPLY, mock.Mock(side_effect=ValueError("failed")))
+        self.assertIsInstance(future.exception(), ValueError)
+
+    def test_writes_are_performed_by_priority(self):
+        self.start_blocked()
+        futures = [self.queue.submit(priority, self.write, name) for priority, name in (
+            (reddit_write_util.SIDEBAR, "sidebar"),
+            (reddit_write_util.COMMAND_REPLY, "reply_1"),
+            (reddit_write_util.MATCH_THREAD, "edit"),
+            (reddit_write_util.COMMAND_REPLY, "reply_2"),
+            (reddit_write_util.MODERATION, "removal"),
+        )]
+        self.release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(self.performed, ["edit", "removal", "reply_1", "reply_2", "sidebar"])
+
+    def test_queued_write_is_replaced(self):
+        self.start_blocked()
+        first = self.queue.submit(reddit_write_util.MATCH_THREAD, self.write, "first", coalesce_key=("edit", "abc"))
+        second = self.queue.submit(reddit_write_util.MATCH_THREAD, self.write, "second", coalesce_key=("edit", "abc"))
+        self.release.set()
+        self.assertIs(first, second)
+        self.assertEqual(first.result(timeout=5), "second")
+        self.assertEqual(self.performed, ["second"])
+        self.assertEqual(self.queue.stats()["match_thread"]["coalesced"], 1)
+
+    def test_stop_performs_queued_writes(self):
+        with mock.patch.object(reddit_write_util, "get_pacing_delay", return_value=3600):  # Pacing is skipped when stopping.
+            self.start_blocked()
+            futures = [self.queue.submit(reddit_write_util.COMMAND_REPLY, self.write, index) for index in range(3)]
+            self.release.set()
+            self.queue.stop()
+        self.assertEqual([future.result(timeout=0) for future in futures], [0, 1, 2])
+        self.assertEqual(self.queue.get_queue_depth(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
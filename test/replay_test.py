@@ -0,0 +1,122 @@
+import threading
+import unittest
+
+import requests
+
+from reddit_bot.config import config
+from reddit_bot.replay import match_day
+from reddit_bot.replay.api_stub import RapidApiStub
+from reddit_bot.replay.fake_reddit import FakeReddit
+from reddit_bot.replay.timeline import FIRST_HALF_END, SECOND_HALF_END, SECOND_HALF_START, MatchTimeline, ReplayClock, load_recording
+from reddit_bot.util import rapidapi_client_util
+
+
+class TestMatchTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = ReplayClock(-60 * 60)
+        self.timeline = MatchTimeline(load_recording("fixture_live"), self.clock)
+
+    def test_not_started_before_kickoff(self):
+        fixture = self.timeline.get_fixture()
+        self.assertEqual(fixture["fixture"]["status"]["short"], "NS")
+        self.assertEqual(fixture["goals"], {"home": None, "away": None})
+        self.assertEqual(fixture["events"], [])
+        self.assertAlmostEqual(fixture["fixture"]["timestamp"], self.clock.to_wall_time(0), delta=1)
+
+    def test_score_follows_events(self):
+        first_half = self.timeline.get_fixture(30 * 60)
+        self.assertEqual((first_half["fixture"]["status"]["short"], first_half["fixture"]["status"]["elapsed"]), ("1H", 31))
+        self.assertEqual(first_half["goals"], {"home": 1, "away": 1})
+
+        half_time = self.timeline.get_fixture(FIRST_HALF_END)
+        self.assertEqual(half_time["fixture"]["status"]["short"], "HT")
+        self.assertEqual(half_time["score"]["halftime"], {"home": 2, "away": 1})
+
+        full_time = self.timeline.get_fixture(SECOND_HALF_END)
+        self.assertEqual(full_time["fixture"]["status"]["short"], "FT")
+        self.assertEqual(full_time["goals"], {"home": 3, "away": 2})
+        self.assertEqual(len(full_time["events"]), len(load_recording("fixture_live")["response"][0]["events"]))
+
+    def test_finished_after_second_half(self):
+        self.clock.advance(60 * 60 + SECOND_HALF_START)
+        self.assertFalse(self.timeline.is_finished())
+        self.clock.advance(SECOND_HALF_END - SECOND_HALF_START)
+        self.assertTrue(self.timeline.is_finished())
+
+
+class TestRapidApiStub(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = RapidApiStub(MatchTimeline(load_recording("fixture_live"), ReplayClock(0)))
+        self.stub.start()
+
+    def tearDown(self):
+        self.stub.stop()
+
+    def test_serves_live_fixture_and_recordings(self):
+        with self.stub.install(rapidapi_client_util.get_session()):
+            fixture = rapidapi_client_util.get_session().get(config.FootballRapidApi.get_fixture_by_id_url(self.stub.timeline.fixture_id)).json()
+            standings = rapidapi_client_util.get_session().get(config.FootballRapidApi.get_table_by_league_id_url(135)).json()
+        self.assertEqual(fixture["response"][0]["fixture"]["status"]["short"], "1H")
+        self.assertEqual(len(standings["response"][0]["league"]["standings"][0]), 20)
+        self.assertEqual(self.stub.requests, {"fixture_by_id": 1, "standings": 1})
+
+    def test_unknown_endpoint(self):
+        status_code, _ = self.stub.get_response("/v3/odds", {})
+        self.assertEqual(status_code, 404)
+
+    def test_install_restores_session(self):
+        session = requests.Session()
+        adapters = dict(session.adapters)
+        with self.stub.install(session):
+            self.assertNotEqual(dict(session.adapters), adapters)
+        self.assertEqual(dict(session.adapters), adapters)
+
+
+class TestFakeReddit(unittest.TestCase):
+
+    def test_records_writes(self):
+        reddit_instance = FakeReddit()
+        submission = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME).submit(title="Title", selftext="Text")
+        submission.edit("Edited")
+        comment = reddit_instance.post_comment(submission, "user", "!inter seriea")
+        comment.reply("Reply")
+
+        self.assertIs(reddit_instance.submission(id=submission.id), submission)
+        self.assertEqual(submission.selftext, "Edited")
+        self.assertEqual(reddit_instance.count_calls(), {"submit": 1, "submission.edit": 1, "comment.reply": 1})
+        self.assertEqual(comment.author, "USER")
+        self.assertEqual(comment.replies[0].author, config.Reddit.BOT_REDDIT_USER)
+
+        reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME).stream.close()
+        self.assertEqual(list(reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME).stream.comments()), [comment])
+
+
+class TestRunMatchDay(unittest.TestCase):
+
+    def test_full_match(self):
+        stats = match_day.run_match_day()
+        self.assertTrue(stats["finished"])
+        self.assertEqual(len(stats["submissions"]), 3)
+        self.assertTrue(stats["submissions"][2].startswith("[Post-Match Discussion Thread] Inter 3:2 AC Milan"))
+        self.assertEqual(stats["reddit_calls"]["comment.reply"], len(match_day.DEFAULT_COMMENTS))
+        self.assertGreater(stats["reddit_calls"]["submission.edit"], 0)
+        self.assertGreater(stats["api_requests"]["fixture_by_id"], 0)
+        self.assertNotIn("unknown", stats["api_requests"])
+
+    # Full time with the write queue started, the final live edit is performed by the writer thread while the post-match thread is created.
+    def test_full_time_with_queued_writes(self):
+        results = []
+        replay = threading.Thread(target=lambda: results.append(match_day.run_match_day(latency=0.05, start=SECOND_HALF_END - 120, queued=True)), daemon=True)
+        replay.start()
+        replay.join(60)
+        self.assertFalse(replay.is_alive(), "Replay with queued writes didn't finish.")
+        stats = results[0]
+        self.assertTrue(stats["finished"])
+        self.assertGreater(stats["reddit_calls"]["submission.edit"], 0)
+        self.assertEqual(stats["reddit_calls"]["comment.reply"], len(match_day.DEFAULT_COMMENTS))
+
+
+if __name__ == "__main__":
+    unittest.main()
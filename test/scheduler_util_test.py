@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+import unittest
+
+from reddit_bot.util.scheduler_util import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = Scheduler(2)
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_periodic_job_runs_repeatedly(self):
+        calls = []
+        self.scheduler.add_job("job", calls.append, (1,), interval=0.02)
+        self.scheduler.start()
+        time.sleep(0.15)
+        self.assertGreaterEqual(len(calls), 4)
+        self.assertEqual(self.scheduler.stats()["job"]["failures"], 0)
+
+    def test_failing_job_keeps_running(self):
+        def failing_job():
+            raise ValueError("API error")
+
+        self.scheduler.add_job("failing_job", failing_job, interval=0.02)
+        self.scheduler.start()
+        time.sleep(0.1)
+        stats = self.scheduler.stats()["failing_job"]
+        self.assertGreaterEqual(stats["runs"], 2)
+        self.assertEqual(stats["runs"], stats["failures"])
+
+    def test_missed_runs_are_coalesced(self):
+        calls = []
+
+        def slow_job():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                time.sleep(0.11)  # Overrun five 0.02 second intervals.
+
+        self.scheduler.add_job("slow_job", slow_job, interval=0.02)
+        self.scheduler.start()
+        time.sleep(0.13)
+        self.assertGreaterEqual(self.scheduler.stats()["slow_job"]["coalesced"], 3)
+        self.assertLessEqual(len(calls), 3)
+
+    def test_job_does_not_overlap_itself(self):
+        running = threading.Event()
+        overlaps = []
+
+        def long_job():
+            if running.is_set():
+                overlaps.append(True)
+            running.set()
+            time.sleep(0.05)
+            running.clear()
+
+        self.scheduler.add_job("long_job", long_job, interval=0.01)
+        self.scheduler.start()
+        time.sleep(0.2)
+        self.assertEqual(overlaps, [])
+
+    def test_job_can_override_next_run_delay(self):
+        calls = []
+
+        def job():
+            calls.append(True)
+            return 3600  # Sleep for an hour instead of the configured interval.
+
+        self.scheduler.add_job("job", job, interval=0.01)
+        self.scheduler.start()
+        time.sleep(0.1)
+        self.assertEqual(len(calls), 1)
+
+    def test_idle_scheduler_is_parked(self):
+        # A busy-spinning scheduler would consume roughly all of the measured wall time as CPU time.
+        self.scheduler.add_job("hourly_job", lambda: None, interval=3600, initial_delay=3600)
+        self.scheduler.start()
+        cpu_start = time.process_time()
+        time.sleep(0.3)
+        self.assertLess(time.process_time() - cpu_start, 0.05)
+
+    def test_parked_job_runs_only_when_woken(self):
+        calls = []
+
+        def job():
+            calls.append(True)
+            return math.inf  # Park until woken up.
+
+        self.scheduler.add_job("job", job, interval=0.01, initial_delay=math.inf)
+        self.scheduler.start()
+        cpu_start = time.process_time()
+        time.sleep(0.3)
+        self.assertLess(time.process_time() - cpu_start, 0.05)
+        self.assertEqual(calls, [])
+
+        self.scheduler.wake("job")
+        time.sleep(0.1)
+        self.assertEqual(calls, [True])
+
+    def test_running_job_is_woken_after_run(self):
+        started = threading.Event()
+        calls = []
+
+        def job():
+            calls.append(True)
+            started.set()
+            time.sleep(0.05)
+            return 3600
+
+        self.scheduler.add_job("job", job, interval=3600)
+        self.scheduler.start()
+        started.wait(1)
+        self.scheduler.wake("job", 0.01)
+        time.sleep(0.15)
+        self.assertEqual(len(calls), 2)
+
+    def test_stop_waits_for_running_job(self):
+        finished = []
+
+        def job():
+            time.sleep(0.05)
+            finished.append(True)
+
+        self.scheduler.add_job("job", job, interval=3600)
+        self.scheduler.start()
+        time.sleep(0.01)
+        self.scheduler.stop()
+        self.assertEqual(finished, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
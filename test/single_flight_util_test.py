@@ -0,0 +1,61 @@
+import threading
+import time
+import unittest
+
+from reddit_bot.util.single_flight_util import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.single_flight = SingleFlight()
+
+    def run_concurrently(self, func, callers=5):
+        results = []
+        errors = []
+
+        def call():
+            try:
+                results.append(self.single_flight.do("standings", func))
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_share_result(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"response": []}
+
+        results, _ = self.run_concurrently(fetch)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.single_flight.stats(), {"calls": 5, "shared_calls": 4, "in_flight": 0})
+
+    def test_concurrent_calls_share_exception(self):
+        def fetch():
+            time.sleep(0.05)
+            raise ValueError("API error")
+
+        results, errors = self.run_concurrently(fetch)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 5)
+
+    def test_sequential_calls_are_not_shared(self):
+        calls = []
+        self.single_flight.do("standings", lambda: calls.append(1))
+        self.single_flight.do("standings", lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+
+from reddit_bot.config import config
+from reddit_bot.util import storage_util
+from reddit_bot.util.submission_state_util import SubmissionStateIndex, get_fingerprint
+
+
+def get_submission(submission_id="abc", link_flair_text=None, created_utc=1000.0):
+    return mock.Mock(id=submission_id, title="Inter win again", selftext="", url="https://www.reddit.com/r/testsub/comments/abc/", link_flair_text=link_flair_text, created_utc=created_utc)
+
+
+class TestSubmissionStateIndex(unittest.TestCase):
+
+    def setUp(self):
+        storage_util.close()
+        self.database_patch = mock.patch.object(config.Storage, "DATABASE_PATH", ":memory:")
+        self.database_patch.start()
+        self.now = 2000.0
+        self.index = SubmissionStateIndex(clock=lambda: self.now)
+
+    def tearDown(self):
+        storage_util.close()
+        self.database_patch.stop()
+
+    def test_unchanged_submission_is_evaluated(self):
+        submission = get_submission()
+        self.assertFalse(self.index.is_evaluated(submission.id, get_fingerprint(submission)))
+        self.index.record(submission, get_fingerprint(submission), "")
+        self.assertTrue(self.index.is_evaluated(submission.id, get_fingerprint(submission)))
+
+    def test_flair_change_requires_evaluation(self):
+        submission = get_submission()
+        self.index.record(submission, get_fingerprint(submission), "")
+        flaired_submission = get_submission(link_flair_text="Removed - Rules")
+        self.assertFalse(self.index.is_evaluated(flaired_submission.id, get_fingerprint(flaired_submission)))
+
+    def test_state_is_restored_from_storage(self):
+        submission = get_submission(link_flair_text="Transfer Market")
+        self.index.record(submission, get_fingerprint(submission), "transfer market")
+        restored_index = SubmissionStateIndex()
+        self.assertTrue(restored_index.is_evaluated(submission.id, get_fingerprint(submission)))
+        self.assertEqual(storage_util.execute("SELECT flair, last_action FROM submission_state"), [("Transfer Market", "transfer market")])
+
+    def test_prune(self):
+        old_submission = get_submission("old", created_utc=self.now - config.Reddit.SUBMISSION_STATE_RETENTION - 1)
+        new_submission = get_submission("new", created_utc=self.now)
+        self.index.record(old_submission, get_fingerprint(old_submission), "")
+        self.index.record(new_submission, get_fingerprint(new_submission), "")
+        self.assertEqual(self.index.prune(), 1)
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(len(SubmissionStateIndex()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Thread-safe in-memory cache with per-entry time-to-live and LRU eviction once the size limit is reached.
+class TTLCache:
+    def __init__(self, max_size: int, clock=time.monotonic):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries = OrderedDict()  # Key -> (expiry timestamp, value). Most recently used entries are at the end.
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    # Returns the value even if it expired, as long as it wasn't evicted yet. Fallback for when fresh data can't be fetched.
+    def get_stale(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)  # Evict least recently used entry.
+                self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+if __name__ == "__main__":
+    pass
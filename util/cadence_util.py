@@ -0,0 +1,60 @@
+import time
+from typing import Final
+
+from reddit_bot.config import config
+
+PRE_MATCH_THREAD_LEAD_TIME: Final[int] = 86400  # In seconds - pre-match thread is created one day before kickoff.
+LIVE_MATCH_THREAD_LEAD_TIME: Final[int] = 3600  # In seconds - live match thread is created one hour before kickoff.
+LEAD_TIME_MARGIN: Final[int] = 30  # In seconds - wake up slightly after the lead time boundary, so that the creation check passes.
+
+NOT_STARTED_STATUSES: Final[tuple[str, ...]] = ("TBD", "NS")
+PAUSED_STATUSES: Final[tuple[str, ...]] = ("HT", "SUSP", "INT")
+NOT_PLAYED_STATUSES: Final[tuple[str, ...]] = ("PST", "CANC", "ABD", "AWD", "WO")  # Live match ends without a post-match thread.
+FINISHED_STATUSES: Final[tuple[str, ...]] = ("FT", "AET", "PEN") + NOT_PLAYED_STATUSES
+
+# Minute from which the end of each period is polled more often (stoppage time included).
+LATE_GAME_MINUTES: Final[dict[str, int]] = {"1H": 40, "2H": 85, "ET": 115}
+
+
+def _clamp(delay: float) -> float:
+    return max(config.Reddit.MATCH_THREAD_CHECK_MIN_INTERVAL, min(delay, config.Reddit.MATCH_THREAD_CHECK_MAX_INTERVAL))
+
+
+# Delay until the next match thread creation check. Sleeps until the next thread (pre-match at T-24h, live match at T-60m) is due.
+def get_match_thread_check_delay(next_match, pre_match_thread_created: bool, live_match_thread_created: bool, now: float = None) -> float:
+    if not next_match or not next_match["fixture"].get("timestamp"):
+        return config.Reddit.MATCH_THREAD_CHECK_INTERVAL
+    if live_match_thread_created:
+        return config.Reddit.MATCH_THREAD_CHECK_MAX_INTERVAL  # Next fixture can't change until the live match is finished.
+
+    now = time.time() if now is None else now
+    remaining_until_kickoff = next_match["fixture"]["timestamp"] - now
+    lead_time = LIVE_MATCH_THREAD_LEAD_TIME if pre_match_thread_created else PRE_MATCH_THREAD_LEAD_TIME
+    return _clamp(remaining_until_kickoff - lead_time + LEAD_TIME_MARGIN)
+
+
+# Delay until the next live match thread update, based on the state of the fixture.
+def get_match_thread_update_delay(fixture, now: float = None) -> float:
+    if not fixture:
+        return config.Reddit.MATCH_THREAD_UPDATE_INTERVAL
+
+    status = fixture.get("fixture", {}).get("status", {})
+    status_short = status.get("short", "")
+    elapsed = status.get("elapsed") or 0
+
+    if status_short in NOT_STARTED_STATUSES:
+        # Poll for lineups before kickoff, but don't sleep past the kickoff itself.
+        now = time.time() if now is None else now
+        remaining_until_kickoff = (fixture["fixture"].get("timestamp") or now) - now
+        return max(config.Reddit.MATCH_THREAD_LATE_GAME_UPDATE_INTERVAL, min(config.Reddit.MATCH_THREAD_PRE_KICKOFF_UPDATE_INTERVAL, remaining_until_kickoff))
+    if status_short in PAUSED_STATUSES:
+        return config.Reddit.MATCH_THREAD_PAUSED_UPDATE_INTERVAL
+    if status_short in FINISHED_STATUSES:
+        return config.Reddit.MATCH_THREAD_UPDATE_INTERVAL  # Live match was already ended by the update, the next run parks the job.
+    if status_short in ("BT", "P") or elapsed >= LATE_GAME_MINUTES.get(status_short, 1000):
+        return config.Reddit.MATCH_THREAD_LATE_GAME_UPDATE_INTERVAL
+    return config.Reddit.MATCH_THREAD_UPDATE_INTERVAL
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,97 @@
+import queue
+import threading
+import time
+import zlib
+
+from reddit_bot.util.logging_util import logger
+
+
+# Pool of workers handling comments read from the comment stream, so that a slow command doesn't stall reading of following comments.
+# Comments are routed to workers by their submission, so comments in the same thread are handled in the order they were posted.
+# Each worker has a bounded queue and the stream reader blocks while the target queue is full (backpressure).
+class CommentWorkerPool:
+    def __init__(self, handler, workers: int, queue_size: int, clock=time.monotonic):
+        self._handler = handler  # Called with each comment.
+        self._clock = clock
+        self._queues = [queue.Queue(maxsize=max(1, queue_size // workers)) for _ in range(workers)]
+        self._threads = [threading.Thread(target=self._run_worker, args=(worker_queue,), name=f"comment-worker-{index}", daemon=True) for index, worker_queue in enumerate(self._queues)]
+        self._stopped = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._handled = 0
+        self._failures = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Started {len(self._threads)} comment workers.")
+
+    # Called by the stream reader. Blocks while the queue of the comment's worker is full.
+    def submit(self, comment) -> None:
+        self._get_queue(comment).put((self._clock(), comment))
+        with self._stats_lock:
+            self._max_queue_depth = max(self._max_queue_depth, self.get_queue_depth())
+
+    def _get_queue(self, comment) -> queue.Queue:
+        return self._queues[zlib.crc32(comment.link_id.encode()) % len(self._queues)]  # Stable across restarts, unlike hash().
+
+    # Stops workers after their current comment. Queued comments aren't in the processed ledger yet, so the stream replays them after restart.
+    def stop(self) -> None:
+        self._stopped.set()
+        for worker_queue in self._queues:
+            self._put_sentinel(worker_queue)
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join()
+        logger.info("Stopped comment workers.")
+
+    # Wakes up the worker blocked on its queue. If the queue is full, queued comments are dropped to make room, they are replayed after restart.
+    @staticmethod
+    def _put_sentinel(worker_queue: queue.Queue) -> None:
+        while True:
+            try:
+                worker_queue.put_nowait(None)
+                return
+            except queue.Full:
+                try:
+                    worker_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get_queue_depth(self) -> int:
+        return sum(worker_queue.qsize() for worker_queue in self._queues)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            average_wait = self._total_wait / self._handled if self._handled else 0.0
+            return {"queue_depth": self.get_queue_depth(), "max_queue_depth": self._max_queue_depth, "handled": self._handled, "failures": self._failures, "avg_wait": round(average_wait, 3), "max_wait": round(self._max_wait, 3)}
+
+    def log_stats(self) -> None:
+        logger.info(f"Comment worker stats: {self.stats()}")
+
+    def _run_worker(self, worker_queue: queue.Queue) -> None:
+        while True:
+            item = worker_queue.get()  # Idle workers block here until a comment or the stop sentinel is queued.
+            if item is None or self._stopped.is_set():
+                return
+            enqueued_at, comment = item
+
+            wait = self._clock() - enqueued_at
+            failed = False
+            try:
+                self._handler(comment)
+            except Exception:
+                failed = True
+                logger.exception(f"Handling comment {comment.fullname} failed.")
+
+            with self._stats_lock:
+                self._handled += 1
+                self._failures += 1 if failed else 0
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+
+
+if __name__ == "__main__":
+    pass
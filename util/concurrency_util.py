@@ -0,0 +1,42 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from reddit_bot.config import config
+from reddit_bot.util.logging_util import logger
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+# Single shared pool for fan-out calls, sized to the number of pooled connections to Football Rapid API.
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.FootballRapidApi.FAN_OUT_WORKERS, thread_name_prefix="fan-out")
+        return _executor
+
+
+# Runs independent calls (name -> function without arguments) at the same time and returns their results by name, in the same order.
+# A call that fails or doesn't finish within the timeout gets the default result, so that one slow or failing call doesn't hold up the rest.
+# Calls run in a copy of the caller's context, so that context variables set by the caller are visible to them.
+def fan_out(calls: dict, timeout: float, default=None) -> dict:
+    futures = {name: get_executor().submit(contextvars.copy_context().run, func) for name, func in calls.items()}
+    deadline = time.monotonic() + timeout
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            logger.warning(f"Fan-out call {name} didn't finish within {timeout} seconds.")
+            results[name] = default
+        except Exception:
+            logger.exception(f"Fan-out call {name} failed.")
+            results[name] = default
+    return results
+
+
+if __name__ == "__main__":
+    pass
@@ -1,9 +1,49 @@
-import requests
+import re
+from functools import lru_cache
+from typing import Final
 
 from reddit_bot.config import config
+from reddit_bot.util import rapidapi_client_util
 from reddit_bot.util.date_util import format_date
 from reddit_bot.util.logging_util import logger
 
+# Mis-encoded (UTF-8 decoded as Latin-1) character sequences that Football Rapid API occasionally returns in names. Compiled once on import.
+MOJIBAKE_MAP: Final[dict[str, str]] = {
+    'Ã‡': 'Ç', 'Ã§': 'ç', 'Ã¼': 'ü', 'Ã¤': 'ä', 'Ã¶': 'ö', 'ÃŸ': 'ß',
+    'Ã©': 'é', 'Ã¨': 'è', 'Ãª': 'ê', 'Ã«': 'ë', 'Ã¡': 'á', 'Ã ': 'à',
+    'Ã¢': 'â', 'Ã£': 'ã', 'Ã±': 'ñ', 'Ã³': 'ó', 'Ã²': 'ò', 'Ã´': 'ô',
+    'Ãµ': 'õ', 'Ã¸': 'ø', 'Ã¥': 'å', 'Ã‰': 'É', 'Ãœ': 'Ü', 'Ã–': 'Ö',
+    'Ã„': 'Ä', 'â€™': "'", 'â€“': '-', 'Ã®': 'î', 'Ã¯': 'ï', 'Ã¬': 'ì',
+    'Ã­': 'í', 'Ã¿': 'ÿ', 'Ã½': 'ý', 'Å¡': 'š', 'Å¾': 'ž', 'Ä‡': 'ć',
+    'Å‚': 'ł', 'Ä™': 'ę', 'Å„': 'ń', 'Åº': 'ź', 'Ä…': 'ą', 'Ä': 'č',
+    'Å¥': 'ť', 'ÄŸ': 'ğ', 'Ä±': 'ı', 'ÅŸ': 'ş'
+}
+MOJIBAKE_REGEX: Final[re.Pattern] = re.compile('|'.join(map(re.escape, MOJIBAKE_MAP)))
+MOJIBAKE_MARKERS: Final[tuple[str, ...]] = ('Ã', 'Â', 'Ä')
+
+
+# Helper function to safely get any name (player, team, referee, venue...) from Football Rapid API data with consistent handling, including repair of mis-encoded characters.
+def get_safe_name_str(name, default="Unknown") -> str:
+    if name is None or name == "null":
+        return default
+    if isinstance(name, bytes):
+        name = name.decode('utf-8', errors='replace')
+    else:
+        name = str(name)
+    return _repair_mojibake(name)
+
+
+@lru_cache(maxsize=4096)  # The same names repeat in every live match thread update.
+def _repair_mojibake(name: str) -> str:
+    if any(marker in name for marker in MOJIBAKE_MARKERS):
+        name = MOJIBAKE_REGEX.sub(lambda m: MOJIBAKE_MAP[m.group(0)], name)
+        if any(marker in name for marker in MOJIBAKE_MARKERS):
+            try:
+                name = name.encode('latin1').decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+    return name
+
 
 def extract_cup_fixture(fixture: dict) -> dict:
     response = {
@@ -35,7 +75,7 @@ def extract_cup_fixture(fixture: dict) -> dict:
 
 def add_league_table(content: str, league_id: int, league_name: str) -> str:
     league_url = config.FootballRapidApi.get_table_by_league_id_url(league_id)
-    response = requests.get(league_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
+    response = rapidapi_client_util.fetch(league_url)
     logger.info(f"Football Rapid API: Fetched league table for: {league_name}.")
     if response.status_code == 200:
         response_json = response.json()
@@ -71,7 +111,7 @@ def add_league_table(content: str, league_id: int, league_name: str) -> str:
 
 def add_knockout_stages(content: str, competition_id: int, competition_name: str) -> str:
     knockout_url = config.FootballRapidApi.get_fixtures_by_league_id_url(competition_id)
-    response = requests.get(knockout_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
+    response = rapidapi_client_util.fetch(knockout_url)
     logger.info(f"Football Rapid API: Fetched {competition_name} KO fixtures.")
     if response.status_code == 200:
         fixtures = response.json().get("response", [])
@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import Final
+
+from reddit_bot.config import config
+from reddit_bot.util import storage_util
+from reddit_bot.util.logging_util import logger
+
+LEDGER_STARTED_AT_KEY: Final[str] = "processed_items_started_at"
+
+
+# Local ledger of processed Reddit items (by fullname), replacing save()/saved round-trips to Reddit API. Recent fullnames are kept
+# in a set for lookups and written through to storage, so that items replayed by the stream after restart are still skipped.
+class ProcessedItemLedger:
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._fullnames = None  # Loaded from storage on first use.
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> set:
+        if self._fullnames is None:
+            cutoff = self._clock() - config.Storage.PROCESSED_ITEM_RETENTION
+            self._fullnames = {fullname for fullname, in storage_util.execute("SELECT fullname FROM processed_items WHERE processed_at >= ?", (cutoff,))}
+            started_at = storage_util.get_metadata(LEDGER_STARTED_AT_KEY)
+            if started_at is None:
+                started_at = str(self._clock())
+                storage_util.set_metadata(LEDGER_STARTED_AT_KEY, started_at)
+            self._started_at = float(started_at)
+        return self._fullnames
+
+    # Time when the ledger started recording items. Items created before that can only be recognized as processed by their saved state.
+    @property
+    def started_at(self) -> float:
+        with self._lock:
+            self._load()
+            return self._started_at
+
+    def contains(self, fullname: str) -> bool:
+        with self._lock:
+            return fullname in self._load()
+
+    def add(self, fullname: str) -> None:
+        with self._lock:
+            self._load().add(fullname)
+            storage_util.execute("INSERT OR IGNORE INTO processed_items (fullname, processed_at) VALUES (?, ?)", (fullname, self._clock()))
+
+    # Scheduled job, removes items older than the retention period. These can't be replayed by the stream anymore.
+    def prune(self) -> None:
+        cutoff = self._clock() - config.Storage.PROCESSED_ITEM_RETENTION
+        with self._lock:
+            pruned_fullnames = {fullname for fullname, in storage_util.execute("SELECT fullname FROM processed_items WHERE processed_at < ?", (cutoff,))}
+            storage_util.execute("DELETE FROM processed_items WHERE processed_at < ?", (cutoff,))
+            if self._fullnames is not None:
+                self._fullnames -= pruned_fullnames
+        logger.info(f"Pruned {len(pruned_fullnames)} processed items from ledger.")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,61 @@
+import threading
+
+
+# Key of everything an event row is rendered from. Assist (or incoming player of a substitution) is often filled in by a later update,
+# which changes the key, so that the row is rendered again.
+def get_event_key(event: dict) -> tuple:
+    time_info = event.get("time") or {}
+    team_info = event.get("team") or {}
+    player_info = event.get("player") or {}
+    assist_info = event.get("assist") or {}
+    return (time_info.get("elapsed"), time_info.get("extra"), team_info.get("id"), player_info.get("id"), player_info.get("name"), assist_info.get("id"), assist_info.get("name"),
+            event.get("type"), event.get("detail"))
+
+
+# Incremental model of the live match thread. Keeps already rendered event rows and sections between updates,
+# so that only newly arrived events are formatted and sections are only re-rendered when their inputs change.
+class LiveMatchModel:
+    def __init__(self):
+        self._event_rows = {}  # Event key -> rendered table row.
+        self._sections = {}  # Section name -> (inputs, rendered content).
+        self._lock = threading.Lock()
+
+    # Returns rendered rows of all events in API order and the list of events that weren't seen in previous updates (or changed since).
+    # Events that disappeared from API response (e.g. goals cancelled by VAR) are dropped from the model.
+    def render_events(self, events: list, format_event) -> tuple[str, list]:
+        with self._lock:
+            rows = []
+            new_events = []
+            event_rows = {}
+            for event in events:
+                key = get_event_key(event)
+                row = self._event_rows.get(key)
+                if row is None:
+                    row = event_rows.get(key)  # Identical events within the same response.
+                if row is None:
+                    row = format_event(event)
+                    new_events.append(event)
+                event_rows[key] = row
+                rows.append(row)
+            self._event_rows = event_rows
+            return "".join(rows), new_events
+
+    # Returns cached section content, if it was rendered from equal inputs during previous update.
+    def render_section(self, name: str, inputs, render):
+        with self._lock:
+            cached_section = self._sections.get(name)
+            if cached_section is not None and cached_section[0] == inputs:
+                return cached_section[1]
+        content = render(*inputs)
+        with self._lock:
+            self._sections[name] = (inputs, content)
+        return content
+
+    def reset(self) -> None:
+        with self._lock:
+            self._event_rows = {}
+            self._sections = {}
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Final, Optional
+
+from reddit_bot.config import config
+from reddit_bot.util import metrics_util, storage_util
+from reddit_bot.util.logging_util import logger
+
+PRE_MATCH: Final[str] = "pre"
+LIVE_MATCH: Final[str] = "live"
+POST_MATCH: Final[str] = "post"
+
+# Title prefix of each thread kind, used to recognize threads in the subreddit listing.
+TITLE_PREFIXES: Final[dict[str, str]] = {
+    "[Pre-Match Discussion Thread]": PRE_MATCH,
+    "[Match Thread]": LIVE_MATCH,
+    "[Post-Match Discussion Thread]": POST_MATCH,
+}
+
+
+class MatchThread:
+    def __init__(self, submission_id: str, url: str):
+        self.submission_id = submission_id
+        self.url = url
+
+
+# Registry of created match threads, keyed by (fixture ID, thread kind) and by title. Threads are registered when the bot creates them.
+# Threads that existed before (e.g. posted manually) are backfilled from a single subreddit listing on the first lookup after startup.
+class MatchThreadRegistry:
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._by_fixture = None  # (fixture ID, kind) -> MatchThread. Loaded from storage on first use.
+        self._by_title = None  # Title -> MatchThread.
+        self._backfilled = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        if self._by_fixture is None:
+            self._by_fixture = {}
+            self._by_title = {}
+            for submission_id, fixture_id, kind, title, url in storage_util.execute("SELECT submission_id, fixture_id, kind, title, url FROM match_threads"):
+                self._index(fixture_id, kind, title, MatchThread(submission_id, url))
+
+    def _index(self, fixture_id: Optional[int], kind: str, title: str, match_thread: MatchThread) -> None:
+        if fixture_id is not None:
+            self._by_fixture[(fixture_id, kind)] = match_thread
+        self._by_title[title] = match_thread
+
+    def _store(self, submission_id: str, fixture_id: Optional[int], kind: str, title: str, url: str) -> None:
+        self._index(fixture_id, kind, title, MatchThread(submission_id, url))
+        storage_util.execute("INSERT OR REPLACE INTO match_threads (submission_id, fixture_id, kind, title, url, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                             (submission_id, fixture_id, kind, title, url, self._clock()))
+
+    def register(self, submission, fixture_id: Optional[int], kind: str) -> None:
+        with self._lock:
+            self._load()
+            self._store(submission.id, fixture_id, kind, submission.title, submission.url)
+
+    # Returns existing thread of the kind for the fixture, or a thread with the same title.
+    def find(self, reddit_instance, fixture_id: Optional[int], kind: str, title: str) -> Optional[MatchThread]:
+        with self._lock:
+            self._load()
+            match_thread = self._by_fixture.get((fixture_id, kind)) if fixture_id is not None else None
+            if match_thread is None:
+                if not self._backfilled:
+                    self._backfill(reddit_instance)
+                match_thread = self._by_title.get(title)
+            return match_thread
+
+    def _backfill(self, reddit_instance) -> None:
+        subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
+        backfilled_threads = 0
+        with metrics_util.reddit_call("registry_backfill_listing"):
+            submissions = list(subreddit.new(limit=config.Reddit.SUBMISSION_CHECK_BATCH_SIZE))
+        for submission in submissions:
+            kind = next((kind for prefix, kind in TITLE_PREFIXES.items() if submission.title.startswith(prefix)), None)
+            if kind is not None and submission.title not in self._by_title:
+                self._store(submission.id, None, kind, submission.title, submission.url)
+                backfilled_threads += 1
+        self._backfilled = True  # Only set after the listing succeeded, otherwise the next lookup retries.
+        logger.info(f"Backfilled {backfilled_threads} match threads from subreddit listing.")
+
+
+match_thread_registry = MatchThreadRegistry()
+
+
+if __name__ == "__main__":
+    pass
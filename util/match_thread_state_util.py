@@ -0,0 +1,70 @@
+import functools
+import json
+import threading
+from typing import Final
+
+from reddit_bot.data import variables
+from reddit_bot.util import storage_util
+from reddit_bot.util.logging_util import logger
+
+MATCH_THREAD_STATE_KEY: Final[str] = "match_thread_state"
+
+# Match thread lifecycle variables that are checkpointed. Edit counters and rendered model are rebuilt by the next update.
+PERSISTED_VARIABLES: Final[tuple[str, ...]] = (
+    "pre_match_thread_created",
+    "live_match_thread_created",
+    "live_match_football_api_id",
+    "live_match_reddit_submission_id",
+    "live_match_events_already_existed",
+    "live_match_content_hash",
+    "post_match_thread_title",
+    "post_match_thread_content",
+)
+
+_lock = threading.RLock()  # Serializes lifecycle transitions started from comment commands and scheduled jobs.
+
+
+# Writes current match thread lifecycle state to storage, so that a restart mid-match resumes live updates of the same thread.
+def checkpoint() -> None:
+    with _lock:
+        state = {name: getattr(variables.MatchThreadVariables, name) for name in PERSISTED_VARIABLES}
+        storage_util.set_metadata(MATCH_THREAD_STATE_KEY, json.dumps(state))
+
+
+# Restores match thread lifecycle state from the last checkpoint. Returns True if a live match thread was in progress.
+def restore() -> bool:
+    with _lock:
+        serialized_state = storage_util.get_metadata(MATCH_THREAD_STATE_KEY)
+        if serialized_state is None:
+            return False
+        state = json.loads(serialized_state)
+        for name in PERSISTED_VARIABLES:
+            if name in state:
+                setattr(variables.MatchThreadVariables, name, state[name])
+
+        live_match_in_progress = variables.MatchThreadVariables.live_match_thread_created and bool(variables.MatchThreadVariables.live_match_reddit_submission_id)
+        if live_match_in_progress:
+            variables.MatchThreadVariables.live_match_in_progress.set()
+            logger.info(f"Restored live match thread {variables.MatchThreadVariables.live_match_reddit_submission_id} for match ID: {variables.MatchThreadVariables.live_match_football_api_id}.")
+        else:
+            variables.MatchThreadVariables.live_match_in_progress.clear()
+            logger.info(f"Restored match thread state (pre-match thread created: {variables.MatchThreadVariables.pre_match_thread_created}, live match thread created: {variables.MatchThreadVariables.live_match_thread_created}).")
+        return live_match_in_progress
+
+
+# Decorator for match thread lifecycle transitions. Transitions don't run concurrently and the state is checkpointed after each one,
+# including failed ones, because flags are set before the thread is created to block duplicate creation.
+def transition(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _lock:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                checkpoint()
+
+    return wrapper
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,289 @@
+import bisect
+import contextlib
+import functools
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Final, Optional
+
+from reddit_bot.config import config
+from reddit_bot.util.logging_util import logger
+
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"  # Prometheus text exposition format.
+LATENCY_BUCKETS: Final[tuple[float, ...]] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # In seconds.
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...]) -> str:
+    if not label_names:
+        return ""
+    escaped_values = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for value in label_values)
+    return "{" + ",".join(f"{name}=\"{value}\"" for name, value in zip(label_names, escaped_values)) + "}"
+
+
+# Base of metrics, values are kept per combination of label values. Label values have to come from a small set (endpoints, job names,
+# priorities), never from user input, so that the number of series stays bounded.
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values = {}  # Label values -> value.
+        self._lock = threading.Lock()
+
+    def _get_key(self, labels: dict) -> tuple[str, ...]:
+        if labels.keys() != set(self.label_names):
+            raise ValueError(f"Metric {self.name} has labels {self.label_names}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._get_key(labels), 0)
+
+    def _get_samples(self) -> list[tuple[str, tuple[str, ...], tuple[str, ...], float]]:
+        with self._lock:
+            return [(self.name, self.label_names, key, value) for key, value in sorted(self._values.items())]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}" for name, label_names, label_values, value in self._get_samples()]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+# Gauge is either set by the code it describes, or read from a function when metrics are collected (e.g. queue depth).
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, description, label_names)
+        self._function = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    # Only for gauges without labels. Function is called on every collection, it must be cheap and must not block.
+    def set_function(self, function) -> None:
+        self._function = function
+
+    def _get_samples(self) -> list:
+        if self._function is None:
+            return super()._get_samples()
+        try:
+            return [(self.name, (), (), float(self._function()))]
+        except Exception as e:
+            logger.warning(f"Failed to collect metric {self.name}: {e}")
+            return []
+
+
+class _HistogramValue:
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+# Counts observations into cumulative buckets, same as Prometheus histograms. Quantiles are computed by the server scraping the metrics.
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            histogram_value = self._values.get(key)
+            if histogram_value is None:
+                histogram_value = self._values[key] = _HistogramValue(len(self.buckets))
+            histogram_value.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            histogram_value.sum += value
+            histogram_value.count += 1
+
+    # Observes duration of the block, also when it raises.
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get(self, **labels) -> dict:
+        with self._lock:
+            histogram_value = self._values.get(self._get_key(labels))
+            if histogram_value is None:
+                return {"count": 0, "sum": 0.0}
+            return {"count": histogram_value.count, "sum": histogram_value.sum}
+
+    def _get_samples(self) -> list:
+        samples = []
+        with self._lock:
+            for key, histogram_value in sorted(self._values.items()):
+                cumulative_count = 0
+                for bucket, bucket_count in zip(self.buckets, histogram_value.bucket_counts):
+                    cumulative_count += bucket_count
+                    samples.append((self.name + "_bucket", self.label_names + ("le",), key + (_format_value(bucket),), cumulative_count))
+                samples.append((self.name + "_sum", self.label_names, key, histogram_value.sum))
+                samples.append((self.name + "_count", self.label_names, key, histogram_value.count))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+
+metrics_registry = MetricsRegistry()
+
+# Football Rapid API.
+api_request_seconds = metrics_registry.register(Histogram("reddit_bot_api_request_seconds", "Football Rapid API request latency, retries included.", ("endpoint",)))
+api_requests = metrics_registry.register(Counter("reddit_bot_api_requests_total", "Football Rapid API requests sent, by response status (error if no response).", ("endpoint", "status")))
+api_retries = metrics_registry.register(Counter("reddit_bot_api_retries_total", "Retried Football Rapid API requests.", ("endpoint",)))
+api_cache_lookups = metrics_registry.register(Counter("reddit_bot_api_cache_lookups_total", "Football Rapid API fetches by how they were served (hit, miss, stale, refused).", ("endpoint", "result")))
+api_quota_remaining = metrics_registry.register(Gauge("reddit_bot_api_quota_remaining", "Football Rapid API requests left in the daily budget."))
+
+# Reddit.
+reddit_call_seconds = metrics_registry.register(Histogram("reddit_bot_reddit_call_seconds", "Reddit API call latency. Writes are labelled by write queue priority, reads by listing.", ("call",)))
+reddit_call_errors = metrics_registry.register(Counter("reddit_bot_reddit_call_errors_total", "Failed Reddit API calls.", ("call",)))
+reddit_stream_comments = metrics_registry.register(Counter("reddit_bot_reddit_stream_comments_total", "Comments read from the comment stream."))
+reddit_write_wait_seconds = metrics_registry.register(Histogram("reddit_bot_reddit_write_wait_seconds", "Time Reddit writes spent in the write queue.", ("priority",)))
+reddit_write_queue_depth = metrics_registry.register(Gauge("reddit_bot_reddit_write_queue_depth", "Reddit writes waiting in the write queue."))
+
+# Comments and submissions.
+comment_processing_seconds = metrics_registry.register(Histogram("reddit_bot_comment_processing_seconds", "Time spent processing a comment from the comment stream."))
+comment_processing_errors = metrics_registry.register(Counter("reddit_bot_comment_processing_errors_total", "Comments whose processing raised an error."))
+command_seconds = metrics_registry.register(Histogram("reddit_bot_command_seconds", "Time spent handling a triggered comment command.", ("command",)))
+comment_queue_depth = metrics_registry.register(Gauge("reddit_bot_comment_queue_depth", "Comments read from the stream and waiting to be handled."))
+submission_processing_seconds = metrics_registry.register(Histogram("reddit_bot_submission_processing_seconds", "Time spent processing a submission of a batch."))
+submission_processing_errors = metrics_registry.register(Counter("reddit_bot_submission_processing_errors_total", "Submissions whose processing raised an error."))
+
+# Scheduled jobs.
+job_run_seconds = metrics_registry.register(Histogram("reddit_bot_job_run_seconds", "Duration of scheduled job runs.", ("job",), buckets=LATENCY_BUCKETS + (60.0, 120.0)))
+job_runs = metrics_registry.register(Counter("reddit_bot_job_runs_total", "Scheduled job runs, by result (success or failure).", ("job", "result")))
+
+# Live match.
+live_match_in_progress = metrics_registry.register(Gauge("reddit_bot_live_match_in_progress", "1 while a live match thread is being updated, 0 otherwise."))
+live_match_thread_edits = metrics_registry.register(Counter("reddit_bot_live_match_thread_edits_total", "Live match thread updates, by result (performed, skipped, failed).", ("result",)))
+
+
+# Times the block into the histogram and counts it in errors if it raises. Labels are shared by both metrics.
+@contextlib.contextmanager
+def timed(histogram: Histogram, errors: Counter, **labels):
+    with histogram.time(**labels):
+        try:
+            yield
+        except Exception:
+            errors.inc(**labels)
+            raise
+
+
+# Decorator form of timed, timing each call of the function.
+def instrumented(histogram: Histogram, errors: Counter):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(histogram, errors):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Times a Reddit API call and counts it if it fails.
+def reddit_call(call: str):
+    return timed(reddit_call_seconds, reddit_call_errors, call=call)
+
+
+# Serves metrics of the registry in Prometheus text format at /metrics. Meant to be scraped locally, so it binds to localhost by default.
+class MetricsServer:
+    def __init__(self, port: int, host: str = "127.0.0.1", registry: MetricsRegistry = metrics_registry):
+        self._host = host
+        self._port = port
+        self._registry = registry
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer((self._host, self._port), self._get_handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Serving metrics at {self.url}.")
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _get_handler_class(self):
+        registry = self._registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood the log file.
+
+        return Handler
+
+
+# Starts the metrics server, unless it is disabled by setting the port to 0.
+def start_server() -> Optional[MetricsServer]:
+    if not config.Metrics.PORT:
+        return None
+    metrics_server = MetricsServer(config.Metrics.PORT, config.Metrics.HOST)
+    try:
+        metrics_server.start()
+    except OSError as e:
+        logger.error(f"Failed to start metrics server on port {config.Metrics.PORT}: {e}")
+        return None
+    return metrics_server
+
+
+if __name__ == "__main__":
+    pass
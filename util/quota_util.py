@@ -0,0 +1,133 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from typing import Final, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from reddit_bot.config import config
+from reddit_bot.util.logging_util import logger
+
+# Features making Football Rapid API calls, in order of priority.
+LIVE_UPDATE: Final[str] = "live_update"
+MATCH_THREAD: Final[str] = "match_thread"  # Match thread checks and pre-match, live and post-match thread creation.
+MODERATOR_COMMAND: Final[str] = "moderator_command"  # Comment commands of approved users.
+SIDEBAR: Final[str] = "sidebar"
+OTHER: Final[str] = "other"  # Calls made outside any of the features above.
+COMMENT_COMMAND: Final[str] = "comment_command"
+
+# Share of the daily budget that is kept for higher priority features. Once the remaining budget drops to a feature's reserve, the feature is
+# served cached data only, so that comment commands can't use up the requests needed for updating a live match thread.
+RESERVES: Final[dict[str, float]] = {
+    LIVE_UPDATE: 0.0,
+    MATCH_THREAD: 0.05,
+    MODERATOR_COMMAND: 0.05,
+    SIDEBAR: 0.15,
+    OTHER: 0.15,
+    COMMENT_COMMAND: 0.3,
+}
+
+_caller = contextvars.ContextVar("api_caller", default=OTHER)
+
+
+def get_caller() -> str:
+    return _caller.get()
+
+
+# Attributes Football Rapid API calls made within the context to the feature. Calls fanned out to other threads keep the attribution.
+@contextlib.contextmanager
+def caller(name: str):
+    token = _caller.set(name)
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+# Decorator form of caller, for scheduled jobs.
+def attributed_to(name: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with caller(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Endpoint of the URL with its query parameter names, e.g. "fixtures?team,next", so that calls are counted per kind rather than per URL.
+def get_endpoint(url: str) -> str:
+    split_url = urlsplit(url)
+    return split_url.path.removeprefix("/v3/") + "?" + ",".join(parse_qs(split_url.query))
+
+
+# Counts Football Rapid API requests per endpoint and per feature and enforces the daily budget. Budget resets at midnight UTC, like the quota
+# of Rapid API plans. Usage is synced with the remaining quota reported by Rapid API, so that requests made before a restart are accounted for.
+class QuotaAccountant:
+    def __init__(self, daily_budget: int, clock=time.time):
+        self.daily_budget = daily_budget
+        self._clock = clock
+        self._day = None
+        self._used = 0
+        self._by_endpoint = collections.Counter()
+        self._by_caller = collections.Counter()
+        self._degraded = collections.Counter()  # Calls per feature that were served cached data or refused because of the budget.
+        self._lock = threading.Lock()
+
+    def _roll_over(self) -> None:
+        day = int(self._clock() // 86400)
+        if day != self._day:
+            if self._day is not None:
+                logger.info(f"Football Rapid API: Quota usage of the past day: {self._get_stats()}.")
+            self._day = day
+            self._used = 0
+            self._by_endpoint.clear()
+            self._by_caller.clear()
+            self._degraded.clear()
+
+    @property
+    def remaining(self) -> int:
+        with self._lock:
+            self._roll_over()
+            return self.daily_budget - self._used
+
+    # Whether the feature may make a request. Features are degraded once the remaining budget drops to their reserve.
+    def is_allowed(self, name: str) -> bool:
+        with self._lock:
+            self._roll_over()
+            return self.daily_budget - self._used > self.daily_budget * RESERVES.get(name, RESERVES[OTHER])
+
+    # Records a request that reached Rapid API, with the remaining quota from its response headers (if present).
+    def record(self, url: str, remaining_quota: Optional[str] = None) -> None:
+        name = get_caller()
+        with self._lock:
+            self._roll_over()
+            self._used += 1
+            self._by_endpoint[get_endpoint(url)] += 1
+            self._by_caller[name] += 1
+            if remaining_quota is not None and remaining_quota.isdigit():
+                self._used = max(self._used, self.daily_budget - int(remaining_quota))
+
+    def record_degraded(self, name: str) -> None:
+        with self._lock:
+            self._roll_over()
+            if not self._degraded[name]:
+                logger.warning(f"Football Rapid API: Daily budget is running low ({self.daily_budget - self._used} of {self.daily_budget} requests left), {name} is served cached data only.")
+            self._degraded[name] += 1
+
+    def _get_stats(self) -> dict:
+        return {"used": self._used, "budget": self.daily_budget, "by_caller": dict(self._by_caller), "by_endpoint": dict(self._by_endpoint), "degraded": dict(self._degraded)}
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._roll_over()
+            return self._get_stats()
+
+
+quota_accountant = QuotaAccountant(config.FootballRapidApi.QUOTA_DAILY_BUDGET)
+
+
+if __name__ == "__main__":
+    pass
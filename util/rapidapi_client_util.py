@@ -0,0 +1,174 @@
+import hashlib
+import threading
+import time
+from json import JSONDecodeError
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from reddit_bot.config import config
+from reddit_bot.util import metrics_util
+from reddit_bot.util.cache_util import TTLCache
+from reddit_bot.util.logging_util import logger
+from reddit_bot.util.quota_util import get_caller, get_endpoint, quota_accountant
+from reddit_bot.util.single_flight_util import SingleFlight
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+# Parsed Football Rapid API response. Payloads are shared between callers through the cache, so they must be treated as read-only.
+class ApiResponse:
+    def __init__(self, status_code: int, data=None, error: JSONDecodeError = None, version: str = None):
+        self.status_code = status_code
+        self.version = version  # Hash of successful response's content, changes only when the payload changes.
+        self._data = data
+        self._error = error
+
+    def json(self):
+        if self._error is not None:
+            raise self._error
+        return self._data
+
+
+# Latency and retry counters of requests that actually went over the network (cache hits are not included).
+class ClientStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, retries: int, failed: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            self.failures += 1 if failed else 0
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            average_latency = self.total_latency / self.requests if self.requests else 0.0
+            return {"requests": self.requests, "retries": self.retries, "failures": self.failures, "avg_latency": round(average_latency, 3), "max_latency": round(self.max_latency, 3)}
+
+
+response_cache = TTLCache(config.FootballRapidApi.CACHE_MAX_SIZE)
+client_stats = ClientStats()
+in_flight_requests = SingleFlight()
+metrics_util.api_quota_remaining.set_function(lambda: quota_accountant.remaining)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# Single shared session, so that connections to Football Rapid API are pooled and kept alive between requests.
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.FootballRapidApi.HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
+            _session = session
+        return _session
+
+
+def _get_backoff(attempt: int, response=None) -> float:
+    if response is not None and response.headers.get("Retry-After"):
+        try:
+            return min(float(response.headers["Retry-After"]), config.FootballRapidApi.HTTP_BACKOFF_MAX)
+        except ValueError:
+            pass  # Retry-After can also be an HTTP date, fall back to exponential backoff.
+    return min(config.FootballRapidApi.HTTP_BACKOFF_BASE * 2 ** attempt, config.FootballRapidApi.HTTP_BACKOFF_MAX)
+
+
+# 429 with no requests remaining means the daily quota of the plan is used up, retrying it would only be charged and delay the caller.
+def _is_retryable(response: requests.Response) -> bool:
+    if response.status_code == 429 and response.headers.get("X-RateLimit-Requests-Remaining") == "0":
+        return False
+    return response.status_code in RETRY_STATUS_CODES
+
+
+# Performs GET request with timeouts, retrying connection errors, timeouts, 429 and 5xx responses with bounded exponential backoff.
+def _get_with_retries(url: str) -> requests.Response:
+    timeout = (config.FootballRapidApi.HTTP_CONNECT_TIMEOUT, config.FootballRapidApi.HTTP_READ_TIMEOUT)
+    endpoint = get_endpoint(url)
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        try:
+            response = get_session().get(url, timeout=timeout)
+            quota_accountant.record(url, response.headers.get("X-RateLimit-Requests-Remaining"))  # Every response is charged, retries included.
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics_util.api_requests.inc(endpoint=endpoint, status="error")
+            if attempt >= config.FootballRapidApi.HTTP_MAX_RETRIES:
+                client_stats.record(time.monotonic() - start, attempt, True)
+                metrics_util.api_request_seconds.observe(time.monotonic() - start, endpoint=endpoint)
+                raise
+            backoff = _get_backoff(attempt)
+            logger.warning(f"Football Rapid API: {e} - retrying in {backoff} seconds.")
+        else:
+            metrics_util.api_requests.inc(endpoint=endpoint, status=response.status_code)
+            if not _is_retryable(response) or attempt >= config.FootballRapidApi.HTTP_MAX_RETRIES:
+                client_stats.record(time.monotonic() - start, attempt, response.status_code != 200)
+                metrics_util.api_request_seconds.observe(time.monotonic() - start, endpoint=endpoint)
+                return response
+            backoff = _get_backoff(attempt, response)
+            logger.warning(f"Football Rapid API: Received status {response.status_code} - retrying in {backoff} seconds.")
+        metrics_util.api_retries.inc(endpoint=endpoint)
+        time.sleep(backoff)
+        attempt += 1
+
+
+# All Football Rapid API requests go through this method. Successful responses are cached with a time-to-live depending on the endpoint.
+# Setting refresh to True skips the cache lookup, but still stores the fresh response. When the daily budget left for the calling feature
+# runs out, the last cached response is returned even if it expired, or a 429 response (same as from exceeded Rapid API quota) if there is none.
+def fetch(url: str, refresh: bool = False) -> ApiResponse:
+    ttl = config.FootballRapidApi.get_cache_ttl(url)
+    endpoint = get_endpoint(url)
+    if ttl and not refresh:
+        cached_response = response_cache.get(url)
+        if cached_response is not None:
+            logger.debug(f"Football Rapid API: Cache hit for {url}.")
+            metrics_util.api_cache_lookups.inc(endpoint=endpoint, result="hit")
+            return cached_response
+
+    caller = get_caller()
+    if not quota_accountant.is_allowed(caller):
+        quota_accountant.record_degraded(caller)
+        stale_response = response_cache.get_stale(url)
+        if stale_response is not None:
+            logger.info(f"Football Rapid API: Served expired cached response for {url} to {caller}, daily budget is running low.")
+            metrics_util.api_cache_lookups.inc(endpoint=endpoint, result="stale")
+            return stale_response
+        logger.warning(f"Football Rapid API: Request for {url} by {caller} refused, daily budget is running low.")
+        metrics_util.api_cache_lookups.inc(endpoint=endpoint, result="refused")
+        return ApiResponse(429, {"message": "Daily budget for this feature exceeded."})
+
+    metrics_util.api_cache_lookups.inc(endpoint=endpoint, result="miss")
+    # Concurrent callers of the same URL (e.g. several users asking for standings at once) share a single request.
+    return in_flight_requests.do(url, lambda: _fetch_from_api(url, ttl))
+
+
+def _fetch_from_api(url: str, ttl: float) -> ApiResponse:
+    response = _get_with_retries(url)
+    try:
+        api_response = ApiResponse(response.status_code, response.json(), version=hashlib.sha1(response.content).hexdigest() if response.status_code == 200 else None)
+    except JSONDecodeError as e:
+        return ApiResponse(response.status_code, error=e)
+
+    if ttl and response.status_code == 200:
+        response_cache.set(url, api_response, ttl)
+    return api_response
+
+
+def log_stats() -> None:
+    logger.info(f"Football Rapid API: Client stats: {client_stats.as_dict()}, response cache stats: {response_cache.stats()}, single-flight stats: {in_flight_requests.stats()}, quota: {quota_accountant.stats()}.")
+
+
+if __name__ == "__main__":
+    pass
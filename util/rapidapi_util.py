@@ -1,30 +1,73 @@
 from json import JSONDecodeError
 
-import requests
-
 from reddit_bot.config import config
 from reddit_bot.data import resources
+from reddit_bot.util import rapidapi_client_util, reddit_write_util
+from reddit_bot.util.cache_util import TTLCache
 from reddit_bot.util.date_util import format_time, format_date
 from reddit_bot.util.format_util import extract_cup_fixture
 from reddit_bot.util.logging_util import logger
+from reddit_bot.util.rapidapi_client_util import ApiResponse
 
 
 def fetch_next_game():  # Fetches info about next game.
     request_url = config.FootballRapidApi.get_next_team_fixtures_url(1)
     logger.info(f"Football Rapid API: Fetched next game.")
     try:
-        return requests.get(request_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS).json()["response"][0]
+        return rapidapi_client_util.fetch(request_url).json()["response"][0]
     except (IndexError, KeyError, JSONDecodeError):
         logger.info("Fetch next games method hasn't returned any values as no games available.")
         return None
 
 
+# Rendered comment replies, keyed by (reply name, versions of API responses it was rendered from).
+# A changed upstream payload gets a new version, so stale replies are never served and simply age out of the cache.
+rendered_replies = TTLCache(config.FootballRapidApi.RENDERED_REPLY_CACHE_MAX_SIZE)
+
+
+# Returns reply rendered from API responses, rendering it only once per version of the responses. Failed responses (e.g. refused by the
+# daily budget) aren't rendered, the reply then says that data is temporarily unavailable.
+def get_rendered_reply(name: str, render, *api_responses: ApiResponse) -> str:
+    failed_status_codes = [api_response.status_code for api_response in api_responses if api_response.status_code != 200]
+    if failed_status_codes:
+        logger.warning(f"Football Rapid API: Failed to fetch data for {name} reply (status codes: {failed_status_codes}).")
+        return resources.CommentReplies.DATA_TEMPORARILY_UNAVAILABLE
+
+    versions = tuple(api_response.version for api_response in api_responses)
+    if None in versions:
+        return render(*api_responses)
+
+    key = (name, versions)
+    reply = rendered_replies.get(key)
+    if reply is None:
+        reply = render(*api_responses)
+        rendered_replies.set(key, reply, config.FootballRapidApi.RENDERED_REPLY_CACHE_TTL)
+    return reply
+
+
 def get_club_world_cup_standings(comment) -> None:
     # Add Club World Cup table.
     cwc_url = config.FootballRapidApi.get_table_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID)
     logger.info(f"Football Rapid API: Fetched league table for: {config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID} (comment command).")
-    cwc_response = requests.get(cwc_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
-    comment_response = ""
+    cwc_response = rapidapi_client_util.fetch(cwc_url)
+
+    # Add Club World Cup knockout stages.
+    cwc_knockout_url = config.FootballRapidApi.get_fixtures_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID)
+    logger.info("Football Rapid API: Fetched Club World Cup KO fixtures standings for comment command.")
+    cwc_knockout_response = rapidapi_client_util.fetch(cwc_knockout_url)
+
+    comment_response = get_rendered_reply("club_world_cup_standings", _render_club_world_cup_standings, cwc_response, cwc_knockout_response)
+
+    # Reply to comment.
+    logger.info(f"Replied with FIFA Club World Cup standings information to comment: {str(comment.author).lower()}")
+    if comment_response:
+        reddit_write_util.reply(comment, comment_response)
+    else:
+        reddit_write_util.reply(comment, resources.CommentReplies.CLUB_WORLD_CUP_NO_INFO_FOR_THIS_SEASON)
+
+
+def _render_club_world_cup_standings(cwc_response: ApiResponse, cwc_knockout_response: ApiResponse) -> str:
+    comment_response = []
     if cwc_response.status_code == 200:
         cwc_response_json = cwc_response.json()
         if cwc_response_json["response"]:
@@ -38,29 +81,24 @@ def get_club_world_cup_standings(comment) -> None:
                         cwc_inter_group_id = group_index
 
             table = cwc_response_json["response"][0]["league"]["standings"][cwc_inter_group_id]
-            comment_response += "\n 🏆 **Club World Cup** 🏆\n\n"
-            comment_response += "\n### Group stage\n"
-            comment_response += "| # | Team | PL | GD | Pts |\n"
-            comment_response += "|:-:|:--|:-:|:-:|:-:|\n"
+            comment_response.append("\n 🏆 **Club World Cup** 🏆\n\n")
+            comment_response.append("\n### Group stage\n")
+            comment_response.append("| # | Team | PL | GD | Pts |\n")
+            comment_response.append("|:-:|:--|:-:|:-:|:-:|\n")
             for team in table:
                 if team["team"]["id"] == config.FootballRapidApi.FOOTBALL_RAPID_API_INTER_CLUB_ID:
-                    comment_response += f"| **{team['rank']}** | **{team['team']['name']}** | **{team['all']['played']}** | **{team['goalsDiff']}** | **{team['points']}** |\n"
+                    comment_response.append(f"| **{team['rank']}** | **{team['team']['name']}** | **{team['all']['played']}** | **{team['goalsDiff']}** | **{team['points']}** |\n")
                 else:
-                    comment_response += f"| {team['rank']} | {team['team']['name']} | {team['all']['played']} | {team['goalsDiff']} | {team['points']} |\n"
+                    comment_response.append(f"| {team['rank']} | {team['team']['name']} | {team['all']['played']} | {team['goalsDiff']} | {team['points']} |\n")
     else:
         logger.warning("Failed to fetch FIFA Club World Cup group stages data from Rapid Football API for comment reply.")
 
-    # Add Club World Cup knockout stages.
-    cwc_knockout_url = config.FootballRapidApi.get_fixtures_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID)
-    logger.info("Football Rapid API: Fetched Club World Cup KO fixtures standings for comment command.")
-    cwc_knockout_response = requests.get(cwc_knockout_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
-
     if cwc_knockout_response.status_code == 200:
         cwc_knockout_response_json = cwc_knockout_response.json()
         if len(cwc_knockout_response_json.get("response", [])) > 3:
-            comment_response += "\n### Knockout stages\n\n"
-            comment_response += "**Date**|**Opponent**|**Result**|**Round**|\n"
-            comment_response += ":-:|:-:|:-:|:-:|\n"
+            comment_response.append("\n### Knockout stages\n\n")
+            comment_response.append("**Date**|**Opponent**|**Result**|**Round**|\n")
+            comment_response.append(":-:|:-:|:-:|:-:|\n")
     else:
         cwc_knockout_response_json = {}
         logger.warning("Failed to fetch FIFA Club World Cup knockout stages data from Rapid Football API for comment reply.")
@@ -74,49 +112,55 @@ def get_club_world_cup_standings(comment) -> None:
                 fixture_result = ""
             else:
                 fixture_result = f"**{fixture['result']} {fixture['goalsHomeTeam']}-{fixture['goalsAwayTeam']}**"
-            comment_response += f"{format_date(fixture['date'], True, False)}|{fixture['isAway']}{fixture['opponent']}|{fixture_result}|{fixture['round']}\n"
-
-    # Reply to comment.
-    logger.info(f"Replied with FIFA Club World Cup standings information to comment: {str(comment.author).lower()}")
-    if comment_response:
-        comment.reply(comment_response)
-    else:
-        comment.reply(resources.CommentReplies.CLUB_WORLD_CUP_NO_INFO_FOR_THIS_SEASON)
+            comment_response.append(f"{format_date(fixture['date'], True, False)}|{fixture['isAway']}{fixture['opponent']}|{fixture_result}|{fixture['round']}\n")
+    return "".join(comment_response)
 
 
 def get_champions_league_standings(comment) -> None:
     # Add Champions League table.
     cl_url = config.FootballRapidApi.get_table_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID)
     logger.info(f"Football Rapid API: Fetched league table for: {config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID} (comment command).")
-    cl_response = requests.get(cl_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
-    comment_response = ""
+    cl_response = rapidapi_client_util.fetch(cl_url)
+
+    # Add Champions League knockout stages.
+    cl_knockout_url = config.FootballRapidApi.get_fixtures_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID)
+    logger.info("Football Rapid API: Fetched CL KO fixtures standings for comment command.")
+    cl_knockout_response = rapidapi_client_util.fetch(cl_knockout_url)
+
+    comment_response = get_rendered_reply("champions_league_standings", _render_champions_league_standings, cl_response, cl_knockout_response)
+
+    # Reply to comment.
+    logger.info(f"Replied with Champions League standings information to comment: {str(comment.author).lower()}")
+    if comment_response:
+        reddit_write_util.reply(comment, comment_response)
+    else:
+        reddit_write_util.reply(comment, resources.CommentReplies.CHAMPIONS_LEAGUE_NO_INFO_FOR_THIS_SEASON)
+
+
+def _render_champions_league_standings(cl_response: ApiResponse, cl_knockout_response: ApiResponse) -> str:
+    comment_response = []
     if cl_response.status_code == 200:
         cl_response_json = cl_response.json()
         if cl_response_json["response"]:
             table = cl_response_json["response"][0]["league"]["standings"][0]
-            comment_response += "\n 🏆 **Champions League** 🏆\n\n"
-            comment_response += "\n### Group stage\n"
-            comment_response += "| # | Team | PL | GD | Pts |\n"
-            comment_response += "|:-:|:--|:-:|:-:|:-:|\n"
+            comment_response.append("\n 🏆 **Champions League** 🏆\n\n")
+            comment_response.append("\n### Group stage\n")
+            comment_response.append("| # | Team | PL | GD | Pts |\n")
+            comment_response.append("|:-:|:--|:-:|:-:|:-:|\n")
             for team in table:
                 if team["team"]["id"] == config.FootballRapidApi.FOOTBALL_RAPID_API_INTER_CLUB_ID:
-                    comment_response += f"| **{team['rank']}** | **{team['team']['name']}** | **{team['all']['played']}** | **{team['goalsDiff']}** | **{team['points']}** |\n"
+                    comment_response.append(f"| **{team['rank']}** | **{team['team']['name']}** | **{team['all']['played']}** | **{team['goalsDiff']}** | **{team['points']}** |\n")
                 else:
-                    comment_response += f"| {team['rank']} | {team['team']['name']} | {team['all']['played']} | {team['goalsDiff']} | {team['points']} |\n"
+                    comment_response.append(f"| {team['rank']} | {team['team']['name']} | {team['all']['played']} | {team['goalsDiff']} | {team['points']} |\n")
     else:
         logger.warning("Failed to fetch Champions League group stages data from Rapid Football API for comment reply.")
 
-    # Add Champions League knockout stages.
-    cl_knockout_url = config.FootballRapidApi.get_fixtures_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID)
-    logger.info("Football Rapid API: Fetched CL KO fixtures standings for comment command.")
-    cl_knockout_response = requests.get(cl_knockout_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
-
     if cl_knockout_response.status_code == 200:
         cl_knockout_response_json = cl_knockout_response.json()
         if len(cl_knockout_response_json["response"]) > 8:
-            comment_response += "\n### Knockout stages\n\n"
-            comment_response += "**Date**|**Opponent**|**Result**|**Round**|\n"
-            comment_response += ":-:|:-:|:-:|:-:|\n"
+            comment_response.append("\n### Knockout stages\n\n")
+            comment_response.append("**Date**|**Opponent**|**Result**|**Round**|\n")
+            comment_response.append(":-:|:-:|:-:|:-:|\n")
     else:
         cl_knockout_response_json = {}
         logger.warning("Failed to fetch Champions League knockout stages data from Rapid Football API for comment reply.")
@@ -130,27 +174,32 @@ def get_champions_league_standings(comment) -> None:
                 fixture_result = ""
             else:
                 fixture_result = f"**{fixture['result']} {fixture['goalsHomeTeam']}-{fixture['goalsAwayTeam']}**"
-            comment_response += f"{format_date(fixture['date'], True, False)}|{fixture['isAway']}{fixture['opponent']}|{fixture_result}|{fixture['round']}\n"
+            comment_response.append(f"{format_date(fixture['date'], True, False)}|{fixture['isAway']}{fixture['opponent']}|{fixture_result}|{fixture['round']}\n")
+    return "".join(comment_response)
+
+
+def getCoppaItaliaStandings(comment) -> None:
+    coppa_italia_url = config.FootballRapidApi.get_fixtures_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_COPPA_ITALIA_ID)
+    logger.info("Football Rapid API: Fetched Coppa Italia standings for comment command.")
+    coppa_italia_response = rapidapi_client_util.fetch(coppa_italia_url)
+    comment_response = get_rendered_reply("coppa_italia_standings", _render_coppa_italia_standings, coppa_italia_response)
 
     # Reply to comment.
-    logger.info(f"Replied with Champions League standings information to comment: {str(comment.author).lower()}")
+    logger.info(f"Replied with Coppa Italia standings information to comment: {str(comment.author).lower()}")
     if comment_response:
-        comment.reply(comment_response)
+        reddit_write_util.reply(comment, comment_response)
     else:
-        comment.reply(resources.CommentReplies.CHAMPIONS_LEAGUE_NO_INFO_FOR_THIS_SEASON)
+        reddit_write_util.reply(comment, resources.CommentReplies.COPPA_ITALIA_NO_INFO_FOR_THIS_SEASON)
 
 
-def getCoppaItaliaStandings(comment) -> None:
-    coppa_italia_url = config.FootballRapidApi.get_fixtures_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_COPPA_ITALIA_ID)
-    logger.info("Football Rapid API: Fetched Coppa Italia standings for comment command.")
-    coppa_italia_response = requests.get(coppa_italia_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
-    comment_response = ""
+def _render_coppa_italia_standings(coppa_italia_response: ApiResponse) -> str:
+    comment_response = []
     if coppa_italia_response.status_code == 200:
         coppa_italia_response_json = coppa_italia_response.json()
         if coppa_italia_response_json["response"]:
-            comment_response += "\n 🏆 **Coppa Italia** 🏆\n\n"
-            comment_response += "**Date**|**Opponent**|**Result**|**Round**|\n"
-            comment_response += ":-:|:-:|:-:|:-:|\n"
+            comment_response.append("\n 🏆 **Coppa Italia** 🏆\n\n")
+            comment_response.append("**Date**|**Opponent**|**Result**|**Round**|\n")
+            comment_response.append(":-:|:-:|:-:|:-:|\n")
     else:
         coppa_italia_response_json = {}
         logger.warning("Failed to fetch Coppa Italia data from Rapid Football API for comment reply.")
@@ -163,62 +212,67 @@ def getCoppaItaliaStandings(comment) -> None:
             fixture_result = ""
         else:
             fixture_result = f"**{fixture['result']} {fixture['goalsHomeTeam']}-{fixture['goalsAwayTeam']}**"
-        comment_response += f"{format_date(fixture['date'], True, False)}|{fixture['isAway']}{fixture['opponent']}|{fixture_result}|{fixture['round']}\n"
-
-    # Reply to comment.
-    logger.info(f"Replied with Coppa Italia standings information to comment: {str(comment.author).lower()}")
-    if comment_response:
-        comment.reply(comment_response)
-    else:
-        comment.reply(resources.CommentReplies.COPPA_ITALIA_NO_INFO_FOR_THIS_SEASON)
+        comment_response.append(f"{format_date(fixture['date'], True, False)}|{fixture['isAway']}{fixture['opponent']}|{fixture_result}|{fixture['round']}\n")
+    return "".join(comment_response)
 
 
 def get_serie_a_standings(comment) -> None:
     # Get league information.
     request_url = config.FootballRapidApi.get_table_by_league_id_url(config.FootballRapidApi.FOOTBALL_RAPID_API_SERIE_A_ID)
     logger.info(f"Football Rapid API: Fetched league table for: {config.FootballRapidApi.FOOTBALL_RAPID_API_SERIE_A_ID} (comment command).")
-    response_json = requests.get(request_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS).json()
+    response = get_rendered_reply("serie_a_standings", _render_serie_a_standings, rapidapi_client_util.fetch(request_url))
+
+    # Reply to comment.
+    logger.info(f"Replied with Serie A standings information to comment: {str(comment.author).lower()}")
+    reddit_write_util.reply(comment, response)
 
-    table = response_json["response"][0]["league"]["standings"][0]
+
+def _render_serie_a_standings(api_response: ApiResponse) -> str:
+    table = api_response.json()["response"][0]["league"]["standings"][0]
 
     # Build response comment - Reddit table.
-    response = "\n 🏆 **Serie A** 🏆\n\n"
-    response += "| # | Team | Games | W | D | L | +/- | GD | Points | Form |\n"
-    response += "|:-:|:--|:-:|:-:|:-:|:-:|:-:|:-:|:-:|:-:|\n"
+    response = ["\n 🏆 **Serie A** 🏆\n\n",
+                "| # | Team | Games | W | D | L | +/- | GD | Points | Form |\n",
+                "|:-:|:--|:-:|:-:|:-:|:-:|:-:|:-:|:-:|:-:|\n"]
 
     for team in table:
         if team["team"]["id"] == config.FootballRapidApi.FOOTBALL_RAPID_API_INTER_CLUB_ID:
-            response += f"| **{team['rank']}** | **{team['team']['name']}** | **{team['all']['played']}** | **{team['all']['win']}** | **{team['all']['draw']}** | **{team['all']['lose']}** | **{team['all']['goals']['for']}:{team['all']['goals']['against']}** | **{team['goalsDiff']}** | **{team['points']}** | **{team['form']}** |\n"
+            response.append(f"| **{team['rank']}** | **{team['team']['name']}** | **{team['all']['played']}** | **{team['all']['win']}** | **{team['all']['draw']}** | **{team['all']['lose']}** | **{team['all']['goals']['for']}:{team['all']['goals']['against']}** | **{team['goalsDiff']}** | **{team['points']}** | **{team['form']}** |\n")
         else:
-            response += f"| {team['rank']} | {team['team']['name']} | {team['all']['played']} | {team['all']['win']} | {team['all']['draw']} | {team['all']['lose']} | {team['all']['goals']['for']}:{team['all']['goals']['against']} | {team['goalsDiff']} | {team['points']} | {team['form']} |\n"
-
-    # Reply to comment.
-    logger.info(f"Replied with Serie A standings information to comment: {str(comment.author).lower()}")
-    comment.reply(response)
+            response.append(f"| {team['rank']} | {team['team']['name']} | {team['all']['played']} | {team['all']['win']} | {team['all']['draw']} | {team['all']['lose']} | {team['all']['goals']['for']}:{team['all']['goals']['against']} | {team['goalsDiff']} | {team['points']} | {team['form']} |\n")
+    return "".join(response)
 
 
 def get_injuries_and_suspensions(comment) -> None:
     # Get next match ID, find injuries for that match.
-    injuries_request_url = config.FootballRapidApi.get_injuries_by_fixture_id_url(fetch_next_game()["fixture"]["id"])
+    next_match = fetch_next_game()
+    if not next_match:
+        reddit_write_util.reply(comment, resources.CommentReplies.INJURIES_NOT_FOUND)
+        return
+    injuries_request_url = config.FootballRapidApi.get_injuries_by_fixture_id_url(next_match["fixture"]["id"])
     logger.info("Football Rapid API: Fetched injuries for comment command.")
-    injuries_response_json = requests.get(injuries_request_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS).json()
+    injuries_response = rapidapi_client_util.fetch(injuries_request_url)
     # Response if no injuries are found.
-    if not injuries_response_json["response"]:
-        comment.reply(resources.CommentReplies.INJURIES_NOT_FOUND)
+    if injuries_response.status_code == 200 and not injuries_response.json()["response"]:
+        reddit_write_util.reply(comment, resources.CommentReplies.INJURIES_NOT_FOUND)
         return
 
+    # Post the response.
+    response = get_rendered_reply("injuries_and_suspensions", _render_injuries_and_suspensions, injuries_response)
+    logger.info(f"Replied with injuries/suspensions information to comment: {str(comment.author).lower()}")
+    reddit_write_util.reply(comment, response)
+
+
+def _render_injuries_and_suspensions(injuries_response: ApiResponse) -> str:
     # Create reddit table for list of injuries.
-    response = "List of players risking missing next game:\n\n"
-    response += "| Player | Injury | Impact | Team |\n"
-    response += "|:--|:-:|:-:|:-:|\n"
+    response = ["List of players risking missing next game:\n\n",
+                "| Player | Injury | Impact | Team |\n",
+                "|:--|:-:|:-:|:-:|\n"]
 
     # Populate injuries.
-    for injury in injuries_response_json["response"]:
-        response += "| {} | {} | {} | {} |\n".format(injury["player"]["name"], injury["player"]["reason"], injury["player"]["type"], injury["team"]["name"])
-
-    # Post the response.
-    logger.info(f"Replied with injuries/suspensions information to comment: {str(comment.author).lower()}")
-    comment.reply(response)
+    for injury in injuries_response.json()["response"]:
+        response.append("| {} | {} | {} | {} |\n".format(injury["player"]["name"], injury["player"]["reason"], injury["player"]["type"], injury["team"]["name"]))
+    return "".join(response)
 
 
 def get_next_match(comment) -> None:
@@ -251,7 +305,7 @@ def get_next_match(comment) -> None:
 
     # Reply to comment.
     logger.info("Replied with next match information to comment: " + str(comment.author).lower())
-    comment.reply(response)
+    reddit_write_util.reply(comment, response)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+# Token bucket per key (e.g. per user). Each key can spend up to capacity tokens at once, tokens are refilled continuously over the period.
+class KeyedTokenBucket:
+    def __init__(self, capacity: int, period: float, clock=time.monotonic):
+        self._capacity = capacity
+        self._refill_rate = capacity / period  # Tokens per second.
+        self._clock = clock
+        self._buckets = {}  # Key -> (tokens, updated_at).
+        self._lock = threading.Lock()
+
+    # Spends a token of the key and returns True, or returns False if the key has no tokens left.
+    def try_acquire(self, key: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self._capacity, now))
+            tokens = min(self._capacity, tokens + (now - updated_at) * self._refill_rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > 1000:
+                self._prune(now)
+            return True
+
+    # Drops buckets that are full again, they are identical to buckets of unseen keys.
+    def _prune(self, now: float) -> None:
+        self._buckets = {key: (tokens, updated_at) for key, (tokens, updated_at) in self._buckets.items() if tokens + (now - updated_at) * self._refill_rate < self._capacity}
+
+
+if __name__ == "__main__":
+    pass
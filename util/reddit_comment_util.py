@@ -1,37 +1,156 @@
 import re
 import time
+from functools import lru_cache
+from typing import Final, Optional
 
 from praw.exceptions import RedditAPIException
 from prawcore import RequestException, ServerError, Forbidden, BadJSON
 
 from reddit_bot.config import config
 from reddit_bot.data import resources, variables
+from reddit_bot.util import metrics_util, quota_util, reddit_write_util
+from reddit_bot.util.ledger_util import ProcessedItemLedger
 from reddit_bot.util.logging_util import logger
+from reddit_bot.util.rate_limit_util import KeyedTokenBucket
 from reddit_bot.util.rapidapi_util import get_injuries_and_suspensions, get_next_match, get_serie_a_standings, getCoppaItaliaStandings, get_champions_league_standings, get_club_world_cup_standings
 from reddit_bot.util.reddit_match_thread_util import create_pre_match_thread, create_live_match_thread, create_post_match_thread
 from reddit_bot.util.reddit_sidebar_util import update_sidebar
 
 
-def process_comments_organizer(reddit_instance) -> None:  # Open comments stream and check for new comments.
+# Open comments stream and check for new comments. Comments are processed right away, unless they are handed over to on_comment callback.
+def process_comments_organizer(reddit_instance, on_comment=None) -> None:
     while True:
         subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
         logger.info("Opening comments stream.")
         comment_stream = subreddit.stream.comments()
         try:
             for comment in comment_stream:
-                try:
-                    _process_comments(reddit_instance, comment)
-                except (RequestException, ServerError, Forbidden, RedditAPIException, BadJSON) as e:  # This error handling is needed because sometimes, Reddit API will error out and would stop the processing thread.
-                    logger.warning(f"{e} - Error communicating with Reddit when processing comments!")
+                metrics_util.reddit_stream_comments.inc()
+                if on_comment is not None:
+                    on_comment(comment)
+                else:
+                    process_comment(reddit_instance, comment)
         except (RequestException, ServerError, Forbidden, ValueError, BadJSON) as e:  # This error handling is needed because sometimes, Reddit API will error out and would stop the processing thread.
+            metrics_util.reddit_call_errors.inc(call="comment_stream")
             logger.error(f"{e} - Error communicating with Reddit when handling comment stream!")
             time.sleep(60)
             continue  # Retry.
 
 
+def process_comment(reddit_instance, comment) -> None:
+    try:
+        _process_comments(reddit_instance, comment)
+    except (RequestException, ServerError, Forbidden, RedditAPIException, BadJSON) as e:  # This error handling is needed because sometimes, Reddit API will error out and would stop the processing thread.
+        logger.warning(f"{e} - Error communicating with Reddit when processing comments!")
+
+
+# Bot command definition. Command is triggered if comment contains any of its keywords or matches its regex.
+class Command:
+    def __init__(self, name: str, handler, keywords: tuple[str, ...] = (), regex: str = None, approved_users_only: bool = False):
+        self.name = name
+        self.handler = handler  # Called with reddit instance and comment.
+        self.keywords = keywords
+        self.regex = regex
+        self.approved_users_only = approved_users_only
+
+    def get_pattern(self) -> str:
+        patterns = [re.escape(keyword) for keyword in self.keywords]
+        if self.regex:
+            patterns.append(self.regex)
+        return "|".join(patterns)
+
+
+def _reply_with(reply: str):
+    return lambda reddit_instance, comment: reddit_write_util.reply(comment, reply)
+
+
+def _toggle_transfer_detection(reddit_instance, comment) -> None:
+    if variables.BotSettings.transfer_news_detection:
+        variables.BotSettings.transfer_news_detection = False
+        reddit_write_util.reply(comment, resources.CommentReplies.TRANSFER_DETECTION_TURNED_OFF)
+    else:
+        variables.BotSettings.transfer_news_detection = True
+        reddit_write_util.reply(comment, resources.CommentReplies.TRANSFER_DETECTION_TURNED_ON)
+
+
+def _transfer_detection_status(reddit_instance, comment) -> None:
+    if variables.BotSettings.transfer_news_detection:
+        reddit_write_util.reply(comment, resources.CommentReplies.TRANSFER_DETECTION_ENABLED)
+    else:
+        reddit_write_util.reply(comment, resources.CommentReplies.TRANSFER_DETECTION_DISABLED)
+
+
+def _update_sidebar(reddit_instance, comment) -> None:
+    update_sidebar(reddit_instance)
+    reddit_write_util.reply(comment, resources.CommentReplies.SIDEBAR)
+
+
+# Bot commands in order of priority. If a comment triggers more than one command, the one listed first is performed.
+COMMANDS: Final[list[Command]] = [
+    Command("forza inter", _reply_with(resources.CommentReplies.FORZA_INTER), keywords=("forza inter",)),
+    Command("🚬🗿", _reply_with(resources.CommentReplies.SMOKE_STATUE), keywords=("🚬🗿",)),
+    Command("for swear keywords", _reply_with(resources.CommentReplies.SWEAR_WORD), regex=resources.Regex.SWEAR_KEYWORDS),
+    Command("for other subreddits", _reply_with(resources.CommentReplies.OTHER_SUBREDDITS), regex=resources.Regex.OTHER_SUBREDDIT_KEYWORDS),
+    Command("!inter amala", _reply_with(resources.CommentReplies.AMALA), keywords=("!inter amala",)),
+    Command("!inter bells", _reply_with(resources.CommentReplies.INTER_BELLS), keywords=("!inter bells",)),
+    Command("!inter comemai", _reply_with(resources.CommentReplies.COME_MAI), keywords=("!inter comemai", "!inter juve", "!inter juventus")),
+    Command("!inter marotta", _reply_with(resources.CommentReplies.MAROTTA), keywords=("!inter marotta",)),
+    Command("!inter marco", _reply_with(resources.CommentReplies.MARCO), keywords=("!inter marco",)),
+    Command("!inter tiamocampionato", _reply_with(resources.CommentReplies.TI_AMO), keywords=("!inter tiamocampionato", "!inter campionato", "!inter tiamo")),
+    Command("!inter about", _reply_with(resources.CommentReplies.ABOUT), keywords=("!inter about",)),
+    Command("!inter injuries/suspensions", lambda reddit_instance, comment: get_injuries_and_suspensions(comment), keywords=("!inter injuries", "!inter suspensions")),
+    Command("!inter next", lambda reddit_instance, comment: get_next_match(comment), keywords=("!inter next",)),
+    Command("!inter seriea", lambda reddit_instance, comment: get_serie_a_standings(comment), keywords=("!inter seriea",)),
+    Command("!inter coppaitalia", lambda reddit_instance, comment: getCoppaItaliaStandings(comment), keywords=("!inter coppaitalia", "!inter coppa")),
+    Command("!inter clubworldcup", lambda reddit_instance, comment: get_club_world_cup_standings(comment), keywords=("!inter clubworldcup", "!inter cwc")),
+    Command("!inter championsleague", lambda reddit_instance, comment: get_champions_league_standings(comment), keywords=("!inter championsleague", "!inter cl")),
+    Command("!inter toggletransferdetection", _toggle_transfer_detection, keywords=("!inter toggletransferdetection",), approved_users_only=True),
+    Command("!inter transferdetectionstatus", _transfer_detection_status, keywords=("!inter transferdetectionstatus",), approved_users_only=True),
+    Command("!inter pre", lambda reddit_instance, comment: create_pre_match_thread(reddit_instance, comment, None), keywords=("!inter pre",), approved_users_only=True),
+    Command("!inter live", lambda reddit_instance, comment: create_live_match_thread(reddit_instance, comment, None), keywords=("!inter live",), approved_users_only=True),
+    Command("!inter post", lambda reddit_instance, comment: create_post_match_thread(reddit_instance, comment), keywords=("!inter post",), approved_users_only=True),
+    Command("!inter sidebar", _update_sidebar, keywords=("!inter sidebar",), approved_users_only=True),
+    Command("invalid", _reply_with(resources.CommentReplies.NO_RESPONSE), keywords=("!inter",)),
+]
+
+# All commands compiled into a single alternation, so that a comment body is scanned only once. Alternation of plain literals without capturing
+# groups or case folding lets the regex engine skip straight to possible match starts (comment bodies are lowercased before matching).
+# Matches don't overlap, which is fine as long as no trigger contains the start of another trigger in its middle.
+COMMANDS_REGEX: Final[re.Pattern] = re.compile("|".join(command.get_pattern() for command in COMMANDS))
+
+
+# Index of the first listed command matching the whole matched text. Only a handful of distinct texts ever match, so lookups are memoized.
+@lru_cache(maxsize=256)
+def _get_command_index(matched_text: str) -> int:
+    for index, command in enumerate(COMMANDS):
+        if re.fullmatch(command.get_pattern(), matched_text):
+            return index
+
+
+# Resolves which command (if any) is triggered by the comment body.
+def resolve_command(comment_body: str) -> Optional[Command]:
+    command_index = None
+    for match in COMMANDS_REGEX.finditer(comment_body):
+        index = _get_command_index(match.group(0))
+        if command_index is None or index < command_index:
+            command_index = index
+            if index == 0:
+                break
+    return COMMANDS[command_index] if command_index is not None else None
+
+
+processed_comments = ProcessedItemLedger()
+command_rate_limiter = KeyedTokenBucket(config.Reddit.COMMAND_USER_RATE_LIMIT, config.Reddit.COMMAND_USER_RATE_PERIOD)
+
+
+@metrics_util.instrumented(metrics_util.comment_processing_seconds, metrics_util.comment_processing_errors)
 def _process_comments(reddit_instance, comment) -> None:
-    # Ignore comments that has been saved (meaning already processed) or made by the bot itself.
-    if comment.author == config.Reddit.BOT_REDDIT_USER or comment.saved:
+    # Ignore comments that are in the ledger (meaning already processed) or made by the bot itself.
+    if comment.author == config.Reddit.BOT_REDDIT_USER or processed_comments.contains(comment.fullname):
+        return
+
+    # Comments processed before the ledger existed were saved on Reddit instead.
+    if comment.created_utc < processed_comments.started_at and comment.saved:
         return
 
     # Convert values to lowercase for easier handling.
@@ -41,132 +160,24 @@ def _process_comments(reddit_instance, comment) -> None:
     logger.info("Processing comment by user: " + comment_author + ".")
 
     # Perform actions for various bot commands.
-
-    if "forza inter" in comment_body:
-        logger.info("Command forza inter triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.FORZA_INTER)
-
-    elif "🚬🗿" in comment_body:
-        logger.info("Command 🚬🗿 triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.SMOKE_STATUE)
-
-    elif re.search(resources.Regex.SWEAR_KEYWORDS, comment_body, re.IGNORECASE):
-        logger.info("Command for swear keywords triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.SWEAR_WORD)
-
-    elif re.search(resources.Regex.OTHER_SUBREDDIT_KEYWORDS, comment_body, re.IGNORECASE):
-        logger.info("Command for other subreddits triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.OTHER_SUBREDDITS)
-
-    elif "!inter amala" in comment_body:
-        logger.info("Command !inter amala triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.AMALA)
-
-    elif "!inter bells" in comment_body:
-        logger.info("Command !inter bells triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.INTER_BELLS)
-
-    elif "!inter comemai" in comment_body or "!inter juve" in comment_body or "!inter juventus" in comment_body:
-        logger.info("Command !inter cocomemai triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.COME_MAI)
-
-    elif "!inter marotta" in comment_body:
-        logger.info("Command !inter marotta triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.MAROTTA)
-
-    elif "!inter marco" in comment_body:
-        logger.info("Command !inter marco triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.MARCO)
-
-    elif "!inter tiamocampionato" in comment_body or "!inter campionato" in comment_body or "!inter tiamo" in comment_body:
-        logger.info("Command !inter tiamocampionato triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.TI_AMO)
-
-    elif "!inter about" in comment_body:
-        logger.info("Command !inter about triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.ABOUT)
-
-    elif "!inter injuries" in comment_body or "!inter suspensions" in comment_body:
-        logger.info("Command !inter injuries/suspensions triggered by: " + comment_author)
-        get_injuries_and_suspensions(comment)
-
-    elif "!inter next" in comment_body:
-        logger.info("Command !inter next triggered by: " + comment_author)
-        get_next_match(comment)
-
-    elif "!inter seriea" in comment_body:
-        logger.info("Command !inter seriea triggered by: " + comment_author)
-        get_serie_a_standings(comment)
-
-    elif "!inter coppaitalia" in comment_body or "!inter coppa" in comment_body:
-        logger.info("Command !inter coppaitalia triggered by: " + comment_author)
-        getCoppaItaliaStandings(comment)
-
-    elif "!inter clubworldcup" in comment_body or "!inter cwc" in comment_body:
-        logger.info("Command !inter clubworldcup triggered by: " + comment_author)
-        get_club_world_cup_standings(comment)
-
-    elif "!inter championsleague" in comment_body or "!inter cl" in comment_body:
-        logger.info("Command !inter championsleague triggered by: " + comment_author)
-        get_champions_league_standings(comment)
-
-    elif "!inter toggletransferdetection" in comment_body and comment_author in config.Reddit.APPROVED_USERS:
-        logger.info("Command !inter toggletransferdetection triggered by: " + comment_author)
-        if comment_author in config.Reddit.APPROVED_USERS:
-            old_value = variables.BotSettings.transfer_news_detection
-            if old_value:
-                variables.BotSettings.transfer_news_detection = False
-                comment.reply(resources.CommentReplies.TRANSFER_DETECTION_TURNED_OFF)
-            else:
-                variables.BotSettings.transfer_news_detection = True
-                comment.reply(resources.CommentReplies.TRANSFER_DETECTION_TURNED_ON)
-        else:
-            comment.reply(resources.CommentReplies.INSUFFICIENT_PERMISSIONS)
-
-    elif "!inter transferdetectionstatus" in comment_body and comment_author in config.Reddit.APPROVED_USERS:
-        logger.info("Command !inter transferdetectionstatus triggered by: " + comment_author)
-        if comment_author in config.Reddit.APPROVED_USERS:
-            if variables.BotSettings.transfer_news_detection:
-                comment.reply(resources.CommentReplies.TRANSFER_DETECTION_ENABLED)
-            else:
-                comment.reply(resources.CommentReplies.TRANSFER_DETECTION_DISABLED)
-        else:
-            comment.reply(resources.CommentReplies.INSUFFICIENT_PERMISSIONS)
-
-    elif "!inter pre" in comment_body:
-        logger.info("Command !inter pre triggered by: " + comment_author)
-        if comment_author in config.Reddit.APPROVED_USERS:
-            create_pre_match_thread(reddit_instance, comment, None)
-        else:
-            comment.reply(resources.CommentReplies.INSUFFICIENT_PERMISSIONS)
-
-    elif "!inter live" in comment_body:
-        logger.info("Command !inter live triggered by: " + comment_author)
-        if comment_author in config.Reddit.APPROVED_USERS:
-            create_live_match_thread(reddit_instance, comment, None)
-        else:
-            comment.reply(resources.CommentReplies.INSUFFICIENT_PERMISSIONS)
-
-    elif "!inter post" in comment_body:
-        logger.info("Command !inter post triggered by: " + comment_author)
-        if comment_author in config.Reddit.APPROVED_USERS:
-            create_post_match_thread(comment)
-        else:
-            comment.reply(resources.CommentReplies.INSUFFICIENT_PERMISSIONS)
-
-    elif "!inter sidebar" in comment_body:
-        logger.info("Command !inter sidebar triggered by: " + comment_author)
-        if comment_author in config.Reddit.APPROVED_USERS:
-            update_sidebar(reddit_instance)
-            comment.reply(resources.CommentReplies.SIDEBAR)
-        else:
-            comment.reply(resources.CommentReplies.INSUFFICIENT_PERMISSIONS)
-
-    elif "!inter" in comment_body:
+    command = resolve_command(comment_body)
+    if command is None:
+        pass
+    elif command.approved_users_only and comment_author not in config.Reddit.APPROVED_USERS:
+        logger.info(f"Command {command.name} triggered by user without permissions: {comment_author}")
+        reddit_write_util.reply(comment, resources.CommentReplies.INSUFFICIENT_PERMISSIONS)
+    elif comment_author not in config.Reddit.APPROVED_USERS and not command_rate_limiter.try_acquire(comment_author):
+        logger.info(f"Command {command.name} ignored, user {comment_author} exceeded command rate limit.")
+    elif command.name == "invalid":
         logger.info("Invalid command [" + comment_body + "] triggered by: " + comment_author)
-        comment.reply(resources.CommentReplies.NO_RESPONSE)
-
-    comment.save()  # Prevent future processing of the same comment.
+        with metrics_util.command_seconds.time(command=command.name):
+            command.handler(reddit_instance, comment)
+    else:
+        logger.info(f"Command {command.name} triggered by: {comment_author}")
+        with quota_util.caller(quota_util.MODERATOR_COMMAND if command.approved_users_only else quota_util.COMMENT_COMMAND), metrics_util.command_seconds.time(command=command.name):
+            command.handler(reddit_instance, comment)
+
+    processed_comments.add(comment.fullname)  # Prevent future processing of the same comment.
 
 
 if __name__ == "__main__":
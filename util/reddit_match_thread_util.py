@@ -1,72 +1,86 @@
-import re
+import functools
+import hashlib
+import math
 import time
 from datetime import timedelta, datetime
 from json import JSONDecodeError
-from typing import Final
 
 import pytz
-import requests
 from prawcore import RequestException, ServerError, Forbidden
 
 from reddit_bot.config import config
 from reddit_bot.data import resources, variables
+from reddit_bot.util import concurrency_util, match_thread_state_util, metrics_util, quota_util, rapidapi_client_util, reddit_write_util
+from reddit_bot.util.cadence_util import NOT_PLAYED_STATUSES, get_match_thread_check_delay, get_match_thread_update_delay
 from reddit_bot.util.date_util import format_date, format_time
-from reddit_bot.util.format_util import add_league_table, add_knockout_stages
+from reddit_bot.util.format_util import add_league_table, add_knockout_stages, get_safe_name_str
+from reddit_bot.util.live_match_util import LiveMatchModel
 from reddit_bot.util.logging_util import logger
+from reddit_bot.util.match_thread_registry_util import match_thread_registry, PRE_MATCH, LIVE_MATCH, POST_MATCH
 from reddit_bot.util.rapidapi_util import fetch_next_game
 from reddit_bot.util.reddit_submission_util import create_submission
 
 
-# Create pre-match discussion thread one day before match and match discussion thread one hour before match.
-def match_threads_creator(reddit_instance) -> None:
-    while True:
-        next_match = fetch_next_game()  # Get information about next game.
+# Rendered state of the live match thread, kept between updates and reset when post-match discussion thread is created.
+live_match_model = LiveMatchModel()
+metrics_util.live_match_in_progress.set_function(lambda: variables.MatchThreadVariables.live_match_in_progress.is_set())
 
-        if not next_match:  # In case no information is available for next game.
-            logger.info("Match thread organizer didn't find any upcoming games.")
-            time.sleep(config.Reddit.MATCH_THREAD_CHECK_INTERVAL) # Idle for interval timeout duration before checking again.
-            continue
+# Wakes up the parked live update job, called with the delay until its first run when a match becomes live. Set by whatever runs the job.
+wake_live_update_job = None
 
-        logger.info("Checking next matches for creation of match threads.")
 
-        # Get date of next match and subtract remaining time.
-        match_date = datetime.fromisoformat(next_match["fixture"]["date"].replace("Z", "+00:00")).astimezone(pytz.timezone("Europe/Rome"))
-        remaining_until_next_game = match_date - datetime.now(pytz.timezone("Europe/Rome"))
+# Scheduled job, creates pre-match discussion thread one day before match and match discussion thread one hour before match.
+# Returns delay until the next check, which is derived from the kickoff time of the next match.
+@quota_util.attributed_to(quota_util.MATCH_THREAD)
+def check_match_threads(reddit_instance) -> float:
+    next_match = fetch_next_game()  # Get information about next game.
 
-        match_teams = f"{next_match['teams']['home']['name']} - {next_match['teams']['away']['name']}"
+    if not next_match:  # In case no information is available for next game.
+        logger.info("Match thread organizer didn't find any upcoming games.")
+        return get_match_thread_check_delay(None, False, False)
 
-        if remaining_until_next_game < timedelta(days=1) and not variables.MatchThreadVariables.pre_match_thread_created:  # If less than a day away from a match, create pre-match thread.
-            logger.info(f"Creating a pre-match discussion thread for: {match_teams}")
-            try:
-                create_pre_match_thread(reddit_instance, None, next_match)
-            except Exception:
-                logger.exception("Error while scheduler tried to create a new pre-match discussion thread.")
+    logger.info("Checking next matches for creation of match threads.")
 
-        if remaining_until_next_game < timedelta(minutes=60) and not variables.MatchThreadVariables.live_match_thread_created:  # If less than an hour away from a match, create live-match thread.
-            logger.info(f"Creating a live-match discussion thread for: {match_teams}")
-            try:
-                create_live_match_thread(reddit_instance, None, next_match)
-            except Exception:
-                logger.exception("Error while scheduler tried to create a new live-match discussion thread.")
-        time.sleep(config.Reddit.MATCH_THREAD_CHECK_INTERVAL)  # Idle for interval timeout duration before checking again.
+    # Get date of next match and subtract remaining time.
+    match_date = datetime.fromisoformat(next_match["fixture"]["date"].replace("Z", "+00:00")).astimezone(pytz.timezone("Europe/Rome"))
+    remaining_until_next_game = match_date - datetime.now(pytz.timezone("Europe/Rome"))
+
+    match_teams = f"{next_match['teams']['home']['name']} - {next_match['teams']['away']['name']}"
+
+    if remaining_until_next_game < timedelta(days=1) and not variables.MatchThreadVariables.pre_match_thread_created:  # If less than a day away from a match, create pre-match thread.
+        logger.info(f"Creating a pre-match discussion thread for: {match_teams}")
+        try:
+            create_pre_match_thread(reddit_instance, None, next_match)
+        except Exception:
+            logger.exception("Error while scheduler tried to create a new pre-match discussion thread.")
+
+    if remaining_until_next_game < timedelta(minutes=60) and not variables.MatchThreadVariables.live_match_thread_created:  # If less than an hour away from a match, create live-match thread.
+        logger.info(f"Creating a live-match discussion thread for: {match_teams}")
+        try:
+            create_live_match_thread(reddit_instance, None, next_match)
+        except Exception:
+            logger.exception("Error while scheduler tried to create a new live-match discussion thread.")
 
+    next_check_delay = get_match_thread_check_delay(next_match, variables.MatchThreadVariables.pre_match_thread_created, variables.MatchThreadVariables.live_match_thread_created)
+    logger.info(f"Next match thread check in {int(next_check_delay)} seconds.")
+    return next_check_delay
 
+
+@match_thread_state_util.transition
 def create_pre_match_thread(reddit_instance, comment, next_match) -> None:
     variables.MatchThreadVariables.pre_match_thread_created = True
-    subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
 
     next_game_info_json = next_match or fetch_next_game()
 
     # Define title.
-    submission_title = "[Pre-Match Discussion Thread] " + next_game_info_json["teams"]["home"]["name"] + " vs " + next_game_info_json["teams"]["away"]["name"] + " (" + next_game_info_json["league"]["name"] + ", " + next_game_info_json["league"]["round"].replace("Regular Season -", "Matchday") + ")"
+    submission_title = "[Pre-Match Discussion Thread] " + get_safe_name_str(next_game_info_json["teams"]["home"]["name"]) + " vs " + get_safe_name_str(next_game_info_json["teams"]["away"]["name"]) + " (" + next_game_info_json["league"]["name"] + ", " + next_game_info_json["league"]["round"].replace("Regular Season -", "Matchday") + ")"
 
     # Check if pre-match thread already exists.
-    existing_submissions = subreddit.new(limit=config.Reddit.SUBMISSION_CHECK_BATCH_SIZE)
-    for existing_submission in existing_submissions:
-        if submission_title == existing_submission.title:
-            if comment is not None:
-                comment.reply(f"{resources.CommentReplies.PRE_MATCH_DISCUSSION_EXISTS}{existing_submission.url}.")
-            return
+    existing_thread = match_thread_registry.find(reddit_instance, next_game_info_json["fixture"]["id"], PRE_MATCH, submission_title)
+    if existing_thread is not None:
+        if comment is not None:
+            reddit_write_util.reply_now(comment, f"{resources.CommentReplies.PRE_MATCH_DISCUSSION_EXISTS}{existing_thread.url}.")
+        return
 
     # Prepare thread contents - details.
     submission_content = "---\n\n## 📋 Match Info 📋\n\n"
@@ -74,7 +88,7 @@ def create_pre_match_thread(reddit_instance, comment, next_match) -> None:
         submission_content += f"\n- **Date:** {format_date(next_game_info_json['fixture']['date'], False, True)}"
         submission_content += f"\n- **Time:** {format_time(next_game_info_json['fixture']['date'])} (GMT+1)"
     if next_game_info_json["fixture"]["venue"].get("name"):
-        submission_content += f"\n- **Venue:** {next_game_info_json['fixture']['venue']['name']}"
+        submission_content += f"\n- **Venue:** {get_safe_name_str(next_game_info_json['fixture']['venue']['name'])}"
     if next_game_info_json.get("league"):
         submission_content += f"\n- **Competition:** {next_game_info_json['league']['name']}"
     if next_game_info_json["league"]["name"] == "Serie A":
@@ -83,51 +97,80 @@ def create_pre_match_thread(reddit_instance, comment, next_match) -> None:
         submission_content += f"\n- **Round:** {next_game_info_json['league']['round']}"
     submission_content += "\n\n---\n\n"
 
+    # Prepare thread contents - competition, injuries and head-2-head. Sections are independent, so they are fetched at the same time.
+    # A section that fails or times out is left out, instead of delaying or failing thread creation.
+    sections = concurrency_util.fan_out({
+        "competition": functools.partial(_get_competition_section, next_game_info_json),
+        "injuries": functools.partial(_get_injuries_section, next_game_info_json),
+        "h2h": functools.partial(_get_h2h_section, next_game_info_json),
+    }, config.FootballRapidApi.FAN_OUT_TIMEOUT, default="")
+    submission_content += "".join(sections.values())
+
+    # Create pre-match discussion thread
+    submission = create_submission(reddit_instance, submission_title, submission_content, next_game_info_json["fixture"]["id"], PRE_MATCH)
+    logger.info(f"Created pre-match discussion thread: {submission_title} ({next_game_info_json['fixture']['id']})")
+
+    # Reply to comment if it exists.
+    if comment is not None:
+        reddit_write_util.reply_now(comment, f"{resources.CommentReplies.PRE_MATCH_DISCUSSION_CREATED}{submission.url}.")
+
+
+# Pre-match thread section with competition's table and/or knockout stages.
+def _get_competition_section(next_game_info_json: dict) -> str:
+    section_content = ""
     if next_game_info_json["league"]["name"] == "Serie A":
-        submission_content = add_league_table(submission_content, next_game_info_json["league"]["id"], "Serie A")
-        submission_content += "\n\n---\n\n"
+        section_content = add_league_table(section_content, next_game_info_json["league"]["id"], "Serie A")
+        section_content += "\n\n---\n\n"
 
     if next_game_info_json["league"]["name"] == "UEFA Champions League":
-        submission_content = add_league_table(submission_content, next_game_info_json["league"]["id"], "Champions League")
-        submission_content = add_knockout_stages(submission_content, next_game_info_json["league"]["id"], "Champions League")
-        submission_content += "\n\n---\n\n"
+        section_content = add_league_table(section_content, next_game_info_json["league"]["id"], "Champions League")
+        section_content = add_knockout_stages(section_content, next_game_info_json["league"]["id"], "Champions League")
+        section_content += "\n\n---\n\n"
 
     if next_game_info_json["league"]["name"] == "FIFA Club World Cup":
-        submission_content = add_league_table(submission_content, next_game_info_json["league"]["id"], "Club World Cup")
-        submission_content = add_knockout_stages(submission_content, next_game_info_json["league"]["id"], "Club World Cup")
-        submission_content += "\n\n---\n\n"
+        section_content = add_league_table(section_content, next_game_info_json["league"]["id"], "Club World Cup")
+        section_content = add_knockout_stages(section_content, next_game_info_json["league"]["id"], "Club World Cup")
+        section_content += "\n\n---\n\n"
 
     if next_game_info_json["league"]["name"] == "Coppa Italia":
-        submission_content = add_knockout_stages(submission_content, next_game_info_json["league"]["id"], "Coppa Italia")
-        submission_content += "\n\n---\n\n"
+        section_content = add_knockout_stages(section_content, next_game_info_json["league"]["id"], "Coppa Italia")
+        section_content += "\n\n---\n\n"
+    return section_content
 
-    # Prepare thread contents - injuries.
+
+# Pre-match thread section with injured and suspended players.
+def _get_injuries_section(next_game_info_json: dict) -> str:
+    section_content = ""
     injuries_url = config.FootballRapidApi.get_injuries_by_fixture_id_url(next_game_info_json["fixture"]["id"])
     logger.info("Football Rapid API: Fetched injuries for pre-match thread.")
-    injuries_json = requests.get(injuries_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS).json()
+    injuries_json = rapidapi_client_util.fetch(injuries_url).json()
     injuries_data = injuries_json.get("response", [])
     if injuries_data:
-        submission_content += "## 🏥 Injured/Suspended Players 🏥\n\n"
-        submission_content += "^(*This bot feature is still in beta, information could be inaccurate.*)\n\n"
-        submission_content += "| Player | Reason | Status | Team |\n"
-        submission_content += "|:--|:-:|:-:|:-:|\n"
+        section_content += "## 🏥 Injured/Suspended Players 🏥\n\n"
+        section_content += "^(*This bot feature is still in beta, information could be inaccurate.*)\n\n"
+        section_content += "| Player | Reason | Status | Team |\n"
+        section_content += "|:--|:-:|:-:|:-:|\n"
         for item in injuries_data:
-            submission_content += f"| {item['player']['name']} | {item['player']['reason']} | {item['player']['type']} | {item['team']['name']} |\n"
-        submission_content += "\n\n---\n\n"
+            section_content += f"| {get_safe_name_str(item['player']['name'])} | {item['player']['reason']} | {item['player']['type']} | {get_safe_name_str(item['team']['name'])} |\n"
+        section_content += "\n\n---\n\n"
+    return section_content
 
-    # Prepare thread contents - head-2-head.
+
+# Pre-match thread section with head-to-head statistics and latest results.
+def _get_h2h_section(next_game_info_json: dict) -> str:
+    section_content = ""
     h2h_url = config.FootballRapidApi.get_h2h_by_team_id_url(next_game_info_json['teams']['home']['id'], next_game_info_json['teams']['away']['id'])
     logger.info("Football Rapid API: Fetched head-2-head for pre-match thread.")
-    h2h_json = requests.get(h2h_url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS).json()
+    h2h_json = rapidapi_client_util.fetch(h2h_url).json()
     h2h_data_fixtures = h2h_json.get("response", [])
 
     if h2h_data_fixtures:
-        submission_content += "## ⚔️ Head-to-Head ⚔️\n\n"
-        submission_content += "### Statistics\n\n"
-        submission_content += "^(*H2H statistics may include only fixtures from recent years and may not represent overall historical data.*)\n\n"
+        section_content += "## ⚔️ Head-to-Head ⚔️\n\n"
+        section_content += "### Statistics\n\n"
+        section_content += "^(*H2H statistics may include only fixtures from recent years and may not represent overall historical data.*)\n\n"
 
-        home_team = next_game_info_json["teams"]["home"]["name"]
-        away_team = next_game_info_json["teams"]["away"]["name"]
+        home_team = get_safe_name_str(next_game_info_json["teams"]["home"]["name"])
+        away_team = get_safe_name_str(next_game_info_json["teams"]["away"]["name"])
 
         # Only consider completed matches for statistics
         completed_matches = [match for match in h2h_data_fixtures if match["fixture"]["status"]["short"] in ["FT", "AET", "PEN"]]
@@ -156,46 +199,43 @@ def create_pre_match_thread(reddit_instance, comment, next_match) -> None:
                 else:
                     home_wins += 1
 
-        submission_content += f"| Total Played | {home_team} Win | Draw | {away_team} Win |\n"
-        submission_content += "|:-:|:-:|:-:|:-:|\n"
-        submission_content += f"| {total_played} | {home_wins} | {draws} | {away_wins} |\n"
+        section_content += f"| Total Played | {home_team} Win | Draw | {away_team} Win |\n"
+        section_content += "|:-:|:-:|:-:|:-:|\n"
+        section_content += f"| {total_played} | {home_wins} | {draws} | {away_wins} |\n"
 
         sorted_fixtures = sorted(completed_matches, key=lambda match: match["fixture"]["timestamp"], reverse=True)[:8]
 
         if sorted_fixtures:
-            submission_content += "\n### Latest Results\n\n"
-            submission_content += "| Home | Score | Away | Date | Competition |\n"
-            submission_content += "|:-:|:-:|:-:|:-:|:-:|\n"
+            section_content += "\n### Latest Results\n\n"
+            section_content += "| Home | Score | Away | Date | Competition |\n"
+            section_content += "|:-:|:-:|:-:|:-:|:-:|\n"
 
             for match in sorted_fixtures:
-                home = match["teams"]["home"]["name"]
-                away = match["teams"]["away"]["name"]
+                home = get_safe_name_str(match["teams"]["home"]["name"])
+                away = get_safe_name_str(match["teams"]["away"]["name"])
                 home_goals = match["goals"]["home"]
                 away_goals = match["goals"]["away"]
                 date = format_date(match["fixture"]["date"], True, True)
                 competition = match["league"]["name"]
 
                 if home_goals > away_goals:
-                    submission_content += f"| **{home}** | {home_goals}-{away_goals} | {away} | {date} | {competition} |\n"
+                    section_content += f"| **{home}** | {home_goals}-{away_goals} | {away} | {date} | {competition} |\n"
                 elif home_goals < away_goals:
-                    submission_content += f"| {home} | {home_goals}-{away_goals} | **{away}** | {date} | {competition} |\n"
+                    section_content += f"| {home} | {home_goals}-{away_goals} | **{away}** | {date} | {competition} |\n"
                 else:
-                    submission_content += f"| {home} | {home_goals}-{away_goals} | {away} | {date} | {competition} |\n"
-
-        submission_content += "\n\n---\n\n"
-
-    # Create pre-match discussion thread
-    submission = create_submission(reddit_instance, submission_title, submission_content)
-    logger.info(f"Created pre-match discussion thread: {submission_title} ({next_game_info_json['fixture']['id']})")
+                    section_content += f"| {home} | {home_goals}-{away_goals} | {away} | {date} | {competition} |\n"
 
-    # Reply to comment if it exists.
-    if comment is not None:
-        comment.reply(f"{resources.CommentReplies.PRE_MATCH_DISCUSSION_CREATED}{submission.url}.")
+        section_content += "\n\n---\n\n"
+    return section_content
 
 
+@match_thread_state_util.transition
 def create_live_match_thread(reddit_instance, comment, next_match):
     variables.MatchThreadVariables.live_match_thread_created = True
-    subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
+    if not variables.MatchThreadVariables.live_match_in_progress.is_set():
+        variables.MatchThreadVariables.live_match_in_progress.set()
+        if wake_live_update_job is not None:
+            wake_live_update_job(config.Reddit.MATCH_THREAD_UPDATE_INTERVAL)
 
     if next_match is None:
         next_game_info_json = fetch_next_game()  # Get info for next game.
@@ -206,24 +246,26 @@ def create_live_match_thread(reddit_instance, comment, next_match):
     variables.MatchThreadVariables.live_match_football_api_id = int(next_game_info_json["fixture"]["id"])
 
     # Define title.
-    submission_title = "[Match Thread] " + next_game_info_json["teams"]["home"]["name"] + " vs " + next_game_info_json["teams"]["away"]["name"] + " (" + next_game_info_json["league"]["name"] + ", " + next_game_info_json["league"]["round"].replace("Regular Season -", "Matchday") + ")"
+    submission_title = "[Match Thread] " + get_safe_name_str(next_game_info_json["teams"]["home"]["name"]) + " vs " + get_safe_name_str(next_game_info_json["teams"]["away"]["name"]) + " (" + next_game_info_json["league"]["name"] + ", " + next_game_info_json["league"]["round"].replace("Regular Season -", "Matchday") + ")"
 
     # Check if match thread already exists.
-    existing_submissions = subreddit.new(limit=config.Reddit.SUBMISSION_CHECK_BATCH_SIZE)
-    for existing_submission in existing_submissions:
-        if submission_title == existing_submission.title:
-            if comment is not None:
-                comment.reply(resources.CommentReplies.MATCH_DISCUSSION_EXISTS + existing_submission.url + ".")
-            return
+    existing_thread = match_thread_registry.find(reddit_instance, variables.MatchThreadVariables.live_match_football_api_id, LIVE_MATCH, submission_title)
+    if existing_thread is not None:
+        variables.MatchThreadVariables.live_match_reddit_submission_id = existing_thread.submission_id  # Keep updating the existing thread.
+        if comment is not None:
+            reddit_write_util.reply_now(comment, resources.CommentReplies.MATCH_DISCUSSION_EXISTS + existing_thread.url + ".")
+        return
 
     # Prepare thread contents.
+    home_team_name = get_safe_name_str(next_game_info_json["teams"]["home"]["name"])
+    away_team_name = get_safe_name_str(next_game_info_json["teams"]["away"]["name"])
     submission_content = ""
     if next_game_info_json["fixture"]["status"]["short"] in ["FT", "AET", "PEN"]:
-        submission_content += f"# Full Time: {next_game_info_json['teams']['home']['name']} {next_game_info_json['goals']['home']}-{next_game_info_json['goals']['away']} {next_game_info_json['teams']['away']['name']}\n\n"
+        submission_content += f"# Full Time: {home_team_name} {next_game_info_json['goals']['home']}-{next_game_info_json['goals']['away']} {away_team_name}\n\n"
     elif next_game_info_json["fixture"]["status"]["short"] == "HT":
-        submission_content += f"# Half Time: {next_game_info_json['teams']['home']['name']} {next_game_info_json['goals']['home']}-{next_game_info_json['goals']['away']} {next_game_info_json['teams']['away']['name']}\n\n"
+        submission_content += f"# Half Time: {home_team_name} {next_game_info_json['goals']['home']}-{next_game_info_json['goals']['away']} {away_team_name}\n\n"
     else:
-        submission_content += f"# {next_game_info_json['fixture']['status']['elapsed']}′: {next_game_info_json['teams']['home']['name']} {next_game_info_json['goals']['home']}-{next_game_info_json['goals']['away']} {next_game_info_json['teams']['away']['name']}\n\n"
+        submission_content += f"# {next_game_info_json['fixture']['status']['elapsed']}′: {home_team_name} {next_game_info_json['goals']['home']}-{next_game_info_json['goals']['away']} {away_team_name}\n\n"
 
     goals_home = ""
     goals_away = ""
@@ -235,76 +277,73 @@ def create_live_match_thread(reddit_instance, comment, next_match):
                 goals_away += f" {event.get('player', '')} ({event.get('elapsed', '')}′)"
 
     if goals_home:
-        submission_content += f" **{next_game_info_json['teams']['home']['name']}:** {goals_home}.\n\n"
+        submission_content += f" **{home_team_name}:** {goals_home}.\n\n"
     if goals_away:
-        submission_content += f" **{next_game_info_json['teams']['away']['name']}:** {goals_away}.\n\n"
+        submission_content += f" **{away_team_name}:** {goals_away}.\n\n"
 
     submission_content += "\n\n---\n\n"
     if next_game_info_json["fixture"].get("venue"):
-        submission_content += f"**Venue:** {next_game_info_json['fixture']['venue']['name']}\n\n"
+        submission_content += f"**Venue:** {get_safe_name_str(next_game_info_json['fixture']['venue']['name'])}\n\n"
     submission_content += "\n\n---\n\n"
     submission_content = submission_content.replace("None", "0")
 
     # Create match thread and set ongoing match thread ID.
-    submission = create_submission(reddit_instance, submission_title, submission_content)
+    submission = create_submission(reddit_instance, submission_title, submission_content, variables.MatchThreadVariables.live_match_football_api_id, LIVE_MATCH)
     logger.info("Created match thread: " + submission_title + "(" + str(next_game_info_json["fixture"]["id"]) + ")")
     variables.MatchThreadVariables.live_match_reddit_submission_id = submission.id
 
     # Reply to comment if it exists.
     if comment is not None:
-        comment.reply(resources.CommentReplies.MATCH_DISCUSSION_CREATED + submission.url + ".")
+        reddit_write_util.reply_now(comment, resources.CommentReplies.MATCH_DISCUSSION_CREATED + submission.url + ".")
 
 
-def match_threads_updater(reddit_instance):
-    # Live game in progress, update it.
-    while True:
-        if variables.MatchThreadVariables.live_match_thread_created:
-            time.sleep(config.Reddit.MATCH_THREAD_UPDATE_INTERVAL)
-            try:
-                update_match_thread(reddit_instance)
-            except (RequestException, ServerError, Forbidden) as e:  # This error handling is needed because sometimes, Reddit API will error out and would stop the processing thread.
-                logger.warning(f"{e} - Error communicating with Reddit when updating match thread!")
-
-
-def update_match_thread(reddit_instance):
-    def get_safe_name_str(name, default="Unknown"):  # Helper function to safely get any name with consistent handling
-        MOJIBAKE_MAP: Final[dict[str, str]] = {
-            'Ã‡': 'Ç', 'Ã§': 'ç', 'Ã¼': 'ü', 'Ã¤': 'ä', 'Ã¶': 'ö', 'ÃŸ': 'ß',
-            'Ã©': 'é', 'Ã¨': 'è', 'Ãª': 'ê', 'Ã«': 'ë', 'Ã¡': 'á', 'Ã ': 'à',
-            'Ã¢': 'â', 'Ã£': 'ã', 'Ã±': 'ñ', 'Ã³': 'ó', 'Ã²': 'ò', 'Ã´': 'ô',
-            'Ãµ': 'õ', 'Ã¸': 'ø', 'Ã¥': 'å', 'Ã‰': 'É', 'Ãœ': 'Ü', 'Ã–': 'Ö',
-            'Ã„': 'Ä', 'â€™': "'", 'â€“': '-', 'Ã®': 'î', 'Ã¯': 'ï', 'Ã¬': 'ì',
-            'Ã­': 'í', 'Ã¿': 'ÿ', 'Ã½': 'ý', 'Å¡': 'š', 'Å¾': 'ž', 'Ä‡': 'ć',
-            'Å‚': 'ł', 'Ä™': 'ę', 'Å„': 'ń', 'Åº': 'ź', 'Ä…': 'ą', 'Ä': 'č',
-            'Å¥': 'ť', 'ÄŸ': 'ğ', 'Ä±': 'ı', 'ÅŸ': 'ş'
-        }
-        MOJIBAKE_REGEX: Final[re.Pattern] = re.compile('|'.join(map(re.escape, MOJIBAKE_MAP)))
-        MOJIBAKE_MARKERS: Final[tuple[str, ...]] = ('Ã', 'Â', 'Ä')
-
-        if name is None or name == "null":
-            return default
-        if isinstance(name, bytes):
-            name = name.decode('utf-8', errors='replace')
-        else:
-            name = str(name)
-        if any(marker in name for marker in MOJIBAKE_MARKERS):
-            name = MOJIBAKE_REGEX.sub(lambda m: MOJIBAKE_MAP[m.group(0)], name)
-            if any(marker in name for marker in MOJIBAKE_MARKERS):
-                try:
-                    name = name.encode('latin1').decode('utf-8')
-                except UnicodeDecodeError:
-                    pass
-        return name
+# Live match thread edits that were queued and not collected yet, as (content hash, future). Only touched by the live update job.
+_pending_live_match_thread_edits = []
+
 
+# Records results of queued live match thread edits. Runs on the live update job's thread rather than on the writer thread, because
+# checkpointing takes the transition lock, which is held by transitions while they post to Reddit. Waits for pending edits if wait is set.
+def _collect_live_match_thread_edits(wait: bool = False) -> None:
+    while _pending_live_match_thread_edits and (wait or _pending_live_match_thread_edits[0][1].done()):
+        content_hash, future = _pending_live_match_thread_edits.pop(0)
+        try:
+            future.result()
+        except Exception as e:
+            if content_hash == variables.MatchThreadVariables.live_match_content_hash:
+                variables.MatchThreadVariables.live_match_content_hash = ""  # Edit is retried on the next update.
+            metrics_util.live_match_thread_edits.inc(result="failed")
+            logger.error(f"Failed to update Reddit submission: {str(e)}")
+            continue
+        variables.MatchThreadVariables.live_match_edits_performed += 1
+        metrics_util.live_match_thread_edits.inc(result="performed")
+        match_thread_state_util.checkpoint()
+        logger.info(f"Updated live match thread for match ID: {variables.MatchThreadVariables.live_match_football_api_id} (performed: {variables.MatchThreadVariables.live_match_edits_performed}, skipped: {variables.MatchThreadVariables.live_match_edits_skipped}).")
+
+
+# Scheduled job, updates the live match thread. While no match is live, the job is parked until create_live_match_thread wakes it up.
+# Returns delay until the next update, which is derived from the state of the fixture (kickoff, half time, last minutes).
+@quota_util.attributed_to(quota_util.LIVE_UPDATE)
+def update_live_match_thread(reddit_instance) -> float:
+    if not variables.MatchThreadVariables.live_match_in_progress.is_set():
+        return math.inf
+    game_info_json = None
+    try:
+        game_info_json = update_match_thread(reddit_instance)
+    except (RequestException, ServerError, Forbidden) as e:  # This error handling is needed because sometimes, Reddit API will error out.
+        logger.warning(f"{e} - Error communicating with Reddit when updating match thread!")
+    return get_match_thread_update_delay(game_info_json)
+
+
+def update_match_thread(reddit_instance):  # Returns fetched fixture data, so that the next update can be scheduled based on the state of the match.
     # Get information about game
     url = config.FootballRapidApi.get_fixture_by_id_url(variables.MatchThreadVariables.live_match_football_api_id)
     logger.info("Football Rapid API: Fetched fixture details for updating match thread.")
     try:
-        response = requests.get(url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS).json()
+        response = rapidapi_client_util.fetch(url).json()
         game_info_json = response["response"][0]
     except (KeyError, IndexError, JSONDecodeError) as e:
         logger.error(f"Failed to parse API response: {str(e)}")
-        return
+        return None
 
     # Retry logic for events data.
     retry_count = 0
@@ -316,7 +355,7 @@ def update_match_thread(reddit_instance):
             logger.warning("Fetched game data for live match thread doesn't contain events, retrying...")
             time.sleep(10)
             try:
-                response = requests.get(url, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS).json()
+                response = rapidapi_client_util.fetch(url, refresh=True).json()
                 game_info_json = response["response"][0]
             except (KeyError, IndexError) as e:
                 logger.error(f"Failed to parse API response during retry: {str(e)}")
@@ -342,6 +381,9 @@ def update_match_thread(reddit_instance):
         submission_content += f"# Full Time: {home_team_name} {home_goals}-{away_goals} {away_team_name}\n\n"
     elif status_short == "HT":
         submission_content += f"# Half Time: {home_team_name} {home_goals}-{away_goals} {away_team_name}\n\n"
+    elif status_short in NOT_PLAYED_STATUSES:
+        status_long = game_info_json.get("fixture", {}).get("status", {}).get("long") or status_short
+        submission_content += f"# {status_long}: {home_team_name} {home_goals}-{away_goals} {away_team_name}\n\n"
     elif elapsed_time is not None:
         submission_content += f"# {elapsed_time}′: {home_team_name} {home_goals}-{away_goals} {away_team_name}\n\n"
     else:
@@ -395,106 +437,95 @@ def update_match_thread(reddit_instance):
         submission_content += f"**Referee:** {get_safe_name_str(referee_name)}\n\n"
 
     # Process lineups
-    try:
-        lineups = game_info_json.get("lineups", [])
-        if (len(lineups) >= 2 and
-                lineups[0].get("team") and lineups[0].get("startXI") and lineups[0].get("substitutes") and
-                lineups[1].get("team") and lineups[1].get("startXI") and lineups[1].get("substitutes")):
-            submission_content += "\n\n---\n\n"
-            home_line_up = lineups[0]
-            away_line_up = lineups[1]
-            submission_content += "### Lineups\n\n"
-
-            # Process home lineup
-            try:
-                home_line_up["start"] = ", ".join(
-                    get_safe_name_str(player.get("player", {}).get("name", "Unknown Player"))
-                    for player in home_line_up["startXI"]
-                )
-                home_line_up["subs"] = ", ".join(
-                    get_safe_name_str(sub.get("player", {}).get("name", "Unknown Player"))
-                    for sub in home_line_up["substitutes"]
-                )
-                submission_content += f"#### {home_team_name}\n\n"
-                submission_content += f" **Starting XI:** {home_line_up['start']}\n\n"
-                submission_content += f" **Substitutes:** {home_line_up['subs']}\n\n"
-                if home_line_up.get("coach", {}).get("name"):
-                    submission_content += f" **Coach:** {get_safe_name_str(home_line_up['coach']['name'])}\n\n"
-            except Exception as e:
-                logger.error(f"Error processing home lineup: {str(e)}")
+    def render_lineups(lineups, home_team_name, away_team_name) -> str:
+        lineups_content = ""
+        try:
+            if (len(lineups) >= 2 and
+                    lineups[0].get("team") and lineups[0].get("startXI") and lineups[0].get("substitutes") and
+                    lineups[1].get("team") and lineups[1].get("startXI") and lineups[1].get("substitutes")):
+                lineups_content += "\n\n---\n\n"
+                lineups_content += "### Lineups\n\n"
+                for line_up, team_name in ((lineups[0], home_team_name), (lineups[1], away_team_name)):
+                    try:
+                        start = ", ".join(
+                            get_safe_name_str(player.get("player", {}).get("name", "Unknown Player"))
+                            for player in line_up["startXI"]
+                        )
+                        subs = ", ".join(
+                            get_safe_name_str(sub.get("player", {}).get("name", "Unknown Player"))
+                            for sub in line_up["substitutes"]
+                        )
+                        lineups_content += f"#### {team_name}\n\n"
+                        lineups_content += f" **Starting XI:** {start}\n\n"
+                        lineups_content += f" **Substitutes:** {subs}\n\n"
+                        if line_up.get("coach", {}).get("name"):
+                            lineups_content += f" **Coach:** {get_safe_name_str(line_up['coach']['name'])}\n\n"
+                    except Exception as e:
+                        logger.error(f"Error processing lineup of {team_name}: {str(e)}")
+            else:
+                logger.warning("Live match thread: couldn't extract team lineups, incomplete 'lineups' information in JSON data.")
+        except Exception as e:
+            logger.error(f"Error while parsing team lineups: {str(e)}")
+        return lineups_content
 
-            # Process away lineup
-            try:
-                away_line_up["start"] = ", ".join(
-                    get_safe_name_str(player.get("player", {}).get("name", "Unknown Player"))
-                    for player in away_line_up["startXI"]
-                )
-                away_line_up["subs"] = ", ".join(
-                    get_safe_name_str(sub.get("player", {}).get("name", "Unknown Player"))
-                    for sub in away_line_up["substitutes"]
-                )
-                submission_content += f"#### {away_team_name}\n\n"
-                submission_content += f" **Starting XI:** {away_line_up['start']}\n\n"
-                submission_content += f" **Substitutes:** {away_line_up['subs']}\n\n"
-                if away_line_up.get("coach", {}).get("name"):
-                    submission_content += f" **Coach:** {get_safe_name_str(away_line_up['coach']['name'])}\n\n"
-            except Exception as e:
-                logger.error(f"Error processing away lineup: {str(e)}")
-        else:
-            logger.warning("Live match thread: couldn't extract team lineups, incomplete 'lineups' information in JSON data.")
-    except Exception as e:
-        logger.error(f"Error while parsing team lineups: {str(e)}")
+    submission_content += live_match_model.render_section("lineups", (game_info_json.get("lineups", []), home_team_name, away_team_name), render_lineups)
+
+    # Process events. Only events that weren't seen in previous updates are formatted.
+    def format_event(event) -> str:
+        try:
+            event_type = event.get("type")
+            time_elapsed = event.get("time", {}).get("elapsed", "?")
+            team_name = get_safe_name_str(event.get("team", {}).get("name", "Unknown Team"))
+            player_name = get_safe_name_str(event.get("player", {}).get("name", "Unknown Player"))
+            assist_name = get_safe_name_str(event.get("assist", {}).get("name")) if event.get("assist") else None
+            detail = event.get("detail", "")
+
+            if event_type == "Goal" and detail == "Missed Penalty":
+                return f"| {time_elapsed}′ | ❌ **Missed Penalty ({team_name}):** {player_name}. |\n"
+            elif event_type == "Goal" and event.get("team", {}).get("id") == config.FootballRapidApi.FOOTBALL_RAPID_API_INTER_CLUB_ID:
+                assist_text = f", assist by {assist_name}" if assist_name and assist_name != "Unknown" else ""
+                penalty_text = " (Penalty)" if detail == "Penalty" else ""
+                return f"| {time_elapsed}′ | ⚽ **GOAAAAAAAL (Inter): {player_name}{assist_text}{penalty_text}. Forza Inter!** ⚫🔵 |\n"
+            elif event_type == "Goal":
+                assist_text = f", assist by {assist_name}" if assist_name and assist_name != "Unknown" else ""
+                penalty_text = " (Penalty)" if detail == "Penalty" else ""
+                return f"| {time_elapsed}′ | ⚽ **Goal ({team_name}): {player_name}{assist_text}{penalty_text}.** |\n"
+            elif event_type == "Card" and detail == "Yellow Card":
+                return f"| {time_elapsed}′ | **🟨 Yellow card ({team_name}):** {player_name}. |\n"
+            elif event_type == "Card" and detail == "Red Card":
+                return f"| {time_elapsed}′ | **🟥 Red card ({team_name}):** {player_name}. |\n"
+            elif event_type == "subst" and assist_name:
+                return f"| {time_elapsed}′ | **🔄 Sub ({team_name}):** {assist_name} replaces {player_name}. |\n"
+        except Exception as e:
+            logger.error(f"Error processing event: {str(e)}")
+        return ""
 
-    # Process events
     events = game_info_json.get("events", [])
     if events:
+        event_rows, new_events = live_match_model.render_events(events, format_event)
+        for event in new_events:
+            if event.get("type") == "Goal" and event.get("detail") != "Missed Penalty":
+                logger.info(f"New goal in live match {variables.MatchThreadVariables.live_match_football_api_id}: {format_event(event).strip()}")
         submission_content += "\n\n---\n\n"
         submission_content += "### Match Events\n\n"
         submission_content += "| Min | Event |\n"
         submission_content += "|:-:|:--|\n"
-
-        for event in events:
-            try:
-                event_type = event.get("type")
-                time_elapsed = event.get("time", {}).get("elapsed", "?")
-                team_name = get_safe_name_str(event.get("team", {}).get("name", "Unknown Team"))
-                player_name = get_safe_name_str(event.get("player", {}).get("name", "Unknown Player"))
-                assist_name = get_safe_name_str(event.get("assist", {}).get("name")) if event.get("assist") else None
-                detail = event.get("detail", "")
-
-                if event_type == "Goal" and detail == "Missed Penalty":
-                    submission_content += f"| {time_elapsed}′ | ❌ **Missed Penalty ({team_name}):** {player_name}. |\n"
-                elif event_type == "Goal" and event.get("team", {}).get("id") == config.FootballRapidApi.FOOTBALL_RAPID_API_INTER_CLUB_ID:
-                    assist_text = f", assist by {assist_name}" if assist_name and assist_name != "Unknown" else ""
-                    penalty_text = " (Penalty)" if detail == "Penalty" else ""
-                    submission_content += f"| {time_elapsed}′ | ⚽ **GOAAAAAAAL (Inter): {player_name}{assist_text}{penalty_text}. Forza Inter!** ⚫🔵 |\n"
-                elif event_type == "Goal":
-                    assist_text = f", assist by {assist_name}" if assist_name and assist_name != "Unknown" else ""
-                    penalty_text = " (Penalty)" if detail == "Penalty" else ""
-                    submission_content += f"| {time_elapsed}′ | ⚽ **Goal ({team_name}): {player_name}{assist_text}{penalty_text}.** |\n"
-                elif event_type == "Card" and detail == "Yellow Card":
-                    submission_content += f"| {time_elapsed}′ | **🟨 Yellow card ({team_name}):** {player_name}. |\n"
-                elif event_type == "Card" and detail == "Red Card":
-                    submission_content += f"| {time_elapsed}′ | **🟥 Red card ({team_name}):** {player_name}. |\n"
-                elif event_type == "subst" and assist_name:
-                    submission_content += f"| {time_elapsed}′ | **🔄 Sub ({team_name}):** {assist_name} replaces {player_name}. |\n"
-            except Exception as e:
-                logger.error(f"Error processing event: {str(e)}")
-                continue
+        submission_content += event_rows
     else:
         logger.warning("Live match thread: couldn't extract game events, no 'events' information in JSON data.")
 
     # Process statistics
-    if game_info_json.get("statistics"):
+    def render_statistics(statistics, home_team_name, away_team_name) -> str:
+        statistics_content = ""
         try:
-            submission_content += "\n\n---\n\n"
-            submission_content += "### Match Stats\n\n"
+            statistics_content += "\n\n---\n\n"
+            statistics_content += "### Match Stats\n\n"
 
-            stats_home = game_info_json["statistics"][0].get("statistics", [])
-            stats_away = game_info_json["statistics"][1].get("statistics", [])
+            stats_home = statistics[0].get("statistics", [])
+            stats_away = statistics[1].get("statistics", [])
 
-            submission_content += f"| {home_team_name} |  | {away_team_name} |\n"
-            submission_content += "|:-:|:-:|:-:|\n"
+            statistics_content += f"| {home_team_name} |  | {away_team_name} |\n"
+            statistics_content += "|:-:|:-:|:-:|\n"
 
             stat_mapping = {
                 "Ball Possession": "Ball Possession",
@@ -517,21 +548,35 @@ def update_match_thread(reddit_instance):
             for stat_type, display_name in stat_mapping.items():
                 home_value = next((s.get("value", "0") for s in stats_home if s.get("type") == stat_type), "0")
                 away_value = next((s.get("value", "0") for s in stats_away if s.get("type") == stat_type), "0")
-                submission_content += f"| {home_value} | {display_name} | {away_value} |\n"
+                statistics_content += f"| {home_value} | {display_name} | {away_value} |\n"
         except Exception as e:
             logger.error(f"Error processing statistics: {str(e)}")
+        return statistics_content
+
+    if game_info_json.get("statistics"):
+        submission_content += live_match_model.render_section("statistics", (game_info_json["statistics"], home_team_name, away_team_name), render_statistics)
     else:
         logger.warning("Live match thread: couldn't extract statistics, no 'statistics' information in JSON data.")
 
     submission_content += "\n\n---\n\n"
     submission_content = submission_content.replace("None", "0")
 
-    # Update existing match thread
-    try:
-        reddit_instance.submission(id=variables.MatchThreadVariables.live_match_reddit_submission_id).edit(submission_content)
-        logger.info("Updated live match thread for match ID: " + str(variables.MatchThreadVariables.live_match_football_api_id))
-    except Exception as e:
-        logger.error(f"Failed to update Reddit submission: {str(e)}")
+    # Update existing match thread, unless nothing changed since the last update.
+    content_hash = hashlib.sha256(submission_content.encode("utf-8")).hexdigest()
+    if content_hash == variables.MatchThreadVariables.live_match_content_hash:
+        variables.MatchThreadVariables.live_match_edits_skipped += 1
+        metrics_util.live_match_thread_edits.inc(result="skipped")
+        logger.info(f"Skipped live match thread update for match ID: {variables.MatchThreadVariables.live_match_football_api_id}, content unchanged (performed: {variables.MatchThreadVariables.live_match_edits_performed}, skipped: {variables.MatchThreadVariables.live_match_edits_skipped}).")
+    else:
+        # Hash is set when the edit is queued, so that the same content isn't queued again. A queued edit that wasn't performed yet is replaced.
+        variables.MatchThreadVariables.live_match_content_hash = content_hash
+        submission_id = variables.MatchThreadVariables.live_match_reddit_submission_id
+        future = reddit_write_util.reddit_write_queue.submit(reddit_write_util.MATCH_THREAD, reddit_instance.submission(id=submission_id).edit, submission_content, coalesce_key=("edit", submission_id))
+        pending_edit = next((pending_edit for pending_edit in _pending_live_match_thread_edits if pending_edit[1] is future), None)
+        if pending_edit is not None:
+            _pending_live_match_thread_edits.remove(pending_edit)  # Queued edit was replaced by this one.
+        _pending_live_match_thread_edits.append((content_hash, future))
+    _collect_live_match_thread_edits()
 
     # Create post-match thread if game is finished
     if status_short in ["FT", "AET", "PEN"]:
@@ -545,38 +590,62 @@ def update_match_thread(reddit_instance):
                 f"({league_name}, {round_info})"
             )
             variables.MatchThreadVariables.post_match_thread_content = submission_content
+            _collect_live_match_thread_edits(wait=True)  # Final edit is performed and recorded before the post-match thread resets edit counters.
             create_post_match_thread(reddit_instance, None)
         except Exception as e:
             logger.error(f"Failed to prepare post-match thread: {str(e)}")
 
+    # End live match if it won't be played to the end (postponed, cancelled, abandoned, awarded), there is no post-match thread for it.
+    elif status_short in NOT_PLAYED_STATUSES:
+        _collect_live_match_thread_edits(wait=True)
+        end_live_match(status_short)
+
+    return game_info_json
 
-def create_post_match_thread(reddit_instance, comment=None):
-    subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
 
+@match_thread_state_util.transition
+def create_post_match_thread(reddit_instance, comment=None):
     # Check if match thread already exists.
-    existing_submissions = subreddit.new(limit=config.Reddit.SUBMISSION_CHECK_BATCH_SIZE)
-    for existing_submission in existing_submissions:
-        if variables.MatchThreadVariables.post_match_thread_title == existing_submission.title:
-            if comment is not None:
-                comment.reply(resources.CommentReplies.POST_MATCH_DISCUSSION_EXISTS + existing_submission.url + ".")
-            return
+    existing_thread = match_thread_registry.find(reddit_instance, variables.MatchThreadVariables.live_match_football_api_id, POST_MATCH, variables.MatchThreadVariables.post_match_thread_title)
+    if existing_thread is not None:
+        if comment is not None:
+            reddit_write_util.reply_now(comment, resources.CommentReplies.POST_MATCH_DISCUSSION_EXISTS + existing_thread.url + ".")
+        return
 
     # Create post-match discussion thread
-    submission = create_submission(reddit_instance, variables.MatchThreadVariables.post_match_thread_title, variables.MatchThreadVariables.post_match_thread_content)
+    submission = create_submission(reddit_instance, variables.MatchThreadVariables.post_match_thread_title, variables.MatchThreadVariables.post_match_thread_content, variables.MatchThreadVariables.live_match_football_api_id, POST_MATCH)
     logger.info("Created post-match discussion thread: " + str(variables.MatchThreadVariables.post_match_thread_title))
+    rapidapi_client_util.log_stats()  # Log Football Rapid API usage after each match.
 
     # Reply to comment if it exists.
     if comment is not None:
-        comment.reply(resources.CommentReplies.POST_MATCH_DISCUSSION_CREATED + submission.url + ".")
+        reddit_write_util.reply_now(comment, resources.CommentReplies.POST_MATCH_DISCUSSION_CREATED + submission.url + ".")
+
+    _reset_match_thread_variables()
+
+
+# Stops live match thread updates of a match that won't be played to the end, without creating a post-match thread.
+@match_thread_state_util.transition
+def end_live_match(status_short: str) -> None:
+    logger.info(f"Live match ID: {variables.MatchThreadVariables.live_match_football_api_id} ended with status {status_short}, post-match thread won't be created.")
+    rapidapi_client_util.log_stats()  # Log Football Rapid API usage after each match.
+    _reset_match_thread_variables()
+
 
+def _reset_match_thread_variables() -> None:
     # Reset pre-match and live match thread flags and post-match title and content so that they're ready for next game.
     variables.MatchThreadVariables.pre_match_thread_created = False
     variables.MatchThreadVariables.live_match_thread_created = False
+    variables.MatchThreadVariables.live_match_in_progress.clear()
     variables.MatchThreadVariables.live_match_events_already_existed = False
     variables.MatchThreadVariables.live_match_football_api_id = None
     variables.MatchThreadVariables.live_match_reddit_submission_id = ""
     variables.MatchThreadVariables.post_match_thread_title = ""
     variables.MatchThreadVariables.post_match_thread_content = ""
+    variables.MatchThreadVariables.live_match_content_hash = ""
+    variables.MatchThreadVariables.live_match_edits_performed = 0
+    variables.MatchThreadVariables.live_match_edits_skipped = 0
+    live_match_model.reset()
 
 
 if __name__ == "__main__":
@@ -1,23 +1,24 @@
-import time
+import functools
 
-import requests
 from prawcore import RequestException, ServerError, Forbidden
 
 from reddit_bot.config import config
 from reddit_bot.data import variables, resources
+from reddit_bot.util import concurrency_util, quota_util, rapidapi_client_util, reddit_write_util
 from reddit_bot.util.date_util import format_date
 from reddit_bot.util.format_util import add_league_table, add_knockout_stages
 from reddit_bot.util.logging_util import logger
 
 
-def sidebar_updater(reddit_instance) -> None:
-    while True:
-        try:
-            logger.info("Updating subreddit sidebar.")
-            update_sidebar(reddit_instance)
-        except (RequestException, ServerError, Forbidden) as e:  # This error handling is needed because sometimes, Reddit API will error out and would stop the processing thread.
-            logger.warning(f"{e} - Error communicating with Reddit when updating sidebar!")
-        time.sleep(config.Reddit.SIDEBAR_UPDATE_INTERVAL)
+# Scheduled job, refreshes the sidebar.
+@quota_util.attributed_to(quota_util.SIDEBAR)
+def refresh_sidebar(reddit_instance) -> None:
+    try:
+        logger.info("Updating subreddit sidebar.")
+        update_sidebar(reddit_instance)
+    except (RequestException, ServerError, Forbidden) as e:  # This error handling is needed because sometimes, Reddit API will error out.
+        logger.warning(f"{e} - Error communicating with Reddit when updating sidebar!")
+    rapidapi_client_util.log_stats()
 
 
 def update_sidebar(reddit_instance) -> None:
@@ -27,59 +28,26 @@ def update_sidebar(reddit_instance) -> None:
 
     subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
 
-    # Start building sidebar content with about section.
-    sidebar_content = resources.Sidebar.ABOUT
-
-    # Get last 3 fixtures
-    url_last_fixtures = config.FootballRapidApi.get_last_team_fixtures_url(3)
-    response_last_fixtures = requests.get(url_last_fixtures, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
-    logger.info("Football Rapid API: Fetched last 3 fixtures for sidebar.")
-    if response_last_fixtures.status_code == 200:
-        response_last_fixtures_json = response_last_fixtures.json()
-        last_fixtures = response_last_fixtures_json.get("response", [])
-        last_fixtures.reverse()
-        sidebar_content += "\n### Fixtures\n\n"
-        sidebar_content += "**Date**|**Opponent**|**Result**|**Comp**|\n"
-        sidebar_content += ":-:|:-:|:-:|:-:|\n"
-        for i in range(len(last_fixtures)):
-            match_data = format_match(last_fixtures[i])
-            if match_data["result"] == "P-P":
-                sidebar_content += f"{match_data['date']}|{match_data['isAway']}{match_data['opponent']}|{match_data['result']}|{match_data['league']}\n"
-            else:
-                sidebar_content += f"{match_data['date']}|{match_data['isAway']}{match_data['opponent']}|{match_data['result']} {last_fixtures[i]['goals']['home']}-{last_fixtures[i]['goals']['away']}|{match_data['league']}\n"
-
-        # Get next 3 fixtures
-        url_next_fixtures = config.FootballRapidApi.get_next_team_fixtures_url(3)
-        response_next_fixtures = requests.get(url_next_fixtures, headers=config.FootballRapidApi.FOOTBALL_RAPID_API_HEADERS)
-        logger.info("Football Rapid API: Fetched next 3 fixtures for sidebar.")
-        if response_next_fixtures.status_code == 200:
-            response_next_fixtures_json = response_next_fixtures.json()
-            next_fixtures = response_next_fixtures_json.get("response", [])
-            for i in range(len(next_fixtures)):
-                match_data = format_match(next_fixtures[i])
-                sidebar_content += f"{match_data['date']}|{match_data['isAway']}{match_data['opponent']}||{match_data['league']}\n"
-        else:
-            logger.warning("Failed to fetch next fixtures data from Rapid Football API for sidebar update.")
-    else:
-        logger.warning("Failed to fetch last fixtures data from Rapid Football API for sidebar update.")
-
-    # Add Serie A table.
-    sidebar_content = add_league_table(sidebar_content, config.FootballRapidApi.FOOTBALL_RAPID_API_SERIE_A_ID, "Serie A")
-
-    # Add Champions League table and knockout stages
-    sidebar_content = add_league_table(sidebar_content, config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID, "Champions League")
-    sidebar_content = add_knockout_stages(sidebar_content, config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID, "Champions League")
-
-    # Add Coppa Italia fixtures
-    sidebar_content = add_knockout_stages(sidebar_content, config.FootballRapidApi.FOOTBALL_RAPID_API_COPPA_ITALIA_ID, "Coppa Italia")
-
-    # Add Supercoppa Italiana fixtures
+    # Fetch all sections at the same time. Sections are assembled in fixed order, failed sections are left out.
+    sections = {
+        "last_fixtures": _get_last_fixtures_section,
+        "next_fixtures": _get_next_fixtures_section,
+        "serie_a_table": functools.partial(add_league_table, "", config.FootballRapidApi.FOOTBALL_RAPID_API_SERIE_A_ID, "Serie A"),
+        "champions_league_table": functools.partial(add_league_table, "", config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID, "Champions League"),
+        "champions_league_knockout_stages": functools.partial(add_knockout_stages, "", config.FootballRapidApi.FOOTBALL_RAPID_API_CHAMPIONS_LEAGUE_ID, "Champions League"),
+        "coppa_italia_knockout_stages": functools.partial(add_knockout_stages, "", config.FootballRapidApi.FOOTBALL_RAPID_API_COPPA_ITALIA_ID, "Coppa Italia"),
+    }
     if config.FootballRapidApi.FOOTBALL_RAPID_API_SUPERCOPPA_ID:
-        sidebar_content = add_knockout_stages(sidebar_content, config.FootballRapidApi.FOOTBALL_RAPID_API_SUPERCOPPA_ID, "Supercoppa Italiana")
+        sections["supercoppa_knockout_stages"] = functools.partial(add_knockout_stages, "", config.FootballRapidApi.FOOTBALL_RAPID_API_SUPERCOPPA_ID, "Supercoppa Italiana")
+    sections["club_world_cup_table"] = functools.partial(add_league_table, "", config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID, "Club World Cup")
+    sections["club_world_cup_knockout_stages"] = functools.partial(add_knockout_stages, "", config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID, "Club World Cup")
+    section_contents = concurrency_util.fan_out(sections, config.FootballRapidApi.FAN_OUT_TIMEOUT, default="")
 
-    # Add Club World Cup table and knockout stages
-    sidebar_content = add_league_table(sidebar_content, config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID, "Club World Cup")
-    sidebar_content = add_knockout_stages(sidebar_content, config.FootballRapidApi.FOOTBALL_RAPID_API_CLUB_WORLD_CUP_ID, "Club World Cup")
+    # Start building sidebar content with about section. Next fixtures are only listed below the last fixtures table.
+    sidebar_content = resources.Sidebar.ABOUT
+    if not section_contents["last_fixtures"]:
+        section_contents["next_fixtures"] = ""
+    sidebar_content += "".join(section_contents.values())
 
     # Append other sections.
     sidebar_content += resources.Sidebar.FILTER
@@ -89,11 +57,45 @@ def update_sidebar(reddit_instance) -> None:
     sidebar_content += resources.Sidebar.PODCASTS
     sidebar_content += resources.Sidebar.SUBREDDITS
 
-    # Submit sidebar changes.
-    subreddit.mod.update(description=sidebar_content)
+    # Submit sidebar changes. A queued sidebar update that wasn't performed yet is replaced with this one.
+    reddit_write_util.reddit_write_queue.perform(reddit_write_util.SIDEBAR, subreddit.mod.update, coalesce_key=("sidebar",), description=sidebar_content)
     logger.info("Updated subreddit sidebar.")
 
 
+def _get_last_fixtures_section() -> str:
+    url_last_fixtures = config.FootballRapidApi.get_last_team_fixtures_url(3)
+    response_last_fixtures = rapidapi_client_util.fetch(url_last_fixtures)
+    logger.info("Football Rapid API: Fetched last 3 fixtures for sidebar.")
+    if response_last_fixtures.status_code != 200:
+        logger.warning("Failed to fetch last fixtures data from Rapid Football API for sidebar update.")
+        return ""
+
+    last_fixtures = list(reversed(response_last_fixtures.json().get("response", [])))  # Reversed copy, cached API payloads are shared.
+    section_content = ["\n### Fixtures\n\n", "**Date**|**Opponent**|**Result**|**Comp**|\n", ":-:|:-:|:-:|:-:|\n"]
+    for fixture in last_fixtures:
+        match_data = format_match(fixture)
+        if match_data["result"] == "P-P":
+            section_content.append(f"{match_data['date']}|{match_data['isAway']}{match_data['opponent']}|{match_data['result']}|{match_data['league']}\n")
+        else:
+            section_content.append(f"{match_data['date']}|{match_data['isAway']}{match_data['opponent']}|{match_data['result']} {fixture['goals']['home']}-{fixture['goals']['away']}|{match_data['league']}\n")
+    return "".join(section_content)
+
+
+def _get_next_fixtures_section() -> str:
+    url_next_fixtures = config.FootballRapidApi.get_next_team_fixtures_url(3)
+    response_next_fixtures = rapidapi_client_util.fetch(url_next_fixtures)
+    logger.info("Football Rapid API: Fetched next 3 fixtures for sidebar.")
+    if response_next_fixtures.status_code != 200:
+        logger.warning("Failed to fetch next fixtures data from Rapid Football API for sidebar update.")
+        return ""
+
+    section_content = []
+    for fixture in response_next_fixtures.json().get("response", []):
+        match_data = format_match(fixture)
+        section_content.append(f"{match_data['date']}|{match_data['isAway']}{match_data['opponent']}||{match_data['league']}\n")
+    return "".join(section_content)
+
+
 def format_match(match: dict) -> dict:
     response = {
         "isAway": "@" if match["teams"]["home"]["id"] != config.FootballRapidApi.FOOTBALL_RAPID_API_INTER_CLUB_ID else "",
@@ -1,15 +1,31 @@
 import re
 import time
+from typing import Final, Optional
 
 from praw.models import Submission
 from prawcore import RequestException, ServerError, Forbidden, BadJSON
 
 from reddit_bot.config import config
 from reddit_bot.data import resources, variables
+from reddit_bot.util import metrics_util, reddit_write_util
 from reddit_bot.util.logging_util import logger
+from reddit_bot.util.match_thread_registry_util import match_thread_registry
+from reddit_bot.util.submission_state_util import SubmissionStateIndex, get_fingerprint
 
 
-def create_submission(reddit_instance, submission_title, submission_content) -> Submission:
+# Fixture ID and thread kind register the submission as a match thread, so that duplicates are found without listing the subreddit.
+# Called from match thread transitions, which hold the transition lock, so the submission is posted without waiting for the write queue.
+def create_submission(reddit_instance, submission_title, submission_content, fixture_id: int = None, thread_kind: str = None) -> Submission:
+    submission = reddit_write_util.reddit_write_queue.perform_now(reddit_write_util.MATCH_THREAD, _post_submission, reddit_instance, submission_title, submission_content)
+
+    if thread_kind is not None:
+        match_thread_registry.register(submission, fixture_id, thread_kind)
+
+    # Return submission so that it can be referenced in other methods later on.
+    return submission
+
+
+def _post_submission(reddit_instance, submission_title, submission_content) -> Submission:
     subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
 
     # Post the submission.
@@ -23,135 +39,219 @@ def create_submission(reddit_instance, submission_title, submission_content) ->
     submission.flair.select(flair_template_id=resources.SubmissionFlairs.MATCH_THREAD)
     submission.mod.sticky(state=True, bottom=True)
     submission.mod.suggested_sort(sort="new")
-
-    # Return submission so that it can be referenced in other methods later on.
     return submission
 
 
-def process_submissions_organizer(reddit_instance) -> None:
+# Scheduled job, fetches the latest batch of submissions and processes them. The latest batch is fully scanned periodically, to notice flairs
+# tagged by moderators on older submissions. Batches in between only fetch submissions newer than the second newest one seen, so the newest
+# one is listed again (its state is unchanged, so it isn't processed again). A deleted newest submission therefore never leaves batches empty.
+def process_submissions_batch(reddit_instance) -> None:
     subreddit = reddit_instance.subreddit(config.Reddit.SUBREDDIT_NAME)
-    while True:
-        logger.debug("Fetching latest submissions and processing them.")
-        try:
-            submissions = subreddit.new(limit=config.Reddit.SUBMISSION_CHECK_BATCH_SIZE)
-            for submission in submissions:
-                _process_submissions(submission)
-        except (RequestException, ServerError, Forbidden, ValueError, BadJSON) as e:  # This error handling is needed because sometimes, Reddit API will error out and would stop the processing thread.
-            logger.warning(f"{e} - Error communicating with Reddit when processing submissions!")
-        time.sleep(config.Reddit.SUBMISSION_CHECK_INTERVAL)
+    now = time.monotonic()
+    previous_submission_fullname = variables.SubmissionVariables.previous_submission_fullname
+    full_scan = previous_submission_fullname is None or now - variables.SubmissionVariables.last_full_scan >= config.Reddit.SUBMISSION_FULL_SCAN_INTERVAL
+    params = {} if full_scan else {"before": previous_submission_fullname}
+    logger.debug(f"Fetching latest submissions and processing them (full scan: {full_scan}).")
+    try:
+        with metrics_util.reddit_call("submission_listing"):
+            submissions = list(subreddit.new(limit=config.Reddit.SUBMISSION_CHECK_BATCH_SIZE, params=params))
+        for submission in submissions:
+            _process_submissions(submission)
+    except (RequestException, ServerError, Forbidden, ValueError, BadJSON) as e:  # This error handling is needed because sometimes, Reddit API will error out.
+        logger.warning(f"{e} - Error communicating with Reddit when processing submissions!")
+        return
+
+    # Move cursors to the two newest submissions. Incremental batch only lists submissions newer than the previous cursor, so it stays a candidate.
+    # If no submission is left to serve as the previous cursor (e.g. the newest one was deleted and nothing was posted), the next batch is a full scan.
+    fullnames = [submission.fullname for submission in sorted(submissions, key=lambda submission: submission.created_utc, reverse=True)]
+    if not full_scan:
+        fullnames.append(previous_submission_fullname)
+    variables.SubmissionVariables.newest_submission_fullname, variables.SubmissionVariables.previous_submission_fullname = (fullnames + [None, None])[:2]
+    if full_scan:
+        variables.SubmissionVariables.last_full_scan = now
+        pruned_states = submission_states.prune()
+        if pruned_states:
+            logger.info(f"Pruned {pruned_states} submission states, {len(submission_states)} remaining.")
+
+
+# Moderation actions, performed in the order they are listed in a rule.
+FLAIR: Final[str] = "flair"  # Argument is flair template ID.
+REPLY: Final[str] = "reply"  # Argument is reply text. Reply is distinguished and stickied.
+REMOVE: Final[str] = "remove"
+SAVE: Final[str] = "save"  # Saved submissions are filtered out by rules, to prevent performing the same actions multiple times.
+LOG: Final[str] = "log"  # Argument is log message, followed by submission title.
+
+
+# Moderation rule definition. Flair rules are triggered by the flair that moderators tagged the submission with. Content rules are triggered
+# for link submissions without flair, if any of the fields (title, text or url) contains one of its keywords. Optional condition is checked last.
+class ModerationRule:
+    def __init__(self, name: str, actions: tuple[tuple[str, Optional[str]], ...], flair_text: str = None, keywords: dict[str, tuple[str, ...]] = None, condition=None):
+        self.name = name
+        self.actions = actions
+        self.flair_text = flair_text
+        self.keywords = keywords or {}  # Field name -> lowercase keywords.
+        self.condition = condition  # Called with submission.
+
+
+def _remove_with(reply: str, log_message: str, flair_template_id: str = None) -> tuple[tuple[str, Optional[str]], ...]:
+    flair_action = ((FLAIR, flair_template_id),) if flair_template_id else ()
+    return flair_action + ((REPLY, reply), (REMOVE, None), (LOG, log_message))
+
+
+def _is_not_saved(submission) -> bool:
+    return not submission.saved
+
+
+def _is_new_transfer_news(submission) -> bool:
+    return variables.BotSettings.transfer_news_detection and not submission.saved
+
+
+# Moderation rules in order of evaluation. All triggered rules are performed, not only the first one.
+MODERATION_RULES: Final[list[ModerationRule]] = [
+    # Remove submissions and add explanatory comment if the submission was tagged with "Removed" flairs by moderators.
+    ModerationRule("removed rules", _remove_with(resources.SubmissionReplies.REMOVED_RULES, "Removed post due to rules"), flair_text="Removed - Rules"),
+    ModerationRule("removed duplicate", _remove_with(resources.SubmissionReplies.REMOVED_DUPLICATE, "Removed post due to duplication"), flair_text="Removed - Duplicate"),
+    ModerationRule("removed weekly free talk thread", _remove_with(resources.SubmissionReplies.REMOVED_WEEKLY_FREE_TALK_THREAD, "Removed post due to weekly free talk thread content"),
+                   flair_text="Removed - Weekly Free Talk Thread"),
+    ModerationRule("removed source", _remove_with(resources.SubmissionReplies.REMOVED_SOURCE, "Removed post due to source issues"), flair_text="Removed - Source"),
+    ModerationRule("removed match thread", _remove_with(resources.SubmissionReplies.REMOVED_MATCH_THREAD, "Removed post due to match thread content"), flair_text="Removed - Match Thread"),
+    ModerationRule("removed low effort", _remove_with(resources.SubmissionReplies.REMOVED_LOW_EFFORT, "Removed post due to low effort"), flair_text="Removed - Low Effort"),
+    # Post the transfer reliability tier list comment when a submission is tagged as 'Transfer Market' by moderators.
+    ModerationRule("transfer market", ((REPLY, resources.SubmissionReplies.MOD_FLAIR_TRANSFER_MARKET), (SAVE, None), (LOG, "Added transfer reliability tier list to transfer market post")),
+                   flair_text="Transfer Market", condition=_is_not_saved),
+    # Remove Discord promotions/questions.
+    ModerationRule("discord", _remove_with(resources.SubmissionReplies.DISCORD, "Removed post due to Discord keywords", resources.SubmissionFlairs.REMOVED_RULES),
+                   keywords={"url": ("discord.gg",), "text": ("discord.gg",), "title": ("discord",)}),
+    # Remove Twitter/X posts.
+    ModerationRule("twitter", _remove_with(resources.SubmissionReplies.TWITTER, "Removed post due to X/Twitter link", resources.SubmissionFlairs.REMOVED_RULES), keywords={"url": ("x.com",)}),
+    # Tag transfer news with flair and add comment.
+    ModerationRule("transfer news", ((FLAIR, resources.SubmissionFlairs.TRANSFER_MARKET), (REPLY, resources.SubmissionReplies.IDENTIFIED_TRANSFER_MARKET), (SAVE, None),
+                                     (LOG, "Added flair to post due to transfer market content")),
+                   keywords={"url": resources.Keywords.TRANSFER, "title": resources.Keywords.TRANSFER}, condition=_is_new_transfer_news),
+    # Remove ticket question threads.
+    ModerationRule("tickets", _remove_with(resources.SubmissionReplies.TICKETS, "Removed post due to tickets keywords", resources.SubmissionFlairs.REMOVED_RULES),
+                   keywords={"title": resources.Keywords.TICKET, "text": resources.Keywords.TICKET}),
+    # Remove spam threads.
+    ModerationRule("spam", _remove_with(resources.SubmissionReplies.SPAM, "Removed post due to spam keywords", resources.SubmissionFlairs.REMOVED_RULES),
+                   keywords={"url": resources.Keywords.SPAM, "text": resources.Keywords.SPAM, "title": resources.Keywords.SPAM}),
+]
+
+
+# Builds a regex matching any of the keywords with common prefixes factored out, e.g. "mar(?:zio|chetti|ca|i)". At each position of the scanned
+# text the regex engine then follows a single branch per character, instead of trying every keyword. Longest keyword is matched at each position.
+def _get_trie_pattern(keywords) -> str:
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for character in keyword:
+            node = node.setdefault(character, {})
+        node[""] = {}  # End of keyword.
+    return _get_trie_node_pattern(trie)
+
+
+def _get_trie_node_pattern(node: dict) -> str:
+    branches = [re.escape(character) + _get_trie_node_pattern(child) for character, child in node.items() if character]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{pattern})?" if "" in node else pattern
 
 
+# Compiles keywords of all rules scanning the field into a single scanner, returning (pattern, keyword -> indexes of rules it triggers).
+# Pattern is a lookahead, so that keywords overlapping each other are all found. Since only the longest keyword is captured at each
+# position, every keyword also triggers the rules of keywords that are its prefixes.
+def _compile_field_scanner(field: str) -> tuple[re.Pattern, dict[str, frozenset[int]]]:
+    keyword_rules = {}
+    for index, rule in enumerate(MODERATION_RULES):
+        for keyword in rule.keywords.get(field, ()):
+            keyword_rules.setdefault(keyword, set()).add(index)
+    triggered_rules = {keyword: frozenset().union(*(rules for prefix, rules in keyword_rules.items() if keyword.startswith(prefix))) for keyword in keyword_rules}
+    return re.compile("(?=(" + _get_trie_pattern(keyword_rules) + "))"), triggered_rules
+
+
+# Flair text -> indexes of rules triggered by it.
+FLAIR_RULES: Final[dict[str, list[int]]] = {}
+for _index, _rule in enumerate(MODERATION_RULES):
+    if _rule.flair_text:
+        FLAIR_RULES.setdefault(_rule.flair_text, []).append(_index)
+
+# Field name -> scanner. Fields are lowercased before scanning, so each field is scanned once for all rules.
+FIELD_SCANNERS: Final[dict[str, tuple[re.Pattern, dict[str, frozenset[int]]]]] = {field: _compile_field_scanner(field) for field in ("title", "text", "url")}
+
+
+def _get_matched_rules(field: str, value: str) -> set[int]:
+    scanner, triggered_rules = FIELD_SCANNERS[field]
+    matched_rules = set()
+    if value:
+        for match in scanner.finditer(value):
+            matched_rules |= triggered_rules[match.group(1)]
+    return matched_rules
+
+
+# Evaluates all moderation rules against the submission and returns the triggered ones in order.
+def get_triggered_rules(submission) -> list[ModerationRule]:
+    if submission.link_flair_text:
+        triggered_rules = FLAIR_RULES.get(submission.link_flair_text, ())
+    elif submission.url:
+        # Flair or remove submissions if they match certain content.
+        triggered_rules = sorted(_get_matched_rules("url", submission.url.lower()) | _get_matched_rules("title", submission.title.lower()) | _get_matched_rules("text", submission.selftext.lower()))
+    else:
+        return []
+    return [MODERATION_RULES[index] for index in triggered_rules if MODERATION_RULES[index].condition is None or MODERATION_RULES[index].condition(submission)]
+
+
+# Returns the ordered list of (action, argument) pairs to perform on the submission.
+def get_submission_actions(submission) -> list[tuple[str, Optional[str]]]:
+    return [action for rule in get_triggered_rules(submission) for action in rule.actions]
+
+
+def _reply(submission, reply: str) -> None:
+    comment = submission.reply(reply)
+    if comment and comment.id:
+        comment.mod.distinguish(sticky=True)
+
+
+ACTION_HANDLERS: Final[dict] = {
+    FLAIR: lambda submission, flair_template_id: submission.mod.flair(flair_template_id=flair_template_id),
+    REPLY: _reply,
+    REMOVE: lambda submission, _: submission.mod.remove(spam=True),
+    SAVE: lambda submission, _: submission.save(),
+    LOG: lambda submission, log_message: logger.info(log_message + ": " + submission.title),
+}
+
+
+submission_states = SubmissionStateIndex()
+
+
+# Evaluates moderation rules and performs actions of the triggered ones. Returns the triggered rules.
+def _moderate_submission(submission) -> list[ModerationRule]:
+    triggered_rules = get_triggered_rules(submission)
+    if triggered_rules:
+        reddit_write_util.reddit_write_queue.perform(reddit_write_util.MODERATION, _perform_actions, submission, triggered_rules)
+    return triggered_rules
+
+
+def _perform_actions(submission, triggered_rules: list[ModerationRule]) -> None:
+    for rule in triggered_rules:
+        for action, argument in rule.actions:
+            ACTION_HANDLERS[action](submission, argument)
+
+
+@metrics_util.instrumented(metrics_util.submission_processing_seconds, metrics_util.submission_processing_errors)
 def _process_submissions(submission) -> None:
     # Ignore submissions that are posted by the bot.
     if submission.author and submission.author.name == config.Reddit.BOT_REDDIT_USER:
         return
 
-    logger.debug("Processing submission: " + submission.title)  # Currently disabled, too much spam in the logs.
-
-    # Get submission title and URL.
-    title = submission.title.lower()
-    text = submission.selftext.lower()
-    url = submission.url.lower() if submission.url else None
-
-    # Remove submissions and add explanatory comment if the submission was tagged with "Removed" flairs by moderators.
-    if submission.link_flair_text == "Removed - Rules":
-        comment = submission.reply(resources.SubmissionReplies.REMOVED_RULES)
-        if comment and comment.id:
-            comment.mod.distinguish(sticky=True)
-        submission.mod.remove(spam=True)
-        logger.info("Removed post due to rules: " + submission.title)
-
-    if submission.link_flair_text == "Removed - Duplicate":
-        comment = submission.reply(resources.SubmissionReplies.REMOVED_DUPLICATE)
-        if comment and comment.id:
-            comment.mod.distinguish(sticky=True)
-        submission.mod.remove(spam=True)
-        logger.info("Removed post due to duplication: " + submission.title)
-
-    if submission.link_flair_text == "Removed - Weekly Free Talk Thread":
-        comment = submission.reply(resources.SubmissionReplies.REMOVED_WEEKLY_FREE_TALK_THREAD)
-        if comment and comment.id:
-            comment.mod.distinguish(sticky=True)
-        submission.mod.remove(spam=True)
-        logger.info("Removed post due to weekly free talk thread content: " + submission.title)
-
-    if submission.link_flair_text == "Removed - Source":
-        comment = submission.reply(resources.SubmissionReplies.REMOVED_SOURCE)
-        if comment and comment.id:
-            comment.mod.distinguish(sticky=True)
-        submission.mod.remove(spam=True)
-        logger.info("Removed post due to source issues: " + submission.title)
-
-    if submission.link_flair_text == "Removed - Match Thread":
-        comment = submission.reply(resources.SubmissionReplies.REMOVED_MATCH_THREAD)
-        if comment and comment.id:
-            comment.mod.distinguish(sticky=True)
-        submission.mod.remove(spam=True)
-        logger.info("Removed post due to match thread content: " + submission.title)
-
-    if submission.link_flair_text == "Removed - Low Effort":
-        comment = submission.reply(resources.SubmissionReplies.REMOVED_LOW_EFFORT)
-        if comment and comment.id:
-            comment.mod.distinguish(sticky=True)
-        submission.mod.remove(spam=True)
-        logger.info("Removed post due to low effort: " + submission.title)
+    # Ignore submissions that were already evaluated and haven't changed since.
+    fingerprint = get_fingerprint(submission)
+    if submission_states.is_evaluated(submission.id, fingerprint):
+        return
 
-    # Post the transfer reliability tier list comment when a submission is tagged as 'Transfer Market' by moderators.
+    logger.debug("Processing submission: " + submission.title)  # Currently disabled, too much spam in the logs.
 
-    if submission.link_flair_text == "Transfer Market" and not submission.saved:
-        comment = submission.reply(resources.SubmissionReplies.MOD_FLAIR_TRANSFER_MARKET)
-        if comment and comment.id:
-            comment.mod.distinguish(sticky=True)
-        submission.save()  # This is necessary to prevent multiple actions being performed by the bot on a single submission. Saved submissions are then filtered out in the future.
-        logger.info("Added transfer reliability tier list to transfer market post: " + submission.title)
-
-    # Flair or remove submissions if they match certain content.
-    if url and not submission.link_flair_text:
-
-        # Remove Discord promotions/questions.
-        if (url and "discord.gg" in url) or (text and "discord.gg" in text) or "discord" in title:
-            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
-            comment = submission.reply(resources.SubmissionReplies.DISCORD)
-            if comment and comment.id:
-                comment.mod.distinguish(sticky=True)
-            submission.mod.remove(spam=True)
-            logger.info("Removed post due to Discord keywords: " + submission.title)
-
-        # Remove Twitter/X posts.
-        if url and "x.com" in url:
-            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
-            comment = submission.reply(resources.SubmissionReplies.TWITTER)
-            if comment and comment.id:
-                comment.mod.distinguish(sticky=True)
-            submission.mod.remove(spam=True)
-            logger.info("Removed post due to X/Twitter link: " + submission.title)
-
-        # Tag transfer news with flair and add comment.
-        if variables.BotSettings.transfer_news_detection and not submission.saved and ((url and re.search(resources.Regex.TRANSFER_KEYWORDS, url, re.IGNORECASE)) or re.search(resources.Regex.TRANSFER_KEYWORDS, title, re.IGNORECASE)):
-            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.TRANSFER_MARKET)
-            comment = submission.reply(resources.SubmissionReplies.IDENTIFIED_TRANSFER_MARKET)
-            if comment and comment.id:
-                comment.mod.distinguish(sticky=True)
-            submission.save()  # This is necessary to prevent multiple actions being performed by the bot on a single submission. Saved submissions are then filtered out in the future.
-            logger.info("Added flair to post due to transfer market content: " + submission.title)
-
-        # Remove ticket question threads.
-        if re.search(resources.Regex.TICKET_KEYWORDS, title, re.IGNORECASE) or (text and re.search(resources.Regex.TICKET_KEYWORDS, text, re.IGNORECASE)):
-            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
-            comment = submission.reply(resources.SubmissionReplies.TICKETS)
-            if comment and comment.id:
-                comment.mod.distinguish(sticky=True)
-            submission.mod.remove(spam=True)
-            logger.info("Removed post due to tickets keywords: " + submission.title)
-
-        # Remove spam threads.
-        if (url and re.search(resources.Regex.SPAM_KEYWORDS, url, re.IGNORECASE)) or (text and re.search(resources.Regex.SPAM_KEYWORDS, text, re.IGNORECASE)) or re.search(resources.Regex.SPAM_KEYWORDS, title, re.IGNORECASE):
-            submission.mod.flair(flair_template_id=resources.SubmissionFlairs.REMOVED_RULES)
-            comment = submission.reply(resources.SubmissionReplies.SPAM)
-            if comment and comment.id:
-                comment.mod.distinguish(sticky=True)
-            submission.mod.remove(spam=True)
-            logger.info("Removed post due to spam keywords: " + submission.title)
+    triggered_rules = _moderate_submission(submission)
+    submission_states.record(submission, fingerprint, ",".join(rule.name for rule in triggered_rules))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Final
+
+from reddit_bot.config import config
+from reddit_bot.util import metrics_util
+from reddit_bot.util.logging_util import logger
+
+# Write priorities, lower is performed first.
+MATCH_THREAD: Final[int] = 0  # Live match thread edits and match thread creation.
+MODERATION: Final[int] = 1  # Actions of moderation rules (removals, flairs, replies to submissions).
+COMMAND_REPLY: Final[int] = 2
+SIDEBAR: Final[int] = 3
+PRIORITY_NAMES: Final[dict[int, str]] = {MATCH_THREAD: "match_thread", MODERATION: "moderation", COMMAND_REPLY: "command_reply", SIDEBAR: "sidebar"}
+
+
+# Delay between writes, so that writes are spread over what is left of Reddit's rate limit window. Requests up to the reserve are left for
+# reads (comment stream, listings) and once the remaining requests are down to them, writes wait for the window to reset.
+def get_pacing_delay(limits: dict, now: float) -> float:
+    remaining, reset_timestamp = limits.get("remaining"), limits.get("reset_timestamp")
+    if remaining is None or reset_timestamp is None:
+        return 0.0  # No request was made yet, limits are unknown.
+    seconds_to_reset = max(reset_timestamp - now, 0.0)
+    writable_requests = remaining - config.Reddit.WRITE_RATE_LIMIT_RESERVE
+    if writable_requests < 1:
+        return seconds_to_reset
+    return seconds_to_reset / writable_requests
+
+
+# Performs the write and sets its result (or exception, logged by the caller) on the future. Returns whether the write succeeded.
+def _perform_write(priority: int, func, args: tuple, kwargs: dict, future: Future) -> bool:
+    try:
+        with metrics_util.reddit_call(PRIORITY_NAMES[priority]):
+            result = func(*args, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+        return False
+    future.set_result(result)
+    return True
+
+
+class _Write:
+    def __init__(self, priority: int, func, args: tuple, kwargs: dict, coalesce_key, enqueued_at: float):
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.coalesce_key = coalesce_key
+        self.enqueued_at = enqueued_at
+        self.future = Future()
+
+
+class _PriorityStats:
+    def __init__(self):
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> dict:
+        average_wait = self.total_wait / self.writes if self.writes else 0.0
+        return {"writes": self.writes, "coalesced": self.coalesced, "failures": self.failures, "avg_wait": round(average_wait, 3), "max_wait": round(self.max_wait, 3)}
+
+
+# Single outbound queue for Reddit writes, performed one at a time by a writer thread in order of priority and paced by the rate limit
+# reported in Reddit's response headers, so that writes don't contend for the rate limit and praw doesn't sleep inside the comment stream.
+# A queued write with the same coalesce key (e.g. edit of the same submission) is replaced by a newer one, its callers get the newer result.
+# Until the queue is started, writes are performed right away by the caller.
+class RedditWriteQueue:
+    def __init__(self, clock=time.monotonic, wall_clock=time.time):
+        self._clock = clock
+        self._wall_clock = wall_clock  # Reddit's reset timestamp is in epoch time.
+        self._queue = []  # (priority, sequence number, _Write). Writes of the same priority are performed in order they were queued.
+        self._coalescable = {}  # Coalesce key -> queued _Write.
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stats = {priority: _PriorityStats() for priority in PRIORITY_NAMES}
+        self._reddit_instance = None
+        self._thread = None
+        self._stopped = False
+        self._next_write_at = 0.0
+
+    def start(self, reddit_instance) -> None:
+        self._reddit_instance = reddit_instance
+        self._thread = threading.Thread(target=self._run_writer, name="reddit-writer", daemon=True)
+        self._thread.start()
+        logger.info("Started Reddit write queue.")
+
+    # Queues the write and returns its future.
+    def submit(self, priority: int, func, *args, coalesce_key=None, **kwargs) -> Future:
+        if self._thread is None:
+            future = Future()
+            _perform_write(priority, func, args, kwargs, future)
+            return future
+
+        with self._condition:
+            write = self._coalescable.get(coalesce_key) if coalesce_key is not None else None
+            if write is not None:
+                write.func, write.args, write.kwargs = func, args, kwargs  # Superseded write keeps its place in the queue.
+                self._stats[priority].coalesced += 1
+                return write.future
+
+            write = _Write(priority, func, args, kwargs, coalesce_key, self._clock())
+            heapq.heappush(self._queue, (priority, next(self._sequence), write))
+            if coalesce_key is not None:
+                self._coalescable[coalesce_key] = write
+            self._condition.notify()
+            return write.future
+
+    # Queues the write and waits for its result. Exceptions of the write are raised to the caller.
+    def perform(self, priority: int, func, *args, coalesce_key=None, **kwargs):
+        return self.submit(priority, func, *args, coalesce_key=coalesce_key, **kwargs).result()
+
+    # Performs the write on the calling thread, without queueing or pacing it (following queued writes are paced). For writes made while
+    # holding a lock, e.g. in match thread transitions, because waiting for the writer thread there could deadlock with the queued writes.
+    def perform_now(self, priority: int, func, *args, **kwargs):
+        future = Future()
+        succeeded = _perform_write(priority, func, args, kwargs, future)
+        if self._thread is not None:
+            self._record_write(priority, 0.0, not succeeded)
+        return future.result()
+
+    # Stops the writer after queued writes are performed, without pacing, so that final edits aren't lost.
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        logger.info("Stopped Reddit write queue.")
+
+    def get_queue_depth(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {"queue_depth": len(self._queue), **{PRIORITY_NAMES[priority]: stats.as_dict() for priority, stats in self._stats.items()}}
+
+    def log_stats(self) -> None:
+        logger.info(f"Reddit write queue stats: {self.stats()}")
+
+    def _get_limits(self) -> dict:
+        try:
+            return self._reddit_instance.auth.limits or {}
+        except AttributeError:
+            return {}
+
+    def _run_writer(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopped:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                delay = self._next_write_at - self._clock()
+                if delay > 0 and not self._stopped:
+                    self._condition.wait(delay)  # Woken up early by new writes, so that a higher priority write is picked once the delay passes.
+                    continue
+                _, _, write = heapq.heappop(self._queue)
+                if write.coalesce_key is not None:
+                    del self._coalescable[write.coalesce_key]
+
+            wait = self._clock() - write.enqueued_at
+            metrics_util.reddit_write_wait_seconds.observe(wait, priority=PRIORITY_NAMES[write.priority])
+            failed = not _perform_write(write.priority, write.func, write.args, write.kwargs, write.future)
+            self._record_write(write.priority, wait, failed)
+
+    # Records the performed write and paces the next one.
+    def _record_write(self, priority: int, wait: float, failed: bool) -> None:
+        with self._condition:
+            stats = self._stats[priority]
+            stats.writes += 1
+            stats.failures += 1 if failed else 0
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            self._next_write_at = self._clock() + get_pacing_delay(self._get_limits(), self._wall_clock())
+
+
+reddit_write_queue = RedditWriteQueue()
+metrics_util.reddit_write_queue_depth.set_function(lambda: reddit_write_queue.get_queue_depth())
+
+
+# Replies to a comment with a command reply and returns the reply.
+def reply(comment, body: str):
+    return reddit_write_queue.perform(COMMAND_REPLY, comment.reply, body)
+
+
+# Same as reply, but performed on the calling thread. For replies made while holding a lock (see RedditWriteQueue.perform_now).
+def reply_now(comment, body: str):
+    return reddit_write_queue.perform_now(COMMAND_REPLY, comment.reply, body)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from reddit_bot.util import metrics_util
+from reddit_bot.util.logging_util import logger
+
+
+# Periodic job definition with its timing stats.
+class Job:
+    def __init__(self, name: str, func, args: tuple, interval: float, jitter: float):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.interval = interval
+        self.jitter = jitter  # Maximum random delay in seconds added to each run, so that jobs don't fire at the same moment.
+        self.scheduled_at = 0.0  # Planned (non-jittered) time of the next run. Next runs are planned from this value to prevent drift.
+        self.runs = 0
+        self.failures = 0
+        self.coalesced = 0  # Number of runs skipped because the job was late by more than one interval.
+        self.running = False
+        self.wake_delay = None  # Set when the job is woken up while running, next run is then planned with this delay.
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+
+    def record_run(self, duration: float, failed: bool) -> None:
+        self.runs += 1
+        self.failures += 1 if failed else 0
+        self.last_duration = duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        metrics_util.job_run_seconds.observe(duration, job=self.name)
+        metrics_util.job_runs.inc(job=self.name, result="failure" if failed else "success")
+
+    # Plans the next run after a run finished. Jobs can return the delay until their next run to override the fixed interval, an infinite delay
+    # parks the job until it is woken up.
+    def plan_next_run(self, finished: float, requested_delay=None) -> None:
+        if self.wake_delay is not None:
+            self.scheduled_at = finished + self.wake_delay
+            self.wake_delay = None
+            return
+        if isinstance(requested_delay, (int, float)):
+            self.scheduled_at = finished + requested_delay
+            return
+
+        # Plan next run relative to the previous plan. If the job overran by more than one interval, all missed runs are coalesced into one immediate run.
+        missed_runs = int((finished - self.scheduled_at) // self.interval)
+        if missed_runs > 1:
+            self.coalesced += missed_runs - 1
+        self.scheduled_at += max(missed_runs, 1) * self.interval
+
+    def get_jittered_run_time(self) -> float:
+        return self.scheduled_at + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def stats(self) -> dict:
+        average_duration = self.total_duration / self.runs if self.runs else 0.0
+        return {"runs": self.runs, "failures": self.failures, "coalesced": self.coalesced, "last_duration": round(self.last_duration, 3), "avg_duration": round(average_duration, 3), "max_duration": round(self.max_duration, 3)}
+
+
+# Runs periodic jobs from a heap of next-run times. A single thread waits for the next due job and hands it over to a small worker pool.
+# The same job never runs concurrently with itself, because it is only re-queued after its run has finished.
+class Scheduler:
+    def __init__(self, max_workers: int, clock=time.monotonic):
+        self._clock = clock
+        self._jobs = {}
+        self._queue = []  # Heap of (run_at, sequence, job).
+        self._sequence = itertools.count()  # Tie-breaker for jobs due at the same time.
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler-worker")
+        self._thread = threading.Thread(target=self._run_loop, name="scheduler", daemon=True)
+
+    def add_job(self, name: str, func, args: tuple = (), interval: float = 60, jitter: float = 0, initial_delay: float = 0) -> None:
+        job = Job(name, func, args, interval, jitter)
+        with self._condition:
+            self._jobs[name] = job
+            job.scheduled_at = self._clock() + initial_delay
+            self._push(job)
+
+    # Runs the job after the delay instead of its planned run, also when it is parked. A running job is planned with the delay once it finishes.
+    def wake(self, name: str, delay: float = 0) -> None:
+        with self._condition:
+            job = self._jobs[name]
+            if job.running:
+                job.wake_delay = delay
+                return
+            self._queue = [entry for entry in self._queue if entry[2] is not job]
+            heapq.heapify(self._queue)
+            job.scheduled_at = self._clock() + delay
+            if not self._stopped:
+                self._push(job)
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info(f"Started scheduler with jobs: {', '.join(self._jobs)}.")
+
+    # Stops scheduling new runs and waits for the running jobs to finish.
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+        logger.info("Stopped scheduler.")
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {name: job.stats() for name, job in self._jobs.items()}
+
+    def log_stats(self) -> None:
+        logger.info(f"Scheduler job stats: {self.stats()}")
+
+    def _push(self, job: Job) -> None:
+        if job.scheduled_at == math.inf:
+            return  # Parked jobs stay out of the heap until they are woken up.
+        heapq.heappush(self._queue, (job.get_jittered_run_time(), next(self._sequence), job))
+        self._condition.notify()
+
+    def _run_loop(self) -> None:
+        with self._condition:
+            while not self._stopped:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                run_at, _, job = self._queue[0]
+                delay = run_at - self._clock()
+                if delay > 0:
+                    self._condition.wait(delay)  # Woken up early if a job is added or scheduler is stopped.
+                    continue
+                heapq.heappop(self._queue)
+                job.running = True
+                self._executor.submit(self._run_job, job)
+
+    def _run_job(self, job: Job) -> None:
+        start = self._clock()
+        failed = False
+        requested_delay = None
+        try:
+            requested_delay = job.func(*job.args)
+        except Exception:
+            failed = True
+            logger.exception(f"Scheduled job {job.name} failed.")
+        finished = self._clock()
+
+        with self._condition:
+            job.record_run(finished - start, failed)
+            job.running = False
+            job.plan_next_run(finished, requested_delay)
+            if not self._stopped:
+                self._push(job)
+
+
+if __name__ == "__main__":
+    pass
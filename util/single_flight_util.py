@@ -0,0 +1,55 @@
+import threading
+
+
+# Call that is currently being made, shared with all callers of the same key.
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Coalesces concurrent identical calls - while a call for a key is in flight, other callers of the same key wait for it and share its result
+# (or exception) instead of making the call again. Results are not kept once the call is done, that is up to the caller's cache.
+class SingleFlight:
+    def __init__(self):
+        self.calls = 0
+        self.shared_calls = 0  # Calls that were served by another caller's in-flight call.
+        self._calls = {}  # Key -> _Call in flight.
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.shared_calls += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "shared_calls": self.shared_calls, "in_flight": len(self._calls)}
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+from typing import Final, Optional
+
+from reddit_bot.config import config
+from reddit_bot.util.logging_util import logger
+
+# Tables are created when the database is opened, so that a fresh database file is usable right away.
+SCHEMA: Final[tuple[str, ...]] = (
+    # Last evaluation of each submission by moderation rules, so that unchanged submissions aren't evaluated again.
+    "CREATE TABLE IF NOT EXISTS submission_state (submission_id TEXT PRIMARY KEY, flair TEXT, last_action TEXT NOT NULL, fingerprint TEXT NOT NULL, created_utc REAL NOT NULL, updated_at REAL NOT NULL)",
+    # Fullnames of comments that were already processed, instead of saving each comment on Reddit.
+    "CREATE TABLE IF NOT EXISTS processed_items (fullname TEXT PRIMARY KEY, processed_at REAL NOT NULL)",
+    # Pre-match, live match and post-match threads, so that existing threads are found without listing the subreddit.
+    # Fixture ID is unknown for threads found in the subreddit listing, which are matched by title.
+    "CREATE TABLE IF NOT EXISTS match_threads (submission_id TEXT PRIMARY KEY, fixture_id INTEGER, kind TEXT NOT NULL, title TEXT NOT NULL, url TEXT NOT NULL, created_at REAL NOT NULL)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS match_threads_fixture ON match_threads (fixture_id, kind)",
+    # Single values, e.g. when a table started being filled.
+    "CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+)
+
+_connection = None
+_lock = threading.RLock()  # A single connection is shared by all threads, statements are serialized.
+
+
+def get_connection() -> sqlite3.Connection:
+    global _connection
+    with _lock:
+        if _connection is None:
+            connection = sqlite3.connect(config.Storage.DATABASE_PATH, check_same_thread=False)
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            _connection = connection
+            logger.info(f"Opened database {config.Storage.DATABASE_PATH}.")
+        return _connection
+
+
+# Executes a single statement in its own transaction and returns all resulting rows.
+def execute(statement: str, parameters: tuple = ()) -> list:
+    with _lock:
+        connection = get_connection()
+        with connection:
+            return connection.execute(statement, parameters).fetchall()
+
+
+def execute_many(statement: str, parameters: list) -> None:
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.executemany(statement, parameters)
+
+
+def get_metadata(key: str, default: str = None) -> Optional[str]:
+    rows = execute("SELECT value FROM metadata WHERE key = ?", (key,))
+    return rows[0][0] if rows else default
+
+
+def set_metadata(key: str, value: str) -> None:
+    execute("INSERT INTO metadata (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, value))
+
+
+def close() -> None:
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+
+if __name__ == "__main__":
+    pass
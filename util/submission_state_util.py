@@ -0,0 +1,59 @@
+import hashlib
+import threading
+import time
+
+from reddit_bot.config import config
+from reddit_bot.util import storage_util
+
+
+# Fingerprint of everything moderation rules are evaluated on. Submission has to be evaluated again when it changes (e.g. flair tagged by moderators).
+def get_fingerprint(submission) -> str:
+    content = "\0".join((submission.link_flair_text or "", submission.title or "", submission.selftext or "", submission.url or ""))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+# Index of submissions already evaluated by moderation rules. Kept in memory for lookups and written through to storage, so that submissions
+# aren't evaluated (and acted on) again after restart.
+class SubmissionStateIndex:
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._states = None  # Submission id -> (fingerprint, created_utc). Loaded from storage on first use.
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if self._states is None:
+            rows = storage_util.execute("SELECT submission_id, fingerprint, created_utc FROM submission_state")
+            self._states = {submission_id: (fingerprint, created_utc) for submission_id, fingerprint, created_utc in rows}
+        return self._states
+
+    def is_evaluated(self, submission_id: str, fingerprint: str) -> bool:
+        with self._lock:
+            state = self._load().get(submission_id)
+            return state is not None and state[0] == fingerprint
+
+    def record(self, submission, fingerprint: str, last_action: str) -> None:
+        with self._lock:
+            self._load()[submission.id] = (fingerprint, submission.created_utc)
+            storage_util.execute(
+                "INSERT INTO submission_state (submission_id, flair, last_action, fingerprint, created_utc, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (submission_id) DO UPDATE SET flair = excluded.flair, last_action = excluded.last_action, fingerprint = excluded.fingerprint, updated_at = excluded.updated_at",
+                (submission.id, submission.link_flair_text, last_action, fingerprint, submission.created_utc, self._clock()))
+
+    # Removes states of submissions older than the retention period, which can't appear in the latest batch anymore.
+    def prune(self) -> int:
+        cutoff = self._clock() - config.Reddit.SUBMISSION_STATE_RETENTION
+        with self._lock:
+            states = self._load()
+            pruned_ids = [submission_id for submission_id, (_, created_utc) in states.items() if created_utc < cutoff]
+            for submission_id in pruned_ids:
+                del states[submission_id]
+            storage_util.execute("DELETE FROM submission_state WHERE created_utc < ?", (cutoff,))
+            return len(pruned_ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+if __name__ == "__main__":
+    pass